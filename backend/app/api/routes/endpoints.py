@@ -1,6 +1,15 @@
-from fastapi import APIRouter, HTTPException
-from schemas.endpoint import EndpointCreate, EndpointResponse
+from datetime import datetime
+from typing import Optional, List
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from core.serialization import FastJSONResponse
+from schemas.endpoint import EndpointCreate, EndpointResponse, ForwardConfig, ReplayCreate, ResponseConfig, WebhookRequest
 from services.endpoint_service import endpoint_service
+from services.forwarder import ForwardingError
+from storage.query import RequestQuery, UnknownCursorError
+from storage.search_index import RequestSearch
+
+REQUEST_FIELDS = set(WebhookRequest.model_fields) | {"ai_mock_response"}
 
 router = APIRouter(
     prefix="/endpoints",
@@ -8,6 +17,19 @@ router = APIRouter(
 )
 
 
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+
+    selected_fields = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected_fields if field not in REQUEST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in selected_fields:
+        selected_fields.insert(0, "id")
+    return selected_fields
+
+
 @router.post(
     "",
     response_model=EndpointResponse,
@@ -15,7 +37,12 @@ router = APIRouter(
     status_code=201
 )
 async def create_endpoint(endpoint: EndpointCreate):
-    endpoint_data = endpoint_service.create_endpoint(name=endpoint.name)
+    endpoint_data = endpoint_service.create_endpoint(
+        name=endpoint.name,
+        max_requests=endpoint.max_requests,
+        ttl_seconds=endpoint.ttl_seconds,
+        response_config=endpoint.response.model_dump() if endpoint.response else None
+    )
     return EndpointResponse(**endpoint_data)
 
 
@@ -33,20 +60,227 @@ async def get_endpoint(endpoint_id: str):
     return EndpointResponse(**endpoint_data)
 
 
+@router.put(
+    "/{endpoint_id}/response",
+    response_model=EndpointResponse,
+    summary="Configure Webhook Responses"
+)
+async def set_endpoint_response(endpoint_id: str, response: ResponseConfig):
+    endpoint_data = endpoint_service.set_response_config(endpoint_id, response.model_dump())
+
+    if not endpoint_data:
+        raise HTTPException(status_code=404, detail="Endpoint not found")
+
+    return EndpointResponse(**endpoint_data)
+
+
+@router.put(
+    "/{endpoint_id}/forward",
+    response_model=EndpointResponse,
+    summary="Forward Webhooks"
+)
+async def set_endpoint_forward(endpoint_id: str, forward: ForwardConfig, request: Request):
+    try:
+        endpoint_data = await endpoint_service.set_forward_url(
+            endpoint_id,
+            forward.target_url,
+            own_base_url=str(request.base_url)
+        )
+    except ForwardingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not endpoint_data:
+        raise HTTPException(status_code=404, detail="Endpoint not found")
+
+    return EndpointResponse(**endpoint_data)
+
+
+@router.post(
+    "/{endpoint_id}/replays",
+    summary="Replay Captured Requests",
+    status_code=202
+)
+async def create_replay(endpoint_id: str, replay: ReplayCreate, request: Request):
+    try:
+        job = await endpoint_service.start_replay(
+            endpoint_id,
+            target_url=replay.target_url,
+            limit=replay.limit,
+            request_ids=replay.request_ids,
+            rps=replay.rps,
+            concurrency=replay.concurrency,
+            own_base_url=str(request.base_url)
+        )
+    except ForwardingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Endpoint not found")
+
+    return job
+
+
+@router.get(
+    "/{endpoint_id}/replays/{job_id}",
+    summary="Get Replay Progress"
+)
+async def get_replay(endpoint_id: str, job_id: str):
+    job = endpoint_service.get_replay(endpoint_id, job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Replay not found")
+
+    return job
+
+
+@router.delete(
+    "/{endpoint_id}/replays/{job_id}",
+    summary="Cancel Replay"
+)
+async def cancel_replay(endpoint_id: str, job_id: str):
+    job = endpoint_service.cancel_replay(endpoint_id, job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Replay not found")
+
+    return job
+
+
 @router.get(
     "/{endpoint_id}/requests",
     summary="Get Endpoint Requests"
 )
-async def get_endpoint_requests(endpoint_id: str):
-    endpoint_data = endpoint_service.get_endpoint(endpoint_id)
+async def get_endpoint_requests(
+        endpoint_id: str,
+        limit: int = Query(50, ge=1, le=1000, description="Page size"),
+        after: Optional[str] = Query(None, description="Return requests newer than this request id"),
+        before: Optional[str] = Query(None, description="Return requests older than this request id"),
+        method: Optional[str] = Query(None, description="Only requests with this HTTP method"),
+        content_type: Optional[str] = Query(None, description="Only requests whose content type starts with this value"),
+        start_time: Optional[datetime] = Query(None, description="Only requests received at or after this time"),
+        end_time: Optional[datetime] = Query(None, description="Only requests received at or before this time"),
+        header: List[str] = Query([], description="Only requests carrying all of these headers"),
+        where: List[str] = Query([], description="JSON body filters as path=value, e.g. data.object.id=obj_123"),
+        fields: Optional[str] = Query(None, description="Comma-separated list of request fields to return"),
+):
+    selected_fields = _parse_fields(fields)
 
-    if not endpoint_data:
+    json_equals = []
+    for condition in where:
+        path, separator, value = condition.partition("=")
+        if not separator or not path.strip():
+            raise HTTPException(status_code=400, detail=f"Invalid filter (expected path=value): {condition}")
+        json_equals.append((path.strip(), value))
+
+    query = RequestQuery(
+        limit=limit,
+        after=after,
+        before=before,
+        method=method,
+        content_type=content_type,
+        start_time=start_time,
+        end_time=end_time,
+        has_headers=tuple(header),
+        json_equals=tuple(json_equals)
+    )
+
+    try:
+        result = await endpoint_service.list_requests(endpoint_id, query, fields=selected_fields)
+    except UnknownCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if result is None:
         raise HTTPException(status_code=404, detail="Endpoint not found")
 
-    store_data = endpoint_service.store.get(endpoint_id)
+    return FastJSONResponse(result)
+
+
+@router.get(
+    "/{endpoint_id}/events",
+    summary="Stream Endpoint Events (Server-Sent Events)"
+)
+async def stream_endpoint_events(
+        endpoint_id: str,
+        since: Optional[int] = Query(None, ge=0, description="Replay events after this sequence number first"),
+        last_event_id: Optional[str] = Header(None, description="Set by EventSource on reconnect; wins over since"),
+):
+    if last_event_id:
+        try:
+            since = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an event sequence number")
+
+    if not endpoint_service.get_endpoint(endpoint_id):
+        raise HTTPException(status_code=404, detail="Endpoint not found")
+
+    return StreamingResponse(
+        endpoint_service.stream_events(endpoint_id, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get(
+    "/{endpoint_id}/search",
+    summary="Search Endpoint Requests"
+)
+async def search_endpoint_requests(
+        endpoint_id: str,
+        q: Optional[str] = Query(None, description="Words that must all appear in header values, query params or the body"),
+        json: List[str] = Query([], description="JSONPath predicates on the body, e.g. $.data.object.customer == cus_123"),
+        limit: int = Query(50, ge=1, le=1000, description="Page size"),
+        before: Optional[str] = Query(None, description="Return matches older than this request id"),
+        fields: Optional[str] = Query(None, description="Comma-separated list of request fields to return"),
+):
+    selected_fields = _parse_fields(fields)
+
+    try:
+        search = RequestSearch.from_text(q, predicates=json, limit=limit, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not search.terms and not search.predicates:
+        raise HTTPException(status_code=400, detail="Provide search words (q) or JSON predicates (json)")
+
+    try:
+        result = await endpoint_service.search_requests(endpoint_id, search, fields=selected_fields)
+    except UnknownCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Endpoint not found")
+
+    return FastJSONResponse(result)
+
+
+@router.get(
+    "/{endpoint_id}/requests/{request_id}",
+    summary="Get One Captured Request"
+)
+async def get_endpoint_request(
+        endpoint_id: str,
+        request_id: str,
+        fields: Optional[str] = Query(None, description="Comma-separated list of request fields to return"),
+):
+    request_data = await endpoint_service.get_request(endpoint_id, request_id, fields=_parse_fields(fields))
+
+    if request_data is None:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    return FastJSONResponse(request_data)
+
+
+@router.get(
+    "/{endpoint_id}/requests/{request_id}/body",
+    summary="Download Request Body"
+)
+async def get_request_body(endpoint_id: str, request_id: str):
+    body = await endpoint_service.get_request_body(endpoint_id, request_id)
+
+    if body is None:
+        raise HTTPException(status_code=404, detail="Request body not found")
+
+    if "path" in body:
+        return FileResponse(body["path"], media_type=body["media_type"])
 
-    return {
-        "endpoint_id": endpoint_id,
-        "request_count": store_data["request_count"],
-        "requests": store_data["requests"]
-    }
\ No newline at end of file
+    return Response(content=body["content"], media_type=body["media_type"])
@@ -1,5 +1,7 @@
-from fastapi import APIRouter,Request
+from fastapi import APIRouter, Request, Response
+from core.serialization import FastJSONResponse
 from services.endpoint_service import endpoint_service
+from services.response_mode import MockReply
 
 router = APIRouter(
     prefix="/w",
@@ -13,4 +15,11 @@ router = APIRouter(
 )
 async def receive_webhook(endpoint_id: str, request: Request):
     result = await endpoint_service.receive_webhook(endpoint_id, request)
-    return result
\ No newline at end of file
+    if isinstance(result, MockReply):
+        return Response(
+            content=result.render(),
+            status_code=result.status_code,
+            headers=result.headers,
+            media_type=result.media_type
+        )
+    return FastJSONResponse(result)
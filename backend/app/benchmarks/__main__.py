@@ -0,0 +1,130 @@
+"""Load and latency benchmarks for the ingest and fan-out paths.
+
+Run from backend/app:
+
+    python -m benchmarks run --output before.json
+    python -m benchmarks run --scenarios ingest --transports asgi,uvicorn --payload-bytes 256,65536
+    python -m benchmarks compare before.json after.json
+
+The AI service is replaced by a local fake (``--ai-latency-ms``), so runs
+need no API key and measure only this service.
+"""
+import sys
+import json
+import asyncio
+import argparse
+import itertools
+from datetime import datetime, timezone
+
+from benchmarks import scenarios
+from benchmarks.harness import compare, environment
+
+
+SCENARIOS = ("ingest", "store", "rate_limiter", "fanout")
+
+
+def _ints(value: str):
+    return [int(item) for item in value.split(",") if item]
+
+
+def _names(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run benchmarks and print (or write) JSON results")
+    run.add_argument("--scenarios", type=_names, default=list(SCENARIOS), help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    run.add_argument("--transports", type=_names, default=["asgi"], help="asgi (in-process) and/or uvicorn (loopback TCP)")
+    run.add_argument("--requests", type=int, default=2000, help="Webhooks sent per ingest run")
+    run.add_argument("--concurrency", type=int, default=32, help="Concurrent senders per ingest run")
+    run.add_argument("--payload-bytes", type=_ints, default=[1024], help="Body sizes to sweep")
+    run.add_argument("--endpoints", type=_ints, default=[10], help="Endpoint counts to sweep")
+    run.add_argument("--subscribers", type=_ints, default=[0, 10], help="WebSocket subscribers per endpoint to sweep")
+    run.add_argument("--history", type=_ints, default=[100, 10_000, 100_000], help="History sizes for the store benchmark")
+    run.add_argument("--store-requests", type=int, default=20_000)
+    run.add_argument("--limiter-keys", type=int, default=10_000)
+    run.add_argument("--limiter-checks", type=int, default=200_000)
+    run.add_argument("--fanout-events", type=int, default=1000)
+    run.add_argument("--ai-latency-ms", type=float, default=0, help="Delay of the fake AI service")
+    run.add_argument("--output", help="Write results here instead of stdout")
+
+    diff = commands.add_parser("compare", help="Percent change of throughput and latency between two result files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    return parser
+
+
+async def run_all(args) -> dict:
+    results = []
+
+    def record(scenario, result):
+        result = {"scenario": scenario, **result}
+        results.append(result)
+        latency = result["latency_ms"]
+        print(
+            f"{scenario:<13} {json.dumps(result['params'], sort_keys=True):<110} "
+            f"{result['throughput']:>11.1f}/s  p50 {latency['p50']:.3f}ms  p99 {latency['p99']:.3f}ms  p999 {latency['p999']:.3f}ms",
+            file=sys.stderr
+        )
+
+    if "ingest" in args.scenarios:
+        for transport, payload_bytes, endpoints, subscribers in itertools.product(
+                args.transports, args.payload_bytes, args.endpoints, args.subscribers):
+            record("ingest", await scenarios.ingest(
+                transport=transport,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                payload_bytes=payload_bytes,
+                endpoints=endpoints,
+                subscribers=subscribers,
+                ai_latency_ms=args.ai_latency_ms
+            ))
+
+    if "store" in args.scenarios:
+        for history, payload_bytes in itertools.product(args.history, args.payload_bytes):
+            record("store", scenarios.store_add_request(history, args.store_requests, payload_bytes))
+
+    if "rate_limiter" in args.scenarios:
+        record("rate_limiter", scenarios.rate_limiter_checks(args.limiter_keys, args.limiter_checks))
+
+    if "fanout" in args.scenarios:
+        for subscribers, payload_bytes in itertools.product(args.subscribers, args.payload_bytes):
+            if subscribers:
+                record("fanout", await scenarios.broadcast_fanout(subscribers, args.fanout_events, payload_bytes))
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "results": results
+    }
+
+
+def main(argv=None) -> int:
+    args = _parser().parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as baseline, open(args.current) as current:
+            rows = compare(json.load(baseline), json.load(current))
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    report = asyncio.run(run_all(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class FakeAIService:
+    """Stands in for ``ai_service``: answers after a fixed delay without calling the API."""
+
+    enabled = True
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    async def generate_mock_response(
+            self,
+            request_data: Dict[str, Any],
+            endpoint_id: Optional[str] = None,
+            ip_address: Optional[str] = None
+    ) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return {
+            "mock_response": {"received": True},
+            "generated_at": datetime.now().isoformat(),
+            "tokens_used": 0
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls}
+
+
+class FakeWebSocket:
+    """A subscriber that accepts every message immediately and counts what it got."""
+
+    def __init__(self, on_message=None):
+        self.received = 0
+        self.on_message = on_message
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        self.received += 1
+        if self.on_message is not None:
+            self.on_message(self)
+
+    async def close(self, code: int = 1000) -> None:
+        pass
@@ -0,0 +1,125 @@
+import os
+import math
+import time
+import logging
+import asyncio
+import platform
+import subprocess
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values) - 1e-9) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], seconds: float, **params: Any) -> Dict[str, Any]:
+    """Throughput and latency percentiles (ms) for one run; ``latencies`` are in seconds."""
+    ordered = sorted(latencies)
+    return {
+        "params": params,
+        "ops": len(ordered),
+        "seconds": round(seconds, 4),
+        "throughput": round(len(ordered) / seconds, 1) if seconds > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 4) if ordered else 0.0,
+            "p50": round(percentile(ordered, 0.50) * 1000, 4),
+            "p99": round(percentile(ordered, 0.99) * 1000, 4),
+            "p999": round(percentile(ordered, 0.999) * 1000, 4),
+            "max": round(ordered[-1] * 1000, 4) if ordered else 0.0
+        }
+    }
+
+
+def time_calls(call: Callable[[], Any], count: int) -> Dict[str, Any]:
+    """Run a synchronous ``call`` ``count`` times, timing each one."""
+    latencies = []
+    clock = time.perf_counter
+    started = clock()
+    for _ in range(count):
+        call_started = clock()
+        call()
+        latencies.append(clock() - call_started)
+    return {"latencies": latencies, "seconds": clock() - started}
+
+
+async def time_concurrent(call: Callable[[int], Awaitable[Any]], count: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``call(n)`` for n in ``range(count)`` from ``concurrency`` workers, timing each call."""
+    latencies = []
+    numbers = iter(range(count))
+    clock = time.perf_counter
+
+    async def worker():
+        for number in numbers:
+            call_started = clock()
+            await call(number)
+            latencies.append(clock() - call_started)
+
+    started = clock()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return {"latencies": latencies, "seconds": clock() - started}
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """Raise the app's log level to warnings so per-request logging isn't what gets measured."""
+    from core.log import configure_logging
+
+    root = configure_logging()
+    saved = root.level
+    root.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        root.setLevel(saved)
+
+
+def environment() -> Dict[str, Optional[str]]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": str(os.cpu_count())
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Pair up results with the same scenario and params and report relative changes."""
+
+    def key(result):
+        return result["scenario"], tuple(sorted(result["params"].items()))
+
+    before = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        previous = before.get(key(result))
+        if previous is None:
+            continue
+        rows.append({
+            "scenario": result["scenario"],
+            "params": result["params"],
+            "throughput": _change(previous["throughput"], result["throughput"]),
+            "p50": _change(previous["latency_ms"]["p50"], result["latency_ms"]["p50"]),
+            "p99": _change(previous["latency_ms"]["p99"], result["latency_ms"]["p99"]),
+            "p999": _change(previous["latency_ms"]["p999"], result["latency_ms"]["p999"])
+        })
+    return rows
+
+
+def _change(before: float, after: float) -> Optional[float]:
+    """Percent change from ``before`` to ``after``; None when there is no baseline value."""
+    if not before:
+        return None
+    return round((after - before) / before * 100, 1)
@@ -0,0 +1,228 @@
+import time
+import socket
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+
+from benchmarks.fakes import FakeAIService, FakeWebSocket
+from benchmarks.harness import quiet, summarize, time_calls, time_concurrent
+from core.serialization import dumps
+
+
+def make_payload(size_bytes: int) -> bytes:
+    """A JSON body of roughly ``size_bytes``."""
+    envelope = b'{"event": "benchmark", "data": ""}'
+    return dumps({"event": "benchmark", "data": "x" * max(0, size_bytes - len(envelope))})
+
+
+@asynccontextmanager
+async def fake_ai(latency_ms: float) -> AsyncIterator[FakeAIService]:
+    import services.endpoint_service as endpoint_module
+
+    fake = FakeAIService(latency_ms)
+    original = endpoint_module.ai_service
+    endpoint_module.ai_service = fake
+    try:
+        yield fake
+    finally:
+        endpoint_module.ai_service = original
+
+
+@asynccontextmanager
+async def in_process_app() -> AsyncIterator[httpx.AsyncClient]:
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            yield client
+
+
+@asynccontextmanager
+async def uvicorn_app() -> AsyncIterator[httpx.AsyncClient]:
+    """The app served by uvicorn on a loopback port in a background thread."""
+    import uvicorn
+    from main import app
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    try:
+        limits = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join, 10)
+
+
+async def _subscribe_in_process(endpoint_ids: List[str], subscribers: int) -> List[FakeWebSocket]:
+    from main import manager
+
+    sockets = []
+    for endpoint_id in endpoint_ids:
+        for _ in range(subscribers):
+            websocket = FakeWebSocket()
+            await manager.connect(endpoint_id, websocket)
+            sockets.append(websocket)
+    return sockets
+
+
+async def _subscribe_over_network(client: httpx.AsyncClient, endpoint_ids: List[str], subscribers: int):
+    from websockets.asyncio.client import connect
+
+    ws_base = str(client.base_url).replace("http://", "ws://")
+    counts = []
+    connections = []
+
+    async def drain(connection, slot):
+        async for _ in connection:
+            counts[slot] += 1
+
+    for endpoint_id in endpoint_ids:
+        for _ in range(subscribers):
+            connection = await connect(f"{ws_base}/ws/{endpoint_id}")
+            counts.append(0)
+            connections.append((connection, asyncio.create_task(drain(connection, len(counts) - 1))))
+
+    return counts, connections
+
+
+async def ingest(
+        transport: str = "asgi",
+        requests: int = 2000,
+        concurrency: int = 32,
+        payload_bytes: int = 1024,
+        endpoints: int = 10,
+        subscribers: int = 0,
+        ai_latency_ms: float = 0
+) -> Dict[str, Any]:
+    """POST webhooks to ``/w/{endpoint_id}`` spread over ``endpoints`` endpoints."""
+    payload = make_payload(payload_bytes)
+    headers = {"content-type": "application/json"}
+    app_context = in_process_app() if transport == "asgi" else uvicorn_app()
+
+    with quiet():
+        async with fake_ai(ai_latency_ms) as ai, app_context as client:
+            endpoint_ids = []
+            for number in range(endpoints):
+                response = await client.post("/endpoints", json={"name": f"bench-{number}"})
+                endpoint_ids.append(response.json()["id"])
+
+            connections = []
+            if subscribers and transport == "asgi":
+                sockets = await _subscribe_in_process(endpoint_ids, subscribers)
+            elif subscribers:
+                counts, connections = await _subscribe_over_network(client, endpoint_ids, subscribers)
+
+            async def send(number):
+                response = await client.post(f"/w/{endpoint_ids[number % endpoints]}", content=payload, headers=headers)
+                response.raise_for_status()
+
+            run = await time_concurrent(send, requests, concurrency)
+
+            # Let the subscriber queues drain before counting deliveries
+            await asyncio.sleep(0.2)
+            if subscribers and transport == "asgi":
+                delivered = sum(websocket.received for websocket in sockets)
+            else:
+                delivered = sum(counts) if subscribers else 0
+            for connection, task in connections:
+                task.cancel()
+                await connection.close()
+
+    result = summarize(
+        run["latencies"], run["seconds"],
+        transport=transport, concurrency=concurrency, payload_bytes=payload_bytes,
+        endpoints=endpoints, subscribers=subscribers, ai_latency_ms=ai_latency_ms
+    )
+    result["ai_calls"] = ai.calls
+    result["ws_messages_delivered"] = delivered
+    return result
+
+
+def store_add_request(history: int = 10_000, requests: int = 20_000, payload_bytes: int = 1024) -> Dict[str, Any]:
+    """``EndpointStore.add_request`` into an endpoint whose history is already full."""
+    from storage.captured_request import CapturedRequest
+    from storage.store import EndpointStore
+
+    store = EndpointStore()
+    endpoint_id = "bench-store"
+    store.create(endpoint_id, max_requests=history, ttl_seconds=0)
+    body = make_payload(payload_bytes).decode("utf-8")
+    headers = {"content-type": "application/json", "user-agent": "bench/1.0"}
+
+    def record(number):
+        return CapturedRequest(
+            f"bench-{number}", "POST", headers, body,
+            content_type="application/json", content_length=len(body)
+        )
+
+    for number in range(history):
+        store.add_request(endpoint_id, record(number))
+
+    pending = iter([record(number) for number in range(history, history + requests)])
+    run = time_calls(lambda: store.add_request(endpoint_id, next(pending)), requests)
+    return summarize(run["latencies"], run["seconds"], history=history, payload_bytes=payload_bytes)
+
+
+def rate_limiter_checks(keys: int = 10_000, checks: int = 200_000) -> Dict[str, Any]:
+    """``RateLimiter.check_and_consume`` over ``keys`` distinct endpoint/IP keys."""
+    from middleware.rate_limiter import RateLimiter
+
+    limiter = RateLimiter()
+    key_names = [f"endpoint:bench-{number}" for number in range(keys)]
+    counter = iter(range(checks))
+    run = time_calls(lambda: limiter.check_and_consume(key_names[next(counter) % keys], 1_000_000), checks)
+    return summarize(run["latencies"], run["seconds"], keys=keys)
+
+
+async def broadcast_fanout(subscribers: int = 100, events: int = 1000, payload_bytes: int = 1024) -> Dict[str, Any]:
+    """Time from ``broadcast_new_request`` until every subscriber has the event."""
+    from services.connection_manager import ConnectionManager
+    from storage.captured_request import CapturedRequest
+
+    manager = ConnectionManager(max_queue=events + 1)
+    endpoint_id = "bench-fanout"
+    body = make_payload(payload_bytes).decode("utf-8")
+
+    expected = 0
+    done = asyncio.Event()
+    state = {"received": 0}
+
+    def on_message(_):
+        state["received"] += 1
+        if state["received"] >= expected:
+            done.set()
+
+    with quiet():
+        for _ in range(subscribers):
+            await manager.connect(endpoint_id, FakeWebSocket(on_message))
+
+        latencies = []
+        clock = time.perf_counter
+        started = clock()
+        for number in range(events):
+            expected = (number + 1) * subscribers
+            done.clear()
+            request_data = CapturedRequest(
+                f"fanout-{number}", "POST", {"content-type": "application/json"}, body,
+                content_type="application/json", content_length=len(body)
+            )
+            event_started = clock()
+            manager.broadcast_new_request(endpoint_id, request_data)
+            await done.wait()
+            latencies.append(clock() - event_started)
+        seconds = clock() - started
+        await manager.close()
+
+    return summarize(latencies, seconds, subscribers=subscribers, payload_bytes=payload_bytes)
@@ -14,6 +14,75 @@ class Settings(BaseSettings):
     AI_CALLS_PER_ENDPOINT_PER_HOUR: int = 10
     AI_CALLS_PER_IP_PER_HOUR: int = 20
     MAX_AI_TOKENS: int = 512
+    AI_MAX_CONCURRENT_CALLS: int = 4
+    AI_TIMEOUT_SECONDS: float = 30.0
+    AI_DEFERRED_RESPONSES: bool = False
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: float = 3600
+    AI_CACHE_MAX_ENTRIES: int = 1024
+    AI_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+    AI_QUEUE_MAX_PENDING: int = 1000
+    AI_QUEUE_OVERFLOW: str = "reject"
+    AI_COALESCE_REQUESTS: bool = True
+    AI_BATCH_WINDOW_MS: float = 0
+    AI_BATCH_MAX_SIZE: int = 8
+
+    MOCK_RULES_ENABLED: bool = True
+    MOCK_RULES_PATH: str = ""
+
+    FORWARD_MAX_CONNECTIONS: int = 100
+    FORWARD_TIMEOUT_SECONDS: float = 10.0
+    FORWARD_MAX_RETRIES: int = 3
+    FORWARD_BACKOFF_SECONDS: float = 0.2
+    FORWARD_BREAKER_FAILURES: int = 5
+    FORWARD_BREAKER_RESET_SECONDS: float = 30
+    FORWARD_LIVE_MAX_PENDING: int = 1000
+    FORWARD_ALLOWED_TARGETS: str = ""
+    REPLAY_MAX_REQUESTS: int = 10_000
+
+    MAX_REQUESTS_PER_ENDPOINT: int = 100
+    MAX_REQUESTS_PER_ENDPOINT_LIMIT: int = 100_000
+    BODY_SPILL_THRESHOLD_BYTES: int = 1024 * 1024
+    BODY_PREVIEW_BYTES: int = 4096
+    MAX_BODY_BYTES: int = 100 * 1024 * 1024
+    BODY_SPOOL_DIR: str = ""
+
+    BODY_JSON_CACHE_ENTRIES: int = 512
+    JSON_INDEX_PATHS: str = ""
+
+    COLD_TIER_HOT_REQUESTS: int = 50
+    COLD_TIER_MIN_BODY_BYTES: int = 128
+
+    SEARCH_INDEX_ENABLED: bool = True
+    SEARCH_MAX_TOKENS_PER_REQUEST: int = 256
+
+    STORAGE_BACKEND: str = "memory"
+    SQLITE_PATH: str = "webhook_debugger.db"
+    SQLITE_BATCH_SIZE: int = 50
+    SQLITE_FLUSH_INTERVAL_SECONDS: float = 0.25
+    SQLITE_RETENTION_HOURS: float = 0
+
+    ENDPOINT_TTL_SECONDS: int = 7 * 24 * 3600
+    ENDPOINT_MAX_TTL_SECONDS: int = 30 * 24 * 3600
+    ENDPOINT_IDLE_SECONDS: int = 24 * 3600
+    MEMORY_BUDGET_BYTES: int = 0
+    REAPER_INTERVAL_SECONDS: float = 30
+
+    STATE_BACKEND: str = "memory"
+    STATE_SQLITE_PATH: str = "webhook_debugger_state.db"
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_OVERFLOW_POLICY: str = "coalesce"
+    EVENT_REPLAY_LIMIT: int = 1000
+    SSE_KEEPALIVE_SECONDS: float = 15
+
+    LOG_LEVEL: str = "INFO"
+    LOG_SAMPLE_EVERY: int = 100
+    METRICS_ENABLED: bool = True
+
+    PUBSUB_BACKEND: str = "memory"
+    PUBSUB_CHANNEL_PREFIX: str = "webhook-debugger:events:"
 
     def get_allowed_origins(self) -> List[str]:
         return self.ALLOWED_ORIGINS.split(",")
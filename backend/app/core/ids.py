@@ -0,0 +1,42 @@
+import os
+import time
+import random
+import threading
+from typing import Optional
+
+
+# UUIDv7 layout: 48-bit Unix ms | version 7 | 12-bit counter | variant 10 | 62 random bits
+_VERSION = 0x7 << 76
+_VARIANT = 0b10 << 62
+_COUNTER_MAX = 0xFFF
+
+_random = random.Random(os.urandom(16))
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def new_request_id(timestamp: Optional[float] = None) -> str:
+    """A UUIDv7 string for a request received at ``timestamp`` (default: now).
+
+    Ids sort by time, as strings too, and are strictly increasing within
+    the process: the 12-bit counter orders ids from the same millisecond
+    and a clock that steps back keeps the last millisecond. The random
+    tail keeps ids from separate workers apart. They are not secrets -
+    endpoint ids stay ``uuid4``.
+    """
+    global _last_ms, _counter
+
+    ms = int((time.time() if timestamp is None else timestamp) * 1000)
+    with _lock:
+        if ms > _last_ms:
+            _last_ms, _counter = ms, 0
+        elif _counter < _COUNTER_MAX:
+            _counter += 1
+        else:
+            _last_ms, _counter = _last_ms + 1, 0
+        value = (_last_ms << 80) | _VERSION | (_counter << 64) | _VARIANT | _random.getrandbits(62)
+
+    text = f"{value:032x}"
+    return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
@@ -0,0 +1,73 @@
+import sys
+import queue
+import atexit
+import logging
+import itertools
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from core.config import settings
+
+
+ROOT_LOGGER = "webhook_debugger"
+
+_listener: Optional[QueueListener] = None
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever ``sys.stdout`` is at emit time (it may be swapped, e.g. by test capture)."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging(level: str = settings.LOG_LEVEL) -> logging.Logger:
+    """Route the app's log records through a queue to a background writer thread.
+
+    Logging from the event loop then costs one ``put_nowait``; formatting and
+    the stdout write happen on the listener thread. Idempotent.
+    """
+    global _listener
+
+    root = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None:
+        return root
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    output = _StdoutHandler()
+    output.setFormatter(logging.Formatter("%(message)s"))
+
+    root.setLevel(level.upper())
+    root.addHandler(QueueHandler(records))
+    root.propagate = False
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class Sampler:
+    """Lets one call in ``every`` through - for log lines on per-message paths."""
+
+    __slots__ = ("every", "_counter")
+
+    def __init__(self, every: int = settings.LOG_SAMPLE_EVERY):
+        self.every = max(1, every)
+        self._counter = itertools.count()
+
+    def __call__(self) -> bool:
+        return next(self._counter) % self.every == 0
@@ -0,0 +1,211 @@
+import socket
+import asyncio
+import threading
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    pass
+
+
+def encode_command(*args: Any) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode("utf-8")
+        parts.append(f"${len(data)}\r\n".encode())
+        parts.append(data)
+        parts.append(b"\r\n")
+    return b"".join(parts)
+
+
+def parse_url(url: str) -> Tuple[str, int, int, Optional[str]]:
+    parsed = urlparse(url)
+    db = int(parsed.path.lstrip("/") or 0)
+    return parsed.hostname or "localhost", parsed.port or 6379, db, parsed.password
+
+
+class RespReader:
+    """Incremental RESP2 reply parser over a file-like socket reader."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read_reply(self) -> Any:
+        line = self._stream.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+
+        prefix, payload = line[:1], line[1:-2]
+
+        if prefix == b"+":
+            return payload.decode("utf-8")
+        if prefix == b"-":
+            raise RespError(payload.decode("utf-8"))
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._stream.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self.read_reply() for _ in range(length)]
+
+        raise RespError(f"Unexpected reply prefix: {line!r}")
+
+
+async def read_reply_async(reader: asyncio.StreamReader) -> Any:
+    """Async counterpart of ``RespReader.read_reply`` for asyncio streams."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+
+    prefix, payload = line[:1], line[1:-2]
+
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        raise RespError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length == -1:
+            return None
+        return [await read_reply_async(reader) for _ in range(length)]
+
+    raise RespError(f"Unexpected reply prefix: {line!r}")
+
+
+async def open_async_connection(url: str, timeout: float = 2.0) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    host, port, db, password = parse_url(url)
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+
+    if password:
+        writer.write(encode_command("AUTH", password))
+        await read_reply_async(reader)
+    if db:
+        writer.write(encode_command("SELECT", db))
+        await read_reply_async(reader)
+
+    return reader, writer
+
+
+class RespClient:
+    """Minimal synchronous client for Redis-protocol servers.
+
+    Only what the shared-state backends need: one connection, one command
+    (or pipeline) at a time. A command is resent once on a fresh connection
+    only if sending it failed; once sent, an error drops the connection
+    and is raised, since the command may already have run.
+    """
+
+    def __init__(
+            self,
+            host: str = "localhost",
+            port: int = 6379,
+            db: int = 0,
+            password: Optional[str] = None,
+            timeout: float = 2.0
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader: Optional[RespReader] = None
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 2.0) -> "RespClient":
+        host, port, db, password = parse_url(url)
+        return cls(host=host, port=port, db=db, password=password, timeout=timeout)
+
+    def execute(self, *args: Any) -> Any:
+        return self.pipeline(args)[0]
+
+    def pipeline(self, *commands: Tuple[Any, ...]) -> List[Any]:
+        payload = b"".join(encode_command(*command) for command in commands)
+        with self._lock:
+            try:
+                self._send(payload)
+            except (ConnectionError, OSError):
+                # Nothing was executed yet, so trying once more on a fresh connection is safe
+                self._send(payload)
+
+            try:
+                return [self._reader.read_reply() for _ in commands]
+            except BaseException:
+                # Replies left unread would be taken for the next command's - and a
+                # lost reply is not retried, INCR/DECR must not run twice
+                self._disconnect()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def _send(self, payload: bytes) -> None:
+        try:
+            self._ensure_connected()
+            self._sock.sendall(payload)
+        except BaseException:
+            self._disconnect()
+            raise
+
+    def _execute(self, args: Tuple[Any, ...]) -> Any:
+        self._sock.sendall(encode_command(*args))
+        return self._reader.read_reply()
+
+    def _ensure_connected(self) -> None:
+        if self._sock is not None and self._is_stale():
+            self._disconnect()
+        if self._sock is not None:
+            return
+
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = RespReader(self._sock.makefile("rb"))
+
+        if self.password:
+            self._execute(("AUTH", self.password))
+        if self.db:
+            self._execute(("SELECT", self.db))
+
+    def _is_stale(self) -> bool:
+        """Whether the server closed the idle connection (or sent something unasked)."""
+        try:
+            self._sock.setblocking(False)
+            try:
+                # Readable while idle means EOF or stray bytes - either way, start over
+                self._sock.recv(1, socket.MSG_PEEK)
+                return True
+            finally:
+                self._sock.settimeout(self.timeout)
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
@@ -1,10 +1,45 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from functools import partial
+from typing import Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
-from typing import Dict, List
 
 from api.routes import endpoints, webhooks
 from core.config import settings
+from core.log import get_logger
+from core.metrics import CONTENT_TYPE, metrics
+from core.serialization import FastJSONResponse
+from services.connection_manager import ConnectionManager
+from services.pubsub import event_bus
+from storage.json_index import json_index
+
+
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from middleware.rate_limiter import rate_limiter
+
+    rate_limiter.start_sweeper()
+    await event_bus.start()
+    json_index.start()
+    endpoint_reaper.start()
+    ai_service.start()
+    forwarder.start()
+    yield
+    await endpoint_reaper.stop()
+    await rate_limiter.stop_sweeper()
+    rate_limiter.backend.close()
+    await endpoint_service.shutdown()
+    await ai_service.shutdown()
+    await forwarder.close()
+    await event_bus.stop()
+    await json_index.stop()
+    await manager.close()
+    endpoint_service.store.close()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -12,6 +47,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 allowed_origins = settings.get_allowed_origins()
@@ -25,44 +62,13 @@ app.add_middleware(
 )
 
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-
-    async def connect(self, endpoint_id: str, websocket: WebSocket):
-        await websocket.accept()
-        if endpoint_id not in self.active_connections:
-            self.active_connections[endpoint_id] = []
-        self.active_connections[endpoint_id].append(websocket)
-        print(f"✅ WebSocket connected for endpoint: {endpoint_id}")
-
-    def disconnect(self, endpoint_id: str, websocket: WebSocket):
-        if endpoint_id in self.active_connections:
-            self.active_connections[endpoint_id].remove(websocket)
-            if not self.active_connections[endpoint_id]:
-                del self.active_connections[endpoint_id]
-        print(f"❌ WebSocket disconnected for endpoint: {endpoint_id}")
-
-    async def broadcast_new_request(self, endpoint_id: str, request_data: dict):
-        if endpoint_id in self.active_connections:
-            dead_connections = []
-
-            for connection in self.active_connections[endpoint_id]:
-                try:
-                    await connection.send_json({
-                        "type": "new_request",
-                        "data": request_data
-                    })
-                    print(f"📤 Sent notification to WebSocket for {endpoint_id}")
-                except Exception as e:
-                    print(f"❌ Error sending to WebSocket: {e}")
-                    dead_connections.append(connection)
-
-            for dead in dead_connections:
-                self.disconnect(endpoint_id, dead)
-
-
-manager = ConnectionManager()
+manager = ConnectionManager(
+    max_queue=settings.WS_SEND_QUEUE_SIZE,
+    overflow_policy=settings.WS_OVERFLOW_POLICY,
+    bus=event_bus,
+    replay_limit=settings.EVENT_REPLAY_LIMIT,
+    keepalive_seconds=settings.SSE_KEEPALIVE_SECONDS
+)
 
 
 app.include_router(endpoints.router)
@@ -92,9 +98,39 @@ async def health_check():
     }
 
 
+@app.get("/stats")
+async def stats():
+    from middleware.usage_tracker import usage_tracker
+    from storage.body_json import body_json_cache
+
+    return {
+        "ai_usage": usage_tracker.get_stats(),
+        "ai_cache": ai_service.cache.get_stats() if ai_service.cache is not None else None,
+        "ai_generation": ai_service.get_stats(),
+        "mock_rules": mock_rules.get_stats() if mock_rules is not None else None,
+        "forwarding": forwarder.get_stats(),
+        "body_json_cache": body_json_cache.get_stats(),
+        "json_index": json_index.get_stats(),
+        "reaper": endpoint_reaper.get_stats(),
+        "storage": endpoint_service.store.get_stats(),
+        "websockets": manager.get_stats(),
+    }
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
 @app.websocket("/ws/{endpoint_id}")
-async def websocket_endpoint(websocket: WebSocket, endpoint_id: str):
-    await manager.connect(endpoint_id, websocket)
+async def websocket_endpoint(websocket: WebSocket, endpoint_id: str, since: Optional[int] = None):
+    # ?since=<last seq seen> replays only what a reconnecting viewer missed
+    await manager.connect(
+        endpoint_id, websocket,
+        since=since,
+        backlog=partial(endpoint_service.events_after, endpoint_id)
+    )
 
     try:
         while True:
@@ -102,12 +138,41 @@ async def websocket_endpoint(websocket: WebSocket, endpoint_id: str):
 
     except WebSocketDisconnect:
         manager.disconnect(endpoint_id, websocket)
-        print(f"🔌 Client disconnected from {endpoint_id}")
+        logger.info(f"🔌 Client disconnected from {endpoint_id}")
 
 
+from services.ai_service import ai_service
+from services.mock_rules import mock_rules
+from services.forwarder import forwarder
 from services.endpoint_service import endpoint_service
+from services.endpoint_reaper import endpoint_reaper
 
 endpoint_service.set_websocket_manager(manager)
+endpoint_reaper.set_websocket_manager(manager)
+
+
+def _store_stat(key: str):
+    def collect():
+        value = endpoint_service.store.get_stats().get(key)
+        return {(): value} if value is not None else {}
+    return collect
+
+
+metrics.gauge("store_endpoints", "Endpoints currently stored", _store_stat("endpoints"))
+metrics.gauge("store_requests", "Captured requests currently stored", _store_stat("requests"))
+metrics.gauge("store_memory_bytes", "Estimated bytes held by stored requests", _store_stat("memory_bytes"))
+metrics.gauge("ai_queue_pending", "AI generations waiting for a worker", lambda: {(): ai_service.jobs.pending})
+metrics.gauge("ai_queue_running", "AI generations in progress", lambda: {(): ai_service.jobs.running})
+metrics.gauge(
+    "ws_connections",
+    "Open WebSocket connections on this worker",
+    lambda: {(): sum(len(clients) for clients in manager.active_connections.values())}
+)
+metrics.gauge(
+    "ws_queue_depth",
+    "Messages waiting in the deepest WebSocket send queue",
+    lambda: {(): max((client.queue.qsize() for clients in manager.active_connections.values() for client in clients), default=0)}
+)
 
 if __name__ == "__main__":
     import uvicorn
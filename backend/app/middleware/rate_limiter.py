@@ -1,12 +1,47 @@
-from datetime import datetime, timedelta
-from typing import Dict
-from collections import defaultdict
+import time
+import asyncio
+from typing import Optional, Tuple
+
+from middleware.state_backend import StateBackend, MemoryStateBackend, state_backend
 
 
 class RateLimiter:
-    def __init__(self):
-        self.ai_calls: Dict[str, list] = defaultdict(list)
-        self.ip_calls: Dict[str, list] = defaultdict(list)
+    def __init__(
+            self,
+            backend: Optional[StateBackend] = None,
+            clock=time.monotonic,
+            idle_seconds: float = 2 * 3600,
+            sweep_every: int = 10_000
+    ):
+        self.backend = backend if backend is not None else MemoryStateBackend(
+            clock=clock,
+            idle_seconds=idle_seconds,
+            sweep_every=sweep_every
+        )
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def check_and_consume(
+            self,
+            key: str,
+            max_calls: int,
+            window_seconds: float = 3600
+    ) -> Tuple[bool, int]:
+        """Consume one call if allowed; returns (allowed, remaining calls)."""
+        return self.backend.check_and_consume(key, max_calls, window_seconds)
+
+    async def check_and_consume_async(
+            self,
+            key: str,
+            max_calls: int,
+            window_seconds: float = 3600
+    ) -> Tuple[bool, int]:
+        """``check_and_consume`` for the event loop: a shared backend runs in a worker thread."""
+        if not self.backend.blocking:
+            return self.backend.check_and_consume(key, max_calls, window_seconds)
+        return await asyncio.to_thread(self.backend.check_and_consume, key, max_calls, window_seconds)
+
+    def remaining(self, key: str, max_calls: int, window_seconds: float = 3600) -> int:
+        return self.backend.remaining(key, max_calls, window_seconds)
 
     def check_endpoint_limit(
             self,
@@ -14,19 +49,8 @@ class RateLimiter:
             max_calls: int = 10,
             window_minutes: int = 60
     ) -> bool:
-        now = datetime.now()
-        window_start = now - timedelta(minutes=window_minutes)
-
-        self.ai_calls[endpoint_id] = [
-            ts for ts in self.ai_calls[endpoint_id]
-            if ts > window_start
-        ]
-
-        if len(self.ai_calls[endpoint_id]) >= max_calls:
-            return False
-
-        self.ai_calls[endpoint_id].append(now)
-        return True
+        allowed, _ = self.check_and_consume(f"endpoint:{endpoint_id}", max_calls, window_minutes * 60)
+        return allowed
 
     def check_ip_limit(
             self,
@@ -34,30 +58,46 @@ class RateLimiter:
             max_calls: int = 20,
             window_minutes: int = 60
     ) -> bool:
-        now = datetime.now()
-        window_start = now - timedelta(minutes=window_minutes)
+        allowed, _ = self.check_and_consume(f"ip:{ip_address}", max_calls, window_minutes * 60)
+        return allowed
 
-        self.ip_calls[ip_address] = [
-            ts for ts in self.ip_calls[ip_address]
-            if ts > window_start
-        ]
+    async def check_ip_limit_async(self, ip_address: str, max_calls: int = 20, window_minutes: int = 60) -> bool:
+        allowed, _ = await self.check_and_consume_async(f"ip:{ip_address}", max_calls, window_minutes * 60)
+        return allowed
 
-        if len(self.ip_calls[ip_address]) >= max_calls:
-            return False
+    def get_remaining_calls(self, endpoint_id: str, max_calls: int = 10) -> int:
+        return self.remaining(f"endpoint:{endpoint_id}", max_calls)
 
-        self.ip_calls[ip_address].append(now)
-        return True
+    def forget_endpoint(self, endpoint_id: str) -> None:
+        self.backend.forget(f"endpoint:{endpoint_id}")
 
-    def get_remaining_calls(self, endpoint_id: str, max_calls: int = 10) -> int:
-        now = datetime.now()
-        window_start = now - timedelta(minutes=60)
+    def sweep(self) -> int:
+        """Drop keys that have been idle long enough to hold no state."""
+        return self.backend.sweep()
+
+    def start_sweeper(self, interval_seconds: float = 60) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_periodically(interval_seconds))
+
+    async def stop_sweeper(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
 
-        self.ai_calls[endpoint_id] = [
-            ts for ts in self.ai_calls[endpoint_id]
-            if ts > window_start
-        ]
+    def __len__(self) -> int:
+        return len(self.backend)
 
-        return max(0, max_calls - len(self.ai_calls[endpoint_id]))
+    async def _sweep_periodically(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            if self.backend.blocking:
+                await asyncio.to_thread(self.sweep)
+            else:
+                self.sweep()
 
 
-rate_limiter = RateLimiter()
\ No newline at end of file
+rate_limiter = RateLimiter(backend=state_backend)
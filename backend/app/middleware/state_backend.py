@@ -0,0 +1,388 @@
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.config import settings
+from core.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class SlidingWindow:
+    """Sliding-window counter: the current fixed window plus a weighted
+    share of the previous one approximates a true rolling window in O(1)."""
+
+    __slots__ = ("window_start", "current", "previous", "last_seen")
+
+    def __init__(self, window_start: float, current: int = 0, previous: int = 0):
+        self.window_start = window_start
+        self.current = current
+        self.previous = previous
+        self.last_seen = window_start
+
+    def advance(self, now: float, window: float) -> None:
+        elapsed_windows = int((now - self.window_start) // window)
+        if elapsed_windows <= 0:
+            return
+
+        self.previous = self.current if elapsed_windows == 1 else 0
+        self.current = 0
+        self.window_start += elapsed_windows * window
+
+    def estimate(self, now: float, window: float) -> float:
+        previous_weight = 1.0 - (now - self.window_start) / window
+        return self.previous * previous_weight + self.current
+
+    def consume(self, now: float, window: float, max_calls: int) -> Tuple[bool, int]:
+        used = self.estimate(now, window)
+        if used + 1 > max_calls:
+            return False, max(0, int(max_calls - used))
+
+        self.current += 1
+        return True, max(0, int(max_calls - used - 1))
+
+
+class StateBackend(ABC):
+    """Where rate-limit windows and usage counters live.
+
+    The memory backend is per process; the SQLite and Redis-protocol
+    backends are shared, so limits and cost accounting hold across workers.
+    ``blocking`` backends wait on a file lock or the network, so async
+    callers run them in a thread.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def check_and_consume(self, key: str, max_calls: int, window_seconds: float) -> Tuple[bool, int]:
+        ...
+
+    @abstractmethod
+    def remaining(self, key: str, max_calls: int, window_seconds: float) -> int:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str, amount: float = 1) -> float:
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> float:
+        ...
+
+    def sweep(self) -> int:
+        return 0
+
+    def forget(self, key: str) -> None:
+        """Drop a rate-limit window early (e.g. its endpoint was deleted)."""
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    def __init__(
+            self,
+            clock: Callable[[], float] = time.monotonic,
+            idle_seconds: float = 2 * 3600,
+            sweep_every: int = 10_000
+    ):
+        self._clock = clock
+        self.idle_seconds = idle_seconds
+        self.sweep_every = sweep_every
+        self._windows: Dict[str, SlidingWindow] = {}
+        self._counters: Dict[str, float] = {}
+        self._new_keys_since_sweep = 0
+
+    def check_and_consume(self, key: str, max_calls: int, window_seconds: float) -> Tuple[bool, int]:
+        now = self._clock()
+        state = self._windows.get(key)
+        if state is None:
+            state = self._windows[key] = SlidingWindow(now)
+            self._new_keys_since_sweep += 1
+            if self._new_keys_since_sweep >= self.sweep_every:
+                self.sweep()
+        else:
+            state.advance(now, window_seconds)
+
+        state.last_seen = now
+        return state.consume(now, window_seconds, max_calls)
+
+    def remaining(self, key: str, max_calls: int, window_seconds: float) -> int:
+        state = self._windows.get(key)
+        if state is None:
+            return max_calls
+
+        now = self._clock()
+        state.advance(now, window_seconds)
+        return max(0, int(max_calls - state.estimate(now, window_seconds)))
+
+    def incr(self, key: str, amount: float = 1) -> float:
+        value = self._counters.get(key, 0) + amount
+        self._counters[key] = value
+        return value
+
+    def get(self, key: str) -> float:
+        return self._counters.get(key, 0)
+
+    def sweep(self) -> int:
+        cutoff = self._clock() - self.idle_seconds
+        idle_keys = [key for key, state in self._windows.items() if state.last_seen < cutoff]
+        for key in idle_keys:
+            del self._windows[key]
+        self._new_keys_since_sweep = 0
+        return len(idle_keys)
+
+    def forget(self, key: str) -> None:
+        self._windows.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+
+class SQLiteStateBackend(StateBackend):
+    """Shares windows and counters through one SQLite file.
+
+    Every check is a short BEGIN IMMEDIATE transaction, so concurrent workers
+    serialize on the write lock and never over-admit.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, idle_seconds: float = 2 * 3600):
+        self._clock = clock
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rate_windows (
+                key TEXT PRIMARY KEY,
+                window_start REAL NOT NULL,
+                current INTEGER NOT NULL,
+                previous INTEGER NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_rate_windows_last_seen ON rate_windows (last_seen);
+            CREATE TABLE IF NOT EXISTS counters (
+                key TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+        """)
+
+    def check_and_consume(self, key: str, max_calls: int, window_seconds: float) -> Tuple[bool, int]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                state = self._load_window(key, now, window_seconds)
+                allowed, remaining = state.consume(now, window_seconds, max_calls)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_windows (key, window_start, current, previous, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, state.window_start, state.current, state.previous, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return allowed, remaining
+
+    def remaining(self, key: str, max_calls: int, window_seconds: float) -> int:
+        with self._lock:
+            now = self._clock()
+            state = self._load_window(key, now, window_seconds)
+        return max(0, int(max_calls - state.estimate(now, window_seconds)))
+
+    def incr(self, key: str, amount: float = 1) -> float:
+        with self._lock:
+            return self._conn.execute(
+                "INSERT INTO counters (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value "
+                "RETURNING value",
+                (key, amount)
+            ).fetchone()[0]
+
+    def get(self, key: str) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def sweep(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM rate_windows WHERE last_seen < ?",
+                (self._clock() - self.idle_seconds,)
+            )
+        return cursor.rowcount
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_windows WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _load_window(self, key: str, now: float, window_seconds: float) -> SlidingWindow:
+        row = self._conn.execute(
+            "SELECT window_start, current, previous FROM rate_windows WHERE key = ?",
+            (key,)
+        ).fetchone()
+
+        if row is None:
+            return SlidingWindow(now - now % window_seconds)
+
+        state = SlidingWindow(row[0], current=row[1], previous=row[2])
+        state.advance(now, window_seconds)
+        return state
+
+
+class RedisStateBackend(StateBackend):
+    """Windows and counters on a Redis-protocol server.
+
+    Windows are epoch-aligned bucket keys that expire on their own. A check
+    increments the current bucket first and rolls the increment back if it
+    went over the limit, so the INCR itself is the atomic step.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "webhook-debugger:", clock: Callable[[], float] = time.time):
+        self.client = client
+        self.prefix = prefix
+        self._clock = clock
+
+    def check_and_consume(self, key: str, max_calls: int, window_seconds: float) -> Tuple[bool, int]:
+        now = self._clock()
+        current_key, previous_key, previous_weight = self._bucket_keys(key, now, window_seconds)
+
+        current, _, previous = self.client.pipeline(
+            ("INCR", current_key),
+            ("EXPIRE", current_key, int(window_seconds * 2)),
+            ("GET", previous_key)
+        )
+        used = int(previous or 0) * previous_weight + current - 1
+
+        if used + 1 > max_calls:
+            self.client.execute("DECR", current_key)
+            return False, max(0, int(max_calls - used))
+
+        return True, max(0, int(max_calls - used - 1))
+
+    def remaining(self, key: str, max_calls: int, window_seconds: float) -> int:
+        now = self._clock()
+        current_key, previous_key, previous_weight = self._bucket_keys(key, now, window_seconds)
+
+        current, previous = self.client.pipeline(("GET", current_key), ("GET", previous_key))
+        used = int(previous or 0) * previous_weight + int(current or 0)
+        return max(0, int(max_calls - used))
+
+    def incr(self, key: str, amount: float = 1) -> float:
+        return float(self.client.execute("INCRBYFLOAT", self.prefix + key, amount))
+
+    def get(self, key: str) -> float:
+        value = self.client.execute("GET", self.prefix + key)
+        return float(value) if value is not None else 0
+
+    def close(self) -> None:
+        self.client.close()
+
+    def _bucket_keys(self, key: str, now: float, window_seconds: float) -> Tuple[str, str, float]:
+        bucket = int(now // window_seconds)
+        previous_weight = 1.0 - (now - bucket * window_seconds) / window_seconds
+        base = f"{self.prefix}rl:{key}:"
+        return f"{base}{bucket}", f"{base}{bucket - 1}", previous_weight
+
+
+class FailoverStateBackend(StateBackend):
+    """A shared backend that falls back to this worker's memory when it fails.
+
+    Rate limiting and usage accounting must never cost a capture. While the
+    shared store is erroring, calls are answered by a local
+    ``MemoryStateBackend`` (per-worker limits instead of shared ones), and
+    the shared store is only tried again after ``retry_seconds``.
+    """
+
+    def __init__(
+            self,
+            primary: StateBackend,
+            fallback: Optional[StateBackend] = None,
+            retry_seconds: float = 30,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.primary = primary
+        self.fallback = fallback if fallback is not None else MemoryStateBackend()
+        self.retry_seconds = retry_seconds
+        self.failures = 0
+        self._clock = clock
+        self._retry_at = 0.0
+
+    @property
+    def blocking(self) -> bool:
+        return self.primary.blocking
+
+    @property
+    def degraded(self) -> bool:
+        return self._clock() < self._retry_at
+
+    def check_and_consume(self, key: str, max_calls: int, window_seconds: float) -> Tuple[bool, int]:
+        return self._call("check_and_consume", key, max_calls, window_seconds)
+
+    def remaining(self, key: str, max_calls: int, window_seconds: float) -> int:
+        return self._call("remaining", key, max_calls, window_seconds)
+
+    def incr(self, key: str, amount: float = 1) -> float:
+        return self._call("incr", key, amount)
+
+    def get(self, key: str) -> float:
+        return self._call("get", key)
+
+    def sweep(self) -> int:
+        failures, degraded = self.failures, self.degraded
+        swept = self._call("sweep")
+        if not degraded and self.failures == failures:
+            # The primary answered; windows from an earlier degraded spell are still in the fallback
+            swept += self.fallback.sweep()
+        return swept
+
+    def forget(self, key: str) -> None:
+        self.fallback.forget(key)
+        self._call("forget", key)
+
+    def close(self) -> None:
+        self.primary.close()
+
+    def __len__(self) -> int:
+        return len(self.fallback)
+
+    def _call(self, method: str, *args: Any) -> Any:
+        if not self.degraded:
+            try:
+                return getattr(self.primary, method)(*args)
+            except Exception as e:
+                self.failures += 1
+                self._retry_at = self._clock() + self.retry_seconds
+                logger.error(
+                    f"❌ {type(self.primary).__name__} failed ({e}); "
+                    f"using per-worker state for {self.retry_seconds:g}s"
+                )
+        return getattr(self.fallback, method)(*args)
+
+
+def create_state_backend() -> StateBackend:
+    if settings.STATE_BACKEND == "sqlite":
+        return FailoverStateBackend(SQLiteStateBackend(settings.STATE_SQLITE_PATH))
+
+    if settings.STATE_BACKEND == "redis":
+        from core.resp_client import RespClient
+
+        return FailoverStateBackend(RedisStateBackend(RespClient.from_url(settings.REDIS_URL)))
+
+    return MemoryStateBackend()
+
+
+state_backend = create_state_backend()
@@ -1,33 +1,84 @@
+import asyncio
 from datetime import datetime
-from collections import defaultdict
+from typing import Any, Callable, Optional
+
+from core.log import get_logger
+from middleware.state_backend import StateBackend, MemoryStateBackend, state_backend
+
+
+logger = get_logger(__name__)
 
 
 class UsageTracker:
-    def __init__(self):
-        self.total_ai_calls = 0
-        self.daily_calls = defaultdict(int)
-        self.estimated_cost = 0.0
+    def __init__(self, backend: Optional[StateBackend] = None):
+        self.backend = backend if backend is not None else MemoryStateBackend()
+
+    @property
+    def total_ai_calls(self) -> int:
+        return int(self.backend.get("usage:total_calls"))
+
+    @property
+    def estimated_cost(self) -> float:
+        return self.backend.get("usage:estimated_cost")
+
+    @property
+    def cache_hits(self) -> int:
+        return int(self.backend.get("usage:cache_hits"))
 
-    def track_call(self, tokens_used: int = 512):
-        self.total_ai_calls += 1
+    @property
+    def cache_misses(self) -> int:
+        return int(self.backend.get("usage:cache_misses"))
+
+    def track_call(self, input_tokens: int, output_tokens: int):
+        self._offload(self._record_call, input_tokens, output_tokens)
+
+    def track_cache_hit(self):
+        self._offload(self.backend.incr, "usage:cache_hits")
+
+    def track_cache_miss(self):
+        self._offload(self.backend.incr, "usage:cache_misses")
+
+    def _record_call(self, input_tokens: int, output_tokens: int) -> None:
+        self.backend.incr("usage:total_calls")
         today = datetime.now().date().isoformat()
-        self.daily_calls[today] += 1
+        today_calls = int(self.backend.incr(f"usage:daily:{today}"))
+
+        input_cost_per_token = 0.000003
+        output_cost_per_token = 0.000015
+        call_cost = input_tokens * input_cost_per_token + output_tokens * output_cost_per_token
+        self.backend.incr("usage:estimated_cost", call_cost)
+
+        if today_calls > 100:
+            logger.warning(f"🚨 WARNING: {today_calls} AI calls today!")
+            logger.info(f"💰 Estimated cost today: ${today_calls * 0.003:.2f}")
 
-        cost_per_token = 0.000003
-        call_cost = tokens_used * cost_per_token
-        self.estimated_cost += call_cost
+    def _offload(self, update: Callable[..., Any], *args: Any) -> None:
+        """Apply a counter update, on a worker thread when the backend may block the event loop.
 
-        if self.daily_calls[today] > 100:
-            print(f"🚨 WARNING: {self.daily_calls[today]} AI calls today!")
-            print(f"💰 Estimated cost today: ${self.daily_calls[today] * 0.003:.2f}")
+        Nothing waits for the result: the counters are statistics.
+        """
+        if self.backend.blocking:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                loop.run_in_executor(None, update, *args)
+                return
+        update(*args)
 
     def get_stats(self):
         today = datetime.now().date().isoformat()
+        cache_hits = self.cache_hits
+        cache_lookups = cache_hits + self.cache_misses
         return {
             "total_calls": self.total_ai_calls,
-            "today_calls": self.daily_calls[today],
-            "estimated_cost": round(self.estimated_cost, 4)
+            "today_calls": int(self.backend.get(f"usage:daily:{today}")),
+            "estimated_cost": round(self.estimated_cost, 4),
+            "cache_hits": cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(cache_hits / cache_lookups, 4) if cache_lookups else 0.0
         }
 
 
-usage_tracker = UsageTracker()
\ No newline at end of file
+usage_tracker = UsageTracker(backend=state_backend)
@@ -1,9 +1,80 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional,Dict,Any
+from typing import Optional,Dict,Any,List,Union,Literal
+
+from core.config import settings
+
+
+class LatencyProfile(BaseModel):
+    distribution: Literal["none", "fixed", "uniform", "percentiles"] = "none"
+    ms: float = Field(default=0, ge=0, description="Delay for the fixed distribution")
+    min_ms: float = Field(default=0, ge=0, description="Lower bound for the uniform distribution")
+    max_ms: float = Field(default=0, ge=0, description="Upper bound for the uniform distribution")
+    p50_ms: float = Field(default=0, ge=0, description="Median delay for the percentiles distribution")
+    p99_ms: float = Field(default=0, ge=0, description="99th percentile delay for the percentiles distribution")
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.distribution == "uniform" and self.max_ms < self.min_ms:
+            raise ValueError("max_ms must be at least min_ms")
+        if self.distribution == "percentiles" and self.p99_ms < self.p50_ms:
+            raise ValueError("p99_ms must be at least p50_ms")
+        return self
+
+
+class ResponseConfig(BaseModel):
+    mode: Literal["envelope", "mock"] = Field(
+        default="envelope",
+        description="envelope: reply with the debugger's receipt; mock: reply with the mock itself"
+    )
+    status_code: Optional[int] = Field(default=None, ge=100, le=599)
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = Field(
+        default=None,
+        description="Fixed response body; when unset the rule or AI mock is returned"
+    )
+    latency: LatencyProfile = LatencyProfile()
+
+
+class ForwardConfig(BaseModel):
+    target_url: Optional[str] = Field(
+        default=None,
+        description="Every new webhook is also sent here; null stops forwarding"
+    )
+
+
+class ReplayCreate(BaseModel):
+    target_url: str
+    limit: int = Field(
+        default=100,
+        ge=1,
+        le=settings.REPLAY_MAX_REQUESTS,
+        description="Replay the most recent requests, oldest first"
+    )
+    request_ids: Optional[List[str]] = Field(
+        default=None,
+        max_length=settings.REPLAY_MAX_REQUESTS,
+        description="Replay exactly these requests instead of the most recent ones"
+    )
+    rps: Optional[float] = Field(default=None, gt=0, description="Send rate cap; unset sends as fast as concurrency allows")
+    concurrency: int = Field(default=10, ge=1, le=settings.FORWARD_MAX_CONNECTIONS)
+
 
 class EndpointCreate(BaseModel):
     name: Optional[str] = None
+    max_requests: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=settings.MAX_REQUESTS_PER_ENDPOINT_LIMIT,
+        description="History capacity for this endpoint (defaults to MAX_REQUESTS_PER_ENDPOINT)"
+    )
+    ttl_seconds: Optional[int] = Field(
+        default=None,
+        ge=60,
+        le=settings.ENDPOINT_MAX_TTL_SECONDS or None,
+        description="Seconds until the endpoint expires (defaults to ENDPOINT_TTL_SECONDS)"
+    )
+    response: Optional[ResponseConfig] = None
 
 
 class EndpointResponse(BaseModel):
@@ -11,6 +82,10 @@ class EndpointResponse(BaseModel):
     url: str
     name: Optional[str] = None
     created_at: datetime
+    max_requests: Optional[int] = None
+    expires_at: Optional[datetime] = None
+    response: Optional[ResponseConfig] = None
+    forward_url: Optional[str] = None
 
 
 class WebhookRequest(BaseModel):
@@ -18,9 +93,12 @@ class WebhookRequest(BaseModel):
     timestamp: datetime
     method: str
     headers: Dict[str, str]
-    body_raw: str
+    body_raw: Union[str, bytes]
     body_json: Optional[Dict[str, Any]] = None
+    body_encoding: str = "utf-8"
+    body_truncated: bool = False
     content_type: Optional[str] = None
     content_length: int = 0
     ip_address: Optional[str] = None
-    query_params: Dict[str, str] = {}
\ No newline at end of file
+    query_params: Dict[str, str] = {}
+    seq: int = Field(default=0, description="Per-endpoint event sequence number (SSE event id / WebSocket since=)")
\ No newline at end of file
@@ -0,0 +1,150 @@
+import time
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+
+Job = Callable[[], Awaitable[Any]]
+
+WAIT_SAMPLES = 1000
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class AIJobQueue:
+    """Bounded job queue drained by a fixed pool of worker tasks.
+
+    ``workers`` is the global cap on concurrent generations. Jobs wait in
+    one FIFO per endpoint and workers take from the endpoints round-robin,
+    so an endpoint with a thousand queued jobs delays a quiet endpoint's
+    job by at most one turn. Once ``max_pending`` jobs are waiting,
+    ``submit`` raises ``QueueFullError`` and the caller decides whether to
+    reject or degrade.
+
+    Workers run from ``start()`` to ``stop()``, which the app lifespan
+    calls; submitting outside that window is an error.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 1000):
+        self.worker_count = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._queues: Dict[str, Deque[Tuple[Job, asyncio.Future, float]]] = {}
+        self._ready: Deque[str] = deque()
+        self._available: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.pending = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.max_wait = 0.0
+
+    @property
+    def full(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def submit(self, endpoint_id: str, job: Job) -> asyncio.Future:
+        """Queue ``job`` (a coroutine function) and return a future for its result."""
+        if not self._workers:
+            raise RuntimeError("AI job queue is not started")
+        if self.full:
+            self.rejected += 1
+            raise QueueFullError(f"AI job queue is full ({self.max_pending} pending)")
+
+        future = asyncio.get_running_loop().create_future()
+
+        queue = self._queues.get(endpoint_id)
+        if queue is None:
+            queue = self._queues[endpoint_id] = deque()
+            self._ready.append(endpoint_id)
+        queue.append((job, future, time.monotonic()))
+
+        self.pending += 1
+        self.submitted += 1
+        self._available.release()
+        return future
+
+    def start(self) -> None:
+        if self._workers:
+            return
+
+        self._available = asyncio.Semaphore(0)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"ai-worker-{number}")
+            for number in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        for queue in self._queues.values():
+            for _, future, _ in queue:
+                future.cancel()
+        self._queues.clear()
+        self._ready.clear()
+        self._available = None
+        self.pending = 0
+        self.running = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "workers": self.worker_count,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "running": self.running,
+            "endpoints_waiting": len(self._queues),
+            "deepest_endpoint_queue": max((len(queue) for queue in self._queues.values()), default=0),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+            "p95_wait_ms": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2)
+        }
+
+    def _next_job(self) -> Tuple[Job, asyncio.Future, float]:
+        endpoint_id = self._ready.popleft()
+        queue = self._queues[endpoint_id]
+        entry = queue.popleft()
+        if queue:
+            self._ready.append(endpoint_id)
+        else:
+            del self._queues[endpoint_id]
+        self.pending -= 1
+        return entry
+
+    async def _work(self) -> None:
+        while True:
+            await self._available.acquire()
+            job, future, enqueued_at = self._next_job()
+            if future.done():
+                continue
+
+            wait = time.monotonic() - enqueued_at
+            self._waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+
+            self.running += 1
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.running -= 1
+                self.completed += 1
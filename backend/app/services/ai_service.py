@@ -1,22 +1,70 @@
 import json
-from typing import Optional, Dict, Any
-from anthropic import Anthropic
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+from anthropic import AsyncAnthropic
 from core.config import settings
+from core.log import Sampler, get_logger
+from core.metrics import AI_OUTCOMES, AI_SECONDS, AI_TOKENS, RATE_LIMIT_REJECTIONS
+from services.ai_job_queue import AIJobQueue, QueueFullError
+from services.micro_batcher import MicroBatcher
+from services.mock_cache import mock_cache, fingerprint_request
+from storage.body_json import parse_request_json
+
+
+logger = get_logger(__name__)
+log_rate_limited = Sampler()
+
+
+AI_MODEL = "claude-sonnet-4-5-20250929"
+
+OVERFLOW_REJECT = "reject"
+OVERFLOW_DEGRADE = "degrade"
+
+# Job queue key for micro-batches, which mix requests from several endpoints
+BATCH_QUEUE = "batch"
 
 
 class AIService:
     def __init__(self):
+        self._semaphore = asyncio.Semaphore(max(1, settings.AI_MAX_CONCURRENT_CALLS))
+        self.timeout = settings.AI_TIMEOUT_SECONDS
+        self.cache = mock_cache if settings.AI_CACHE_ENABLED else None
+        self.coalesce = settings.AI_COALESCE_REQUESTS
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+        self.model_calls = 0
+
+        self.jobs = AIJobQueue(
+            workers=settings.AI_MAX_CONCURRENT_CALLS,
+            max_pending=settings.AI_QUEUE_MAX_PENDING
+        )
+        self.overflow_policy = settings.AI_QUEUE_OVERFLOW
+        self.overflowed = 0
+
+        self.batcher = None
+        if settings.AI_BATCH_WINDOW_MS > 0:
+            self.batcher = MicroBatcher(
+                self._run_batch,
+                window_seconds=settings.AI_BATCH_WINDOW_MS / 1000,
+                max_size=settings.AI_BATCH_MAX_SIZE
+            )
+
         if settings.ANTHROPIC_API_KEY and settings.AI_ENABLED:
-            self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+            self.client = AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                timeout=settings.AI_TIMEOUT_SECONDS
+            )
             self.enabled = True
-            print("🤖 AI Service enabled")
+            logger.info("🤖 AI Service enabled")
         else:
             self.client = None
             self.enabled = False
             if not settings.ANTHROPIC_API_KEY:
-                print("⚠️  AI Service disabled - no API key configured")
+                logger.warning("⚠️  AI Service disabled - no API key configured")
             else:
-                print("⚠️  AI Service disabled - AI_ENABLED=false")
+                logger.warning("⚠️  AI Service disabled - AI_ENABLED=false")
 
     async def generate_mock_response(
             self,
@@ -30,15 +78,52 @@ class AIService:
         from middleware.rate_limiter import rate_limiter
         from middleware.usage_tracker import usage_tracker
 
-        if not rate_limiter.check_endpoint_limit(
-                endpoint_id,
-                max_calls=settings.AI_CALLS_PER_ENDPOINT_PER_HOUR
-        ):
-            remaining = rate_limiter.get_remaining_calls(
-                endpoint_id,
-                settings.AI_CALLS_PER_ENDPOINT_PER_HOUR
+        shape_key = None
+        if self.cache is not None or self.coalesce:
+            # A private parse: the shared body cache is only filled when a client reads body_json
+            shape_key = fingerprint_request(
+                webhook_data.get("method", "POST"),
+                webhook_data.get("headers", {}),
+                parse_request_json(webhook_data),
+                webhook_data.get("body_raw")
             )
-            print(f"⚠️  Rate limit exceeded for endpoint {endpoint_id}")
+
+        if self.cache is not None:
+            cached = self.cache.get(shape_key)
+            if cached is not None:
+                usage_tracker.track_cache_hit()
+                AI_OUTCOMES.labels("cache_hit").inc()
+                return {
+                    **cached,
+                    "source": "cache",
+                    "generated_at": webhook_data.get("timestamp")
+                }
+            usage_tracker.track_cache_miss()
+
+        if self.coalesce:
+            in_flight = self._in_flight.get(shape_key)
+            if in_flight is not None:
+                self.coalesced += 1
+                AI_OUTCOMES.labels("coalesced").inc()
+                result = await asyncio.shield(in_flight)
+                return {
+                    **result,
+                    "generated_at": webhook_data.get("timestamp"),
+                    "coalesced": True
+                }
+
+        if self.jobs.full:
+            return self._overflow_result(webhook_data)
+
+        allowed, remaining = await rate_limiter.check_and_consume_async(
+            f"endpoint:{endpoint_id}",
+            max_calls=settings.AI_CALLS_PER_ENDPOINT_PER_HOUR
+        )
+        if not allowed:
+            RATE_LIMIT_REJECTIONS.labels("endpoint").inc()
+            AI_OUTCOMES.labels("rate_limited").inc()
+            if log_rate_limited():
+                logger.warning(f"⚠️  Rate limit exceeded for endpoint {endpoint_id}")
             return {
                 "error": "AI rate limit exceeded",
                 "message": f"This endpoint has reached its AI generation limit ({settings.AI_CALLS_PER_ENDPOINT_PER_HOUR}/hour). Remaining: {remaining}",
@@ -47,11 +132,14 @@ class AIService:
                 "remaining": remaining
             }
 
-        if ip_address and not rate_limiter.check_ip_limit(
+        if ip_address and not await rate_limiter.check_ip_limit_async(
                 ip_address,
                 max_calls=settings.AI_CALLS_PER_IP_PER_HOUR
         ):
-            print(f"⚠️  Rate limit exceeded for IP {ip_address}")
+            RATE_LIMIT_REJECTIONS.labels("ip").inc()
+            AI_OUTCOMES.labels("rate_limited").inc()
+            if log_rate_limited():
+                logger.warning(f"⚠️  Rate limit exceeded for IP {ip_address}")
             return {
                 "error": "AI rate limit exceeded",
                 "message": f"Too many AI requests from your IP ({settings.AI_CALLS_PER_IP_PER_HOUR}/hour). Try again later.",
@@ -59,49 +147,197 @@ class AIService:
                 "limit": settings.AI_CALLS_PER_IP_PER_HOUR
             }
 
+        generation = asyncio.ensure_future(self._generate(webhook_data, endpoint_id, shape_key))
+
+        if not self.coalesce:
+            return await generation
+
+        # Single flight: identical-shape requests arriving while this one is
+        # queued or generating await the same future. Shielding keeps one
+        # caller's cancellation from failing the others.
+        self._in_flight[shape_key] = generation
+        generation.add_done_callback(lambda _: self._finish_flight(shape_key, generation))
+        return await asyncio.shield(generation)
+
+    def start(self) -> None:
+        self.jobs.start()
+
+    async def shutdown(self) -> None:
+        await self.jobs.stop()
+        self._in_flight.clear()
+        if self.batcher is not None:
+            await self.batcher.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "model_calls": self.model_calls,
+            "in_flight": len(self._in_flight),
+            "coalesced": self.coalesced,
+            "overflowed": self.overflowed,
+            "overflow_policy": self.overflow_policy,
+            "queue": self.jobs.get_stats(),
+            "batching": self.batcher.get_stats() if self.batcher is not None else None
+        }
+
+    async def _generate(
+            self,
+            webhook_data: Dict[str, Any],
+            endpoint_id: str,
+            cache_key: Optional[str]
+    ) -> Dict[str, Any]:
         try:
             method = webhook_data.get("method", "POST")
             body = webhook_data.get("body_raw", "")
+            if webhook_data.get("body_encoding", "utf-8") != "utf-8":
+                body = f"<binary body, {webhook_data.get('content_length', 0)} bytes>"
             headers = webhook_data.get("headers", {})
 
-            prompt = self._build_prompt(method, body, headers)
-
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=settings.MAX_AI_TOKENS,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            item = (method, body, headers)
+            # Batching happens before the job queue: a batch is one job, so it
+            # holds one worker and can grow past the worker count
+            if self.batcher is not None:
+                mock_response, tokens_used = await self.batcher.submit(item)
+            else:
+                mock_response, tokens_used = await self.jobs.submit(
+                    endpoint_id,
+                    lambda: self._timed(self._generate_one(item))
+                )
 
-            response_text = message.content[0].text
-            mock_response = self._extract_json(response_text)
+            result = {
+                "mock_response": mock_response,
+                "ai_model": AI_MODEL,
+                "source": "ai",
+                "generated_at": webhook_data.get("timestamp"),
+                "tokens_used": tokens_used
+            }
 
-            tokens_used = len(response_text) // 4
-            usage_tracker.track_call(tokens_used)
+            raw_text = isinstance(mock_response, dict) and mock_response.get("raw")
+            if cache_key is not None and self.cache is not None and not raw_text:
+                self.cache.put(cache_key, {
+                    "mock_response": mock_response,
+                    "ai_model": result["ai_model"],
+                    "tokens_used": tokens_used
+                })
 
-            stats = usage_tracker.get_stats()
-            print(f"✅ AI response generated (tokens: ~{tokens_used})")
-            print(
-                f"📊 Total AI calls: {stats['total_calls']} | Today: {stats['today_calls']} | Cost: ${stats['estimated_cost']:.4f}")
+            AI_OUTCOMES.labels("generated").inc()
+            return result
+
+        except QueueFullError:
+            return self._overflow_result(webhook_data)
 
+        except asyncio.TimeoutError:
+            AI_OUTCOMES.labels("error").inc()
+            logger.warning(f"⏱️  AI generation timed out after {self.timeout}s for endpoint {endpoint_id}")
             return {
-                "mock_response": mock_response,
-                "ai_model": "claude-sonnet-4-5-20250929",
-                "generated_at": webhook_data.get("timestamp"),
-                "tokens_used": tokens_used
+                "error": "AI generation timed out",
+                "message": f"No response from the model within {self.timeout} seconds"
             }
 
         except Exception as e:
-            print(f"❌ AI Service error: {e}")
+            AI_OUTCOMES.labels("error").inc()
+            logger.error(f"❌ AI Service error: {e}")
             return {
                 "error": "AI generation failed",
                 "message": str(e)
             }
 
+    def _overflow_result(self, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
+        """What a request gets when the job queue is full: an error, or a generic mock."""
+        self.overflowed += 1
+        AI_OUTCOMES.labels("overflow").inc()
+        if self.overflow_policy == OVERFLOW_DEGRADE:
+            return {
+                "mock_response": {"received": True},
+                "source": "static",
+                "generated_at": webhook_data.get("timestamp"),
+                "tokens_used": 0,
+                "degraded": True
+            }
+        return {
+            "error": "AI queue full",
+            "message": f"Too many AI generations pending ({self.jobs.max_pending}). Try again shortly.",
+            "queue_full": True
+        }
+
+    def _finish_flight(self, shape_key: str, generation: asyncio.Future) -> None:
+        if self._in_flight.get(shape_key) is generation:
+            del self._in_flight[shape_key]
+
+    async def _run_batch(self, items: List[Tuple[str, Any, Dict]]) -> List[Tuple[Any, int]]:
+        """Generate a micro-batch as a single job on the shared queue."""
+        return await self.jobs.submit(BATCH_QUEUE, lambda: self._timed(self._generate_batch(items)))
+
+    @staticmethod
+    async def _timed(generation: Awaitable[Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await generation
+        finally:
+            AI_SECONDS.observe(time.perf_counter() - started)
+
+    async def _generate_one(self, item: Tuple[str, Any, Dict]) -> Tuple[Any, int]:
+        method, body, headers = item
+        response_text, tokens_used = await self._call_model(
+            self._build_prompt(method, body, headers),
+            settings.MAX_AI_TOKENS
+        )
+        return self._extract_json(response_text), tokens_used
+
+    async def _generate_batch(self, items: List[Tuple[str, Any, Dict]]) -> List[Tuple[Any, int]]:
+        """One model call for several distinct requests.
+
+        Falls back to one call per request if the reply is not a JSON array
+        with exactly one mock per request.
+        """
+        if len(items) == 1:
+            return [await self._generate_one(items[0])]
+
+        response_text, tokens_used = await self._call_model(
+            self._build_batch_prompt(items),
+            settings.MAX_AI_TOKENS * len(items)
+        )
+        mocks = self._extract_json(response_text)
+        if not isinstance(mocks, list) or len(mocks) != len(items):
+            logger.warning(f"⚠️  Batched AI reply did not match {len(items)} requests, generating individually")
+            return list(await asyncio.gather(*(self._generate_one(item) for item in items)))
+
+        tokens_each = tokens_used // len(items)
+        return [(mock, tokens_each) for mock in mocks]
+
+    async def _call_model(self, prompt: str, max_tokens: int) -> Tuple[str, int]:
+        """The reply text and the tokens the call used, as reported by the API."""
+        from middleware.usage_tracker import usage_tracker
+
+        async with self._semaphore:
+            message = await asyncio.wait_for(
+                self.client.messages.create(
+                    model=AI_MODEL,
+                    max_tokens=max_tokens,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ]
+                ),
+                timeout=self.timeout
+            )
+        self.model_calls += 1
+
+        response_text = message.content[0].text
+        input_tokens, output_tokens = message.usage.input_tokens, message.usage.output_tokens
+        AI_TOKENS.labels("input").inc(input_tokens)
+        AI_TOKENS.labels("output").inc(output_tokens)
+        usage_tracker.track_call(input_tokens, output_tokens)
+
+        logger.info(f"✅ AI response generated (tokens: {input_tokens} in, {output_tokens} out)")
+        if logger.isEnabledFor(logging.DEBUG):
+            stats = usage_tracker.get_stats()
+            logger.debug(
+                f"📊 Total AI calls: {stats['total_calls']} | Today: {stats['today_calls']} | Cost: ${stats['estimated_cost']:.4f}")
+
+        return response_text, input_tokens + output_tokens
+
     def _build_prompt(self, method: str, body: str, headers: Dict) -> str:
         return f"""You are an API mock response generator. Analyze this webhook request and generate an appropriate JSON response.
 
@@ -128,7 +364,27 @@ Example for payment webhook:
 
 Now generate a mock response for the above request:"""
 
-    def _extract_json(self, text: str) -> Dict[str, Any]:
+    def _build_batch_prompt(self, items: List[Tuple[str, Any, Dict]]) -> str:
+        requests = "\n\n".join(
+            f"REQUEST {number}:\nMETHOD: {method}\nBODY: {body if body else 'Empty'}"
+            for number, (method, body, _) in enumerate(items, start=1)
+        )
+        return f"""You are an API mock response generator. Analyze each of these {len(items)} webhook requests and generate an appropriate JSON response for each.
+
+{requests}
+
+Generate realistic mock responses that:
+1. Match each request's context (e.g., payment webhooks get payment confirmations)
+2. Include appropriate status codes and messages
+3. Contain realistic IDs, timestamps, and data
+4. Follow REST API best practices
+5. Are CONCISE - keep each response under 200 characters when possible
+
+Respond ONLY with a JSON array of exactly {len(items)} objects, one per request, in the same order. No explanations, no markdown, just the JSON array.
+
+Now generate the mock responses for the above requests:"""
+
+    def _extract_json(self, text: str) -> Any:
         text = text.strip()
 
         if text.startswith("```json"):
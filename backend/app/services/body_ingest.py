@@ -0,0 +1,119 @@
+import codecs
+import asyncio
+from typing import AsyncIterator, BinaryIO, Union
+
+from storage.body_spool import BodySpool
+
+
+ENCODING_UTF8 = "utf-8"
+ENCODING_BASE64 = "base64"
+
+
+class BodyTooLargeError(Exception):
+    pass
+
+
+class IngestedBody:
+    """A request body read in chunks.
+
+    Small bodies are kept inline; once ``spill_threshold`` is crossed the
+    body goes to the spool and only a ``preview`` prefix stays in memory.
+    Text is detected incrementally, so binary payloads are kept as bytes.
+    """
+
+    __slots__ = ("size", "content", "is_text", "spilled")
+
+    def __init__(self, size: int, content: bytes, is_text: bool, spilled: bool):
+        self.size = size
+        self.content = content
+        self.is_text = is_text
+        self.spilled = spilled
+
+    @property
+    def encoding(self) -> str:
+        return ENCODING_UTF8 if self.is_text else ENCODING_BASE64
+
+    @property
+    def raw(self) -> Union[str, bytes]:
+        """Inline body (or preview) - text when it decodes, bytes otherwise."""
+        if not self.is_text:
+            return self.content
+        # A preview may end mid-character; drop the partial sequence
+        return codecs.getincrementaldecoder(ENCODING_UTF8)().decode(self.content, final=not self.spilled)
+
+
+async def ingest_body(
+        chunks: AsyncIterator[bytes],
+        request_id: str,
+        spool: BodySpool,
+        spill_threshold: int,
+        preview_bytes: int,
+        max_bytes: int = 0
+) -> IngestedBody:
+    buffer = bytearray()
+    decoder = codecs.getincrementaldecoder(ENCODING_UTF8)()
+    is_text = True
+    size = 0
+    spill_file = None
+
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise BodyTooLargeError(f"Body exceeds {max_bytes} bytes")
+
+            if is_text:
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    is_text = False
+
+            # Disk I/O goes to a worker thread so a slow disk doesn't stall every other request
+            if spill_file is None and size > spill_threshold:
+                spill_file = await asyncio.to_thread(spool.open_for_write, request_id)
+                await asyncio.to_thread(spill_file.write, buffer)
+                del buffer[preview_bytes:]
+
+            if spill_file is not None:
+                await asyncio.to_thread(spill_file.write, chunk)
+                if len(buffer) < preview_bytes:
+                    buffer += chunk[:preview_bytes - len(buffer)]
+            else:
+                buffer += chunk
+
+        if is_text:
+            try:
+                decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                is_text = False
+    except BaseException:
+        if spill_file is not None:
+            # Inline rather than in a thread: this also has to run when the task is cancelled
+            _abandon(spool, request_id, spill_file)
+        raise
+
+    if spill_file is not None:
+        try:
+            await asyncio.to_thread(_finish, spool, request_id, spill_file)
+        except BaseException:
+            _abandon(spool, request_id, spill_file)
+            raise
+
+    return IngestedBody(size, bytes(buffer), is_text, spilled=spill_file is not None)
+
+
+def _finish(spool: BodySpool, request_id: str, spill_file: BinaryIO) -> None:
+    spill_file.close()
+    spool.commit(request_id)
+
+
+def _abandon(spool: BodySpool, request_id: str, spill_file: BinaryIO) -> None:
+    """Close and delete a partly written spool file."""
+    try:
+        spill_file.close()
+    except OSError:
+        pass
+    spool.discard(request_id)
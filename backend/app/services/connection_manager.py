@@ -0,0 +1,358 @@
+import time
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple, Any
+
+from fastapi import WebSocket
+
+from core.log import Sampler, get_logger
+from core.metrics import BROADCAST_SECONDS, BROADCAST_SUBSCRIBERS, WS_MESSAGES
+from core.serialization import dumps_text
+from services.pubsub import PubSub
+from storage.body_json import with_cached_body_json
+
+
+logger = get_logger(__name__)
+log_send = Sampler()
+
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+
+# Reads up to ``limit`` stored requests newer than a sequence number, oldest first
+Backlog = Callable[[int, int], Optional[List[Dict]]]
+
+SEQ_PREFIX = '{"seq":'
+
+
+def new_request_event(request_data: dict) -> Dict[str, Any]:
+    # "seq" goes first so event_seq can read it back without decoding the payload.
+    # Subscribers get the raw body; parsing it for every event would defeat the lazy parse.
+    return {
+        "seq": request_data.get("seq", 0),
+        "type": "new_request",
+        "data": with_cached_body_json(request_data)
+    }
+
+
+def missed_event(count: int) -> str:
+    return dumps_text({"type": "missed_requests", "data": {"count": count}})
+
+
+def event_seq(message: str) -> int:
+    """The sequence number of an encoded new_request event, 0 for other messages."""
+    if not message.startswith(SEQ_PREFIX):
+        return 0
+    return int(message[len(SEQ_PREFIX):message.index(",", len(SEQ_PREFIX))])
+
+
+def sse_frame(message: str) -> str:
+    seq = event_seq(message)
+    if seq:
+        return f"id: {seq}\ndata: {message}\n\n"
+    return f"data: {message}\n\n"
+
+
+class ClientConnection:
+    """One WebSocket subscriber with its own bounded send queue.
+
+    Broadcasts only enqueue the already-encoded payload (the same string is
+    shared by every subscriber); a dedicated task drains the queue, so a slow
+    browser delays nobody but itself. When the queue is full the oldest
+    message is dropped - with the coalesce policy the client is told how
+    many it missed before the next message goes out.
+
+    A resuming client first gets its backlog from ``ready``; live events it
+    already received that way (``seq <= skip_through``) are skipped. SSE
+    subscribers have no websocket and read ``next_message`` themselves.
+    """
+
+    def __init__(
+            self,
+            endpoint_id: str,
+            websocket: Optional[WebSocket],
+            max_queue: int,
+            overflow_policy: str
+    ):
+        self.endpoint_id = endpoint_id
+        self.websocket = websocket
+        self.overflow_policy = overflow_policy
+        self.queue: "asyncio.Queue[Tuple[float, str]]" = asyncio.Queue(maxsize=max(1, max_queue))
+        self.ready: Deque[str] = deque()
+        self.task: Optional[asyncio.Task] = None
+        self.skip_through = 0
+        self.closed = False
+        self.missed = 0
+        self.sent = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def enqueue(self, message: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            WS_MESSAGES.labels("dropped").inc()
+            if self.overflow_policy == OVERFLOW_COALESCE:
+                self.missed += 1
+
+        self.queue.put_nowait((time.monotonic(), message))
+
+    async def next_message(self) -> str:
+        if self.ready:
+            return self.ready.popleft()
+
+        while True:
+            enqueued_at, message = await self.queue.get()
+            if not (self.skip_through and 0 < event_seq(message) <= self.skip_through):
+                break
+
+        self.last_lag = time.monotonic() - enqueued_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+
+        if self.missed:
+            missed, self.missed = self.missed, 0
+            self.ready.append(message)
+            return missed_event(missed)
+        return message
+
+    async def drain(self) -> None:
+        while True:
+            message = await self.next_message()
+            await self.websocket.send_text(message)
+            if log_send():
+                logger.info(f"📤 Sent notification to WebSocket for {self.endpoint_id} (1 in {log_send.every} logged)")
+
+            self.sent += 1
+            WS_MESSAGES.labels("sent").inc()
+
+    def resume(self, since: int, backlog: Backlog, limit: int) -> None:
+        """Queue the stored events after ``since`` ahead of anything live.
+
+        Runs without awaiting, right after the client is registered, so every
+        event is either in the backlog or queued live (possibly both - those
+        duplicates are skipped by sequence number).
+        """
+        events = backlog(since, limit + 1)
+        if not events:
+            return
+
+        if len(events) > limit:
+            # Too far behind to be worth replaying: have the client reload instead
+            self.ready.append(missed_event(events[-1]["seq"] - since))
+            self.skip_through = events[-1]["seq"]
+            return
+
+        evicted = events[0]["seq"] - since - 1
+        if evicted > 0:
+            self.ready.append(missed_event(evicted))
+        self.ready.extend(dumps_text(new_request_event(event)) for event in events)
+        self.skip_through = events[-1]["seq"]
+
+    def finish(self, message: str) -> None:
+        """Replace whatever is pending with a last ``message`` (for subscribers without a sender task)."""
+        self.closed = True
+        self.ready.clear()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait((time.monotonic(), message))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "endpoint_id": self.endpoint_id,
+            "queue_depth": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2)
+        }
+
+
+class ConnectionManager:
+    def __init__(
+            self,
+            max_queue: int = 100,
+            overflow_policy: str = OVERFLOW_COALESCE,
+            bus: Optional[PubSub] = None,
+            replay_limit: int = 1000,
+            keepalive_seconds: float = 15
+    ):
+        self.active_connections: Dict[str, List[ClientConnection]] = {}
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.replay_limit = replay_limit
+        self.keepalive_seconds = keepalive_seconds
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(self.deliver)
+
+    async def connect(
+            self,
+            endpoint_id: str,
+            websocket: WebSocket,
+            since: Optional[int] = None,
+            backlog: Optional[Backlog] = None
+    ):
+        await websocket.accept()
+        client = self.subscribe(endpoint_id, websocket, since, backlog)
+        client.task = asyncio.create_task(self._run_sender(client))
+        logger.info(f"✅ WebSocket connected for endpoint: {endpoint_id}")
+
+    def subscribe(
+            self,
+            endpoint_id: str,
+            websocket: Optional[WebSocket] = None,
+            since: Optional[int] = None,
+            backlog: Optional[Backlog] = None
+    ) -> ClientConnection:
+        """Register a subscriber, replaying what it missed after ``since`` when a backlog is given."""
+        client = ClientConnection(endpoint_id, websocket, self.max_queue, self.overflow_policy)
+        self.active_connections.setdefault(endpoint_id, []).append(client)
+        if since is not None and backlog is not None:
+            client.resume(since, backlog, self.replay_limit)
+        return client
+
+    def unsubscribe(self, client: ClientConnection) -> None:
+        clients = self.active_connections.get(client.endpoint_id)
+        if not clients or client not in clients:
+            return
+
+        clients.remove(client)
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+        if not clients:
+            del self.active_connections[client.endpoint_id]
+
+    def disconnect(self, endpoint_id: str, websocket: WebSocket):
+        for client in self.active_connections.get(endpoint_id, []):
+            if client.websocket is websocket:
+                self.unsubscribe(client)
+                logger.info(f"❌ WebSocket disconnected for endpoint: {endpoint_id}")
+                break
+
+    async def stream(
+            self,
+            endpoint_id: str,
+            since: Optional[int] = None,
+            backlog: Optional[Backlog] = None
+    ) -> AsyncIterator[str]:
+        """Server-Sent Events for one endpoint: the backlog after ``since``, then live events.
+
+        Each new_request frame carries its sequence number as the event id, so
+        a browser's EventSource resumes with ``Last-Event-ID`` on its own.
+        """
+        client = self.subscribe(endpoint_id, since=since, backlog=backlog)
+        logger.info(f"✅ Event stream opened for endpoint: {endpoint_id}")
+        try:
+            while not (client.closed and client.queue.empty()):
+                try:
+                    message = await asyncio.wait_for(client.next_message(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield sse_frame(message)
+                client.sent += 1
+        finally:
+            self.unsubscribe(client)
+            logger.info(f"❌ Event stream closed for endpoint: {endpoint_id}")
+
+    async def drop_endpoint(self, endpoint_id: str, reason: str) -> int:
+        """Tell an endpoint's viewers it is gone, then close their sockets."""
+        clients = self.active_connections.pop(endpoint_id, [])
+        goodbye = dumps_text({"type": "endpoint_removed", "data": {"reason": reason}})
+
+        for client in clients:
+            if client.websocket is None:
+                client.finish(goodbye)
+                continue
+            if client.task is not None:
+                client.task.cancel()
+            try:
+                await client.websocket.send_text(goodbye)
+                await client.websocket.close(code=4410)
+            except Exception:
+                pass
+
+        return len(clients)
+
+    def broadcast_new_request(self, endpoint_id: str, request_data: dict):
+        if not self.has_audience(endpoint_id):
+            return
+        self._broadcast(endpoint_id, new_request_event(request_data))
+
+    def broadcast_mock_response(self, endpoint_id: str, request_id: str, ai_mock: dict):
+        self._broadcast(endpoint_id, {
+            "type": "ai_mock_response",
+            "data": {
+                "request_id": request_id,
+                "ai_mock_response": ai_mock
+            }
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        clients = [
+            client.get_stats()
+            for endpoint_clients in self.active_connections.values()
+            for client in endpoint_clients
+        ]
+        return {
+            "endpoints": len(self.active_connections),
+            "connections": len(clients),
+            "max_queue": self.max_queue,
+            "overflow_policy": self.overflow_policy,
+            "replay_limit": self.replay_limit,
+            "pubsub": type(self.bus).__name__ if self.bus is not None else None,
+            "clients": clients
+        }
+
+    async def close(self):
+        tasks = [
+            client.task
+            for endpoint_clients in self.active_connections.values()
+            for client in endpoint_clients
+            if client.task is not None
+        ]
+        self.active_connections.clear()
+
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def has_audience(self, endpoint_id: str) -> bool:
+        """Whether a broadcast could reach anyone - always, when other workers may be listening."""
+        if self.bus is not None and self.bus.distributed:
+            return True
+        return bool(self.active_connections.get(endpoint_id))
+
+    def deliver(self, endpoint_id: str, payload: str):
+        """Queue an already-encoded event for this worker's subscribers."""
+        clients = self.active_connections.get(endpoint_id)
+        if not clients:
+            return
+
+        started = time.perf_counter()
+        for client in clients:
+            client.enqueue(payload)
+        BROADCAST_SECONDS.observe(time.perf_counter() - started)
+        BROADCAST_SUBSCRIBERS.observe(len(clients))
+
+    def _broadcast(self, endpoint_id: str, message: Any):
+        if not self.has_audience(endpoint_id):
+            return
+
+        payload = dumps_text(message)
+        if self.bus is not None:
+            self.bus.publish(endpoint_id, payload)
+        else:
+            self.deliver(endpoint_id, payload)
+
+    async def _run_sender(self, client: ClientConnection):
+        try:
+            await client.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error sending to WebSocket: {e}")
+            self.disconnect(client.endpoint_id, client.websocket)
@@ -0,0 +1,160 @@
+import time
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from core.config import settings
+from core.log import get_logger
+from middleware.rate_limiter import rate_limiter
+from storage.base import BaseEndpointStore, REAP_IDLE, REAP_MEMORY, REAP_TTL
+from storage.json_index import json_index
+from storage.store import endpoint_store
+
+
+logger = get_logger(__name__)
+
+
+REAP_BATCH_SIZE = 1000
+RECENT_REAPS = 50
+
+
+class EndpointReaper:
+    """Background task that removes expired and idle endpoints and keeps
+    stored histories under the global memory budget.
+
+    Each pass:
+
+    - marks endpoints with live WebSocket viewers as active, so a page left
+      open is never considered idle;
+    - deletes endpoints past their TTL (viewers are told and disconnected)
+      or idle for longer than ``idle_seconds``, in batches of
+      ``REAP_BATCH_SIZE``;
+    - clears the histories of the least recently active endpoints while the
+      store's estimated memory is above ``memory_budget_bytes``. Those
+      endpoints stay usable, they just start over empty.
+
+    The budget is enforced once per interval, so usage can overshoot it by
+    whatever arrives in between.
+    """
+
+    def __init__(
+            self,
+            store: BaseEndpointStore,
+            interval_seconds: float = 30,
+            idle_seconds: float = 0,
+            memory_budget_bytes: int = 0
+    ):
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.idle_seconds = idle_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self.ws_manager = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.reaped = {REAP_TTL: 0, REAP_IDLE: 0, REAP_MEMORY: 0}
+        self.requests_dropped = 0
+        self.bytes_freed = 0
+        self.last_run_ms = 0.0
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_REAPS)
+
+    def set_websocket_manager(self, manager):
+        self.ws_manager = manager
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reap_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def reap(self, now: Optional[float] = None) -> int:
+        """One pass; returns how many endpoints were deleted or cleared."""
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        removed = 0
+
+        if self.ws_manager is not None:
+            for endpoint_id in list(self.ws_manager.active_connections):
+                self.store.touch(endpoint_id)
+
+        idle_before = now - self.idle_seconds if self.idle_seconds > 0 else None
+        while True:
+            expired = self.store.find_expired(now, idle_before, limit=REAP_BATCH_SIZE)
+            for endpoint_id, reason in expired:
+                dropped = self.store.delete(endpoint_id)
+                if dropped is None:
+                    continue
+                await self._forget(endpoint_id, reason)
+                self._record(endpoint_id, reason, dropped, now)
+                removed += 1
+            if len(expired) < REAP_BATCH_SIZE:
+                break
+            await asyncio.sleep(0)
+
+        if self.memory_budget_bytes > 0 and self.store.memory_usage() > self.memory_budget_bytes:
+            for endpoint_id, dropped, freed in self.store.shed_memory(self.memory_budget_bytes):
+                json_index.drop_endpoint(endpoint_id)
+                self.bytes_freed += freed
+                self._record(endpoint_id, REAP_MEMORY, dropped, now, freed)
+                removed += 1
+
+        self.runs += 1
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        if removed:
+            logger.info(f"🧹 Reaped {removed} endpoint(s): {self.reaped}")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "interval_seconds": self.interval_seconds,
+            "idle_seconds": self.idle_seconds,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "memory_bytes": self.store.memory_usage(),
+            "reaped": dict(self.reaped),
+            "requests_dropped": self.requests_dropped,
+            "bytes_freed": self.bytes_freed,
+            "last_run_ms": round(self.last_run_ms, 2),
+            "recent": list(self.recent)
+        }
+
+    async def _forget(self, endpoint_id: str, reason: str) -> None:
+        """Drop per-endpoint state kept outside the store."""
+        rate_limiter.forget_endpoint(endpoint_id)
+        json_index.drop_endpoint(endpoint_id)
+        if self.ws_manager is not None:
+            await self.ws_manager.drop_endpoint(endpoint_id, reason)
+
+    def _record(self, endpoint_id: str, reason: str, dropped: int, now: float, freed: int = 0) -> None:
+        self.reaped[reason] += 1
+        self.requests_dropped += dropped
+        self.recent.append({
+            "endpoint_id": endpoint_id,
+            "reason": reason,
+            "requests": dropped,
+            "bytes": freed,
+            "at": now
+        })
+
+    async def _reap_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"❌ Endpoint reaper failed: {e}")
+
+
+endpoint_reaper = EndpointReaper(
+    endpoint_store,
+    interval_seconds=settings.REAPER_INTERVAL_SECONDS,
+    idle_seconds=settings.ENDPOINT_IDLE_SECONDS,
+    memory_budget_bytes=settings.MEMORY_BUDGET_BYTES
+)
@@ -1,131 +1,385 @@
+import time
 import uuid
-import json
-from typing import Optional, Dict
+import base64
+import asyncio
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional, Dict, List, Set, Sequence, Union
 from datetime import datetime
 from fastapi import HTTPException, Request
 
 from storage.store import endpoint_store
+from storage.body_spool import body_spool
+from storage.captured_request import CapturedRequest
 from core.config import settings
+from core.ids import new_request_id
+from core.log import get_logger
+from core.metrics import BODY_BYTES, INGEST_SECONDS
 from schemas.endpoint import WebhookRequest
+from storage.query import RequestQuery
+from storage.search_index import RequestSearch
+from storage.body_json import with_body_json
+from storage.json_index import json_index
 from services.ai_service import ai_service
+from services.mock_rules import mock_rules
+from services.response_mode import MockReply, build_mock_reply, has_static_body, is_mock_mode
+from services.body_ingest import BodyTooLargeError, ingest_body
+from services.forwarder import REPLAY_HEADER, forwarder
+
+
+logger = get_logger(__name__)
 
 
 class EndpointService:
     def __init__(self):
         self.store = endpoint_store
+        self.body_spool = body_spool
         self.config = settings
+        self.mock_rules = mock_rules
+        self.forwarder = forwarder
         self.ws_manager = None
+        self._pending_mocks: Set[asyncio.Task] = set()
 
     def set_websocket_manager(self, manager):
         self.ws_manager = manager
 
-    def create_endpoint(self, name: Optional[str] = None) -> Dict:
+    async def shutdown(self):
+        for task in list(self._pending_mocks):
+            task.cancel()
+        if self._pending_mocks:
+            await asyncio.gather(*self._pending_mocks, return_exceptions=True)
+
+    def create_endpoint(
+            self,
+            name: Optional[str] = None,
+            max_requests: Optional[int] = None,
+            ttl_seconds: Optional[int] = None,
+            response_config: Optional[Dict] = None
+    ) -> Dict:
         endpoint_id = str(uuid.uuid4())
         endpoint_data = self.store.create(
             endpoint_id=endpoint_id,
-            name=name
+            name=name,
+            max_requests=max_requests,
+            ttl_seconds=ttl_seconds
         )
+        if response_config is not None:
+            self.store.set_response_config(endpoint_id, response_config)
+            endpoint_data = {**endpoint_data, "response": response_config}
 
-        webhook_url = f"{self.config.BASE_URL}/w/{endpoint_id}"
-
-        return {
-            "id": endpoint_data["id"],
-            "url": webhook_url,
-            "name": endpoint_data["name"],
-            "created_at": endpoint_data["created_at"]
-        }
+        return self._endpoint_info(endpoint_data)
 
     def get_endpoint(self, endpoint_id: str) -> Dict:
-        endpoint_data = self.store.get(endpoint_id)
+        endpoint_data = self.store.get_metadata(endpoint_id)
 
         if not endpoint_data:
             return None
 
-        webhook_url = f"{self.config.BASE_URL}/w/{endpoint_id}"
+        self.store.touch(endpoint_id)
+        return self._endpoint_info(endpoint_data)
+
+    def set_response_config(self, endpoint_id: str, response_config: Optional[Dict]) -> Optional[Dict]:
+        if not self.store.set_response_config(endpoint_id, response_config):
+            return None
+        return self.get_endpoint(endpoint_id)
+
+    async def set_forward_url(
+            self,
+            endpoint_id: str,
+            forward_url: Optional[str],
+            own_base_url: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Forward new webhooks to ``forward_url``; raises ``ForwardingError`` for disallowed targets."""
+        if forward_url is not None:
+            await self.forwarder.check_target(forward_url, own_base_url)
+        if not self.store.set_forward_url(endpoint_id, forward_url):
+            return None
+        return self.get_endpoint(endpoint_id)
+
+    async def start_replay(
+            self,
+            endpoint_id: str,
+            target_url: str,
+            limit: int,
+            request_ids: Optional[Sequence[str]] = None,
+            rps: Optional[float] = None,
+            concurrency: int = 10,
+            own_base_url: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Re-send stored requests (the latest ``limit``, or ``request_ids``) to ``target_url`` in the background."""
+        await self.forwarder.check_target(target_url, own_base_url)
+
+        if request_ids:
+            if await self._store_call(self.store.get_metadata, endpoint_id) is None:
+                return None
+            requests = [await self._store_call(self.store.get_request, endpoint_id, request_id) for request_id in request_ids]
+            requests = [request_data for request_data in requests if request_data is not None]
+        else:
+            requests = await self._store_call(self.store.list_requests, endpoint_id, limit)
+            if requests is None:
+                return None
+
+        job = self.forwarder.start_replay(endpoint_id, target_url, requests, rps=rps, concurrency=concurrency)
+        return job.to_dict()
+
+    def get_replay(self, endpoint_id: str, job_id: str) -> Optional[Dict]:
+        job = self.forwarder.jobs.get(job_id)
+        if job is None or job.endpoint_id != endpoint_id:
+            return None
+        return job.to_dict()
+
+    def cancel_replay(self, endpoint_id: str, job_id: str) -> Optional[Dict]:
+        if self.get_replay(endpoint_id, job_id) is None:
+            return None
+        return self.forwarder.cancel_replay(job_id).to_dict()
+
+    def _endpoint_info(self, endpoint_data: Dict) -> Dict:
+        webhook_url = f"{self.config.BASE_URL}/w/{endpoint_data['id']}"
 
         return {
             "id": endpoint_data["id"],
             "url": webhook_url,
             "name": endpoint_data["name"],
-            "created_at": endpoint_data["created_at"]
+            "created_at": endpoint_data["created_at"],
+            "max_requests": endpoint_data.get("max_requests"),
+            "expires_at": endpoint_data.get("expires_at"),
+            "response": endpoint_data.get("response"),
+            "forward_url": endpoint_data.get("forward_url")
+        }
+
+    async def list_requests(
+            self,
+            endpoint_id: str,
+            query: RequestQuery,
+            fields: Optional[Sequence[str]] = None
+    ) -> Optional[Dict]:
+        page = await self._store_call(self.store.query_requests, endpoint_id, query)
+        if page is None:
+            return None
+
+        await self._store_call(self.store.touch, endpoint_id)
+        requests = [with_body_json(request_data, fields) for request_data in page.requests]
+
+        return {
+            "endpoint_id": endpoint_id,
+            "request_count": await self._store_call(self.store.get_request_count, endpoint_id),
+            "requests": requests,
+            "has_more": page.has_more,
+            "cursors": {
+                "before": page.requests[0]["id"] if page.requests else None,
+                "after": page.requests[-1]["id"] if page.requests else None
+            }
+        }
+
+    async def search_requests(
+            self,
+            endpoint_id: str,
+            search: RequestSearch,
+            fields: Optional[Sequence[str]] = None
+    ) -> Optional[Dict]:
+        page = await self._store_call(self.store.search_requests, endpoint_id, search)
+        if page is None:
+            return None
+
+        await self._store_call(self.store.touch, endpoint_id)
+        return {
+            "endpoint_id": endpoint_id,
+            "requests": [with_body_json(request_data, fields) for request_data in page.requests],
+            "has_more": page.has_more,
+            "cursors": {
+                "before": page.requests[-1]["id"] if page.requests else None
+            }
         }
 
+    async def get_request(
+            self,
+            endpoint_id: str,
+            request_id: str,
+            fields: Optional[Sequence[str]] = None
+    ) -> Optional[Dict]:
+        request_data = await self._store_call(self.store.get_request, endpoint_id, request_id)
+        if request_data is None:
+            return None
+
+        await self._store_call(self.store.touch, endpoint_id)
+        return with_body_json(request_data, fields)
+
+    def events_after(self, endpoint_id: str, after_seq: int, limit: int) -> Optional[List[Dict]]:
+        """Stored requests newer than event ``after_seq`` - what a reconnecting viewer missed."""
+        return self.store.requests_after_seq(endpoint_id, after_seq, limit)
+
+    def stream_events(self, endpoint_id: str, since: Optional[int] = None) -> AsyncIterator[str]:
+        self.store.touch(endpoint_id)
+        return self.ws_manager.stream(endpoint_id, since, backlog=partial(self.events_after, endpoint_id))
+
+    async def get_request_body(self, endpoint_id: str, request_id: str) -> Optional[Dict]:
+        """Where to read a captured body from: a spool ``path`` or inline ``content`` bytes."""
+        request_data = await self._store_call(self.store.get_request, endpoint_id, request_id)
+        if request_data is None:
+            return None
+
+        media_type = request_data.get("content_type") or "application/octet-stream"
+
+        if request_data.get("body_truncated"):
+            if not self.body_spool.exists(request_id):
+                return None
+            return {"media_type": media_type, "path": self.body_spool.path_for(request_id)}
+
+        content = request_data.get("body_raw") or b""
+        if isinstance(content, str):
+            if request_data.get("body_encoding") == "base64":
+                content = base64.b64decode(content)
+            else:
+                content = content.encode("utf-8")
+
+        return {"media_type": media_type, "content": content}
+
     async def receive_webhook(
             self,
             endpoint_id: str,
             request: Request,
-    ) -> Dict:
-        endpoint_data = self.store.get(endpoint_id)
+    ) -> Union[Dict, MockReply]:
+        """Capture a webhook and produce what the sender gets back.
+
+        That is the receipt envelope, or a ``MockReply`` when the endpoint is
+        in mock response mode; its artificial latency has already been waited
+        out when this returns.
+        """
+        started = time.perf_counter()
+        endpoint_data = await self._store_call(self.store.get_metadata, endpoint_id)
         if not endpoint_data:
             raise HTTPException(status_code=404, detail="Endpoint not found")
 
-        body_raw = await request.body()
-        body_text = body_raw.decode("utf-8")
+        received_at = time.time()
+        request_id = new_request_id(received_at)
+        content_type = request.headers.get("content-type")
 
-        body_json = None
         try:
-            if body_text:
-                body_json = json.loads(body_text)
-        except json.decoder.JSONDecodeError:
-            pass
+            body = await ingest_body(
+                request.stream(),
+                request_id,
+                spool=self.body_spool,
+                spill_threshold=self.config.BODY_SPILL_THRESHOLD_BYTES,
+                preview_bytes=self.config.BODY_PREVIEW_BYTES,
+                max_bytes=self.config.MAX_BODY_BYTES
+            )
+        except BodyTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
 
         client_ip = request.client.host if request.client else None
+        BODY_BYTES.observe(body.size)
 
-        request_id = str(uuid.uuid4())
-
-        webhook_data = {
-            "id": request_id,
-            "timestamp": datetime.now(),
-            "method": request.method,
-            "headers": dict(request.headers),
-            "body_raw": body_text,
-            "body_json": body_json,
-            "content_type": request.headers.get("content-type"),
-            "content_length": len(body_raw),
-            "ip_address": client_ip,
-            "query_params": dict(request.query_params)
-        }
-
-        ai_mock = await ai_service.generate_mock_response(
-            webhook_data,
-            endpoint_id=endpoint_id,
-            ip_address=client_ip
+        webhook_data = CapturedRequest(
+            id=request_id,
+            method=request.method,
+            headers=dict(request.headers),
+            body_raw=body.raw,
+            body_encoding=body.encoding,
+            body_truncated=body.spilled,
+            content_type=content_type,
+            content_length=body.size,
+            ip_address=client_ip,
+            query_params=dict(request.query_params),
+            created_at=received_at
         )
 
-        if ai_mock:
+        response_config = endpoint_data.get("response")
+        mock_mode = is_mock_mode(response_config)
+
+        # A mock-mode reply needs its mock now, and one with a fixed body needs no AI at all
+        use_ai = not has_static_body(response_config)
+
+        ai_mock = self.mock_rules.match(webhook_data) if self.mock_rules is not None else None
+        deferred = ai_mock is None and use_ai and not mock_mode and self.config.AI_DEFERRED_RESPONSES and ai_service.enabled
+
+        if ai_mock is not None:
+            webhook_data["ai_mock_response"] = ai_mock
+        elif deferred:
+            ai_mock = {"status": "pending"}
             webhook_data["ai_mock_response"] = ai_mock
-            if not ai_mock.get("rate_limited") and not ai_mock.get("error"):
-                print(f"🤖 AI generated mock response for {request_id}")
-            elif ai_mock.get("rate_limited"):
-                print(f"⚠️  Rate limit hit for {request_id}")
+        elif use_ai:
+            ai_mock = await ai_service.generate_mock_response(
+                webhook_data,
+                endpoint_id=endpoint_id,
+                ip_address=client_ip
+            )
+            self._log_mock_outcome(request_id, ai_mock)
+            if ai_mock:
+                webhook_data["ai_mock_response"] = ai_mock
 
-        self.store.add_request(endpoint_id, webhook_data)
+        await self._store_call(self.store.add_request, endpoint_id, webhook_data)
+        json_index.submit(endpoint_id, webhook_data, endpoint_data["max_requests"])
 
         if self.ws_manager:
-            webhook_data_serializable = {
-                **webhook_data,
-                "timestamp": webhook_data["timestamp"].isoformat()
-            }
+            self.ws_manager.broadcast_new_request(endpoint_id, webhook_data)
 
-            if "ai_mock_response" in webhook_data_serializable:
-                ai_data = webhook_data_serializable["ai_mock_response"]
-                if "generated_at" in ai_data:
-                    if hasattr(ai_data["generated_at"], "isoformat"):
-                        ai_data["generated_at"] = ai_data["generated_at"].isoformat()
+        # A request this server forwarded is not sent on again, so two endpoints can't bounce it forever
+        if endpoint_data.get("forward_url") and REPLAY_HEADER not in request.headers:
+            self.forwarder.forward_live(endpoint_data["forward_url"], webhook_data)
 
-            await self.ws_manager.broadcast_new_request(
-                endpoint_id,
-                webhook_data_serializable
+        if deferred:
+            task = asyncio.create_task(
+                self._attach_mock_response(endpoint_id, webhook_data, client_ip)
             )
+            self._pending_mocks.add(task)
+            task.add_done_callback(self._pending_mocks.discard)
 
-        return {
+        if mock_mode:
+            reply = build_mock_reply(response_config, ai_mock)
+            INGEST_SECONDS.labels("mock").observe(time.perf_counter() - started)
+            if reply.delay:
+                await asyncio.sleep(reply.delay)
+            return reply
+
+        receipt = {
             "status": "received",
             "endpoint_id": endpoint_id,
             "request_id": request_id,
             "received_at": datetime.now().isoformat(),
-            "total_requests": endpoint_data["request_count"],
+            "total_requests": await self._store_call(self.store.get_request_count, endpoint_id),
             "ai_mock_response": ai_mock
         }
+        INGEST_SECONDS.labels("envelope").observe(time.perf_counter() - started)
+        return receipt
+
+    async def _attach_mock_response(
+            self,
+            endpoint_id: str,
+            webhook_data: Dict,
+            client_ip: Optional[str]
+    ) -> None:
+        request_id = webhook_data["id"]
+
+        try:
+            ai_mock = await ai_service.generate_mock_response(
+                webhook_data,
+                endpoint_id=endpoint_id,
+                ip_address=client_ip
+            )
+        except Exception as e:
+            logger.error(f"❌ Deferred AI generation failed for {request_id}: {e}")
+            ai_mock = {"error": "AI generation failed", "message": str(e)}
+
+        self._log_mock_outcome(request_id, ai_mock)
+        webhook_data["ai_mock_response"] = ai_mock
+        await self._store_call(self.store.update_request, endpoint_id, request_id, {"ai_mock_response": ai_mock})
+
+        if self.ws_manager:
+            self.ws_manager.broadcast_mock_response(endpoint_id, request_id, ai_mock)
+
+    async def _store_call(self, method: Callable[..., Any], *args: Any) -> Any:
+        """Run a store call, in a worker thread when the store can block on I/O."""
+        if self.store.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    @staticmethod
+    def _log_mock_outcome(request_id: str, ai_mock: Optional[Dict]) -> None:
+        if not ai_mock:
+            return
+        if not ai_mock.get("rate_limited") and not ai_mock.get("error"):
+            logger.info(f"🤖 AI generated mock response for {request_id}")
+        elif ai_mock.get("rate_limited"):
+            logger.warning(f"⚠️  Rate limit hit for {request_id}")
 
 
 endpoint_service = EndpointService()
\ No newline at end of file
@@ -0,0 +1,552 @@
+import time
+import uuid
+import base64
+import random
+import socket
+import asyncio
+import ipaddress
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.config import settings
+from core.log import get_logger
+from storage.body_spool import body_spool
+
+
+logger = get_logger(__name__)
+
+
+# Hop-by-hop and transport headers that must not be copied onto the outgoing request
+SKIPPED_HEADERS = frozenset({
+    "host", "content-length", "connection", "keep-alive", "transfer-encoding",
+    "te", "trailer", "upgrade", "proxy-authorization", "proxy-connection", "accept-encoding"
+})
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+MAX_REPLAY_JOBS = 100
+MAX_TARGETS = 1000
+
+# How long a target's resolved addresses are trusted before they are checked again
+ADDRESS_CHECK_SECONDS = 60
+
+# Set on every forwarded request; a capture carrying it is not live-forwarded again
+REPLAY_HEADER = "x-webhook-debugger-replay"
+
+
+class ForwardingError(Exception):
+    pass
+
+
+class LatencyHistogram:
+    """Cumulative-free bucket counts (``le`` upper bounds in ms, last one +Inf)."""
+
+    __slots__ = ("counts", "total", "sum_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                break
+        else:
+            index = len(LATENCY_BUCKETS_MS)
+        self.counts[index] += 1
+        self.total += 1
+        self.sum_ms += latency_ms
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations."""
+        if not self.total:
+            return None
+        rank = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        bounds = [str(bound) for bound in LATENCY_BUCKETS_MS] + ["+Inf"]
+        return {
+            "buckets_ms": dict(zip(bounds, self.counts)),
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 2) if self.total else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99)
+        }
+
+
+class CircuitBreaker:
+    """Stops sending to a target after ``failure_threshold`` consecutive
+    failures. After ``reset_seconds`` one probe is let through: success
+    closes the breaker, failure opens it for another period."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.probing = False
+
+    def allow(self) -> bool:
+        if self.state == BREAKER_CLOSED:
+            return True
+        if self.state == BREAKER_OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = BREAKER_HALF_OPEN
+        if self.state == BREAKER_HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give up a probe that ended without an outcome, so the next call probes instead."""
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probing = False
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                self.times_opened += 1
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+
+
+class Pacer:
+    """Spaces calls ``1 / rate`` seconds apart across any number of tasks."""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1 / rate if rate else 0.0
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_at)
+        self._next_at = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ForwardTarget:
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        self.latency = LatencyHistogram()
+        self.sent = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.rejected_open = 0
+        self.blocked = 0
+        self.address_checked_at: Optional[float] = None
+        self.status_classes: Dict[str, int] = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "short_circuited": self.rejected_open,
+            "blocked": self.blocked,
+            "status": dict(self.status_classes),
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.times_opened,
+            "latency": self.latency.to_dict()
+        }
+
+
+class ReplayJob:
+    def __init__(self, endpoint_id: str, target_url: str, total: int, rps: Optional[float], concurrency: int):
+        self.id = str(uuid.uuid4())
+        self.endpoint_id = endpoint_id
+        self.target_url = target_url
+        self.total = total
+        self.rps = rps
+        self.concurrency = concurrency
+        self.status = "running"
+        self.sent = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "id": self.id,
+            "endpoint_id": self.endpoint_id,
+            "target_url": self.target_url,
+            "status": self.status,
+            "total": self.total,
+            "sent": self.sent,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rps": self.rps,
+            "concurrency": self.concurrency,
+            "achieved_rps": round(self.sent / elapsed, 2) if elapsed > 0 else 0.0,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _port_of(parts) -> int:
+    return parts.port or (443 if parts.scheme == "https" else 80)
+
+
+def _is_under(parts, prefix) -> bool:
+    """Same scheme, host and port as ``prefix``, with a path at or below its path."""
+    if (parts.scheme, parts.hostname, _port_of(parts)) != (prefix.scheme, prefix.hostname, _port_of(prefix)):
+        return False
+    base = prefix.path.rstrip("/")
+    return not base or parts.path == base or parts.path.startswith(base + "/")
+
+
+def _is_internal(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved or ip.is_multicast or ip.is_unspecified
+
+
+class Forwarder:
+    """Re-sends captured requests to other services.
+
+    One keep-alive ``httpx.AsyncClient`` is shared by every target, so
+    replays and live forwarding reuse connections instead of opening one
+    per request. Each send is retried on connection errors, 429 and 5xx
+    with exponential backoff and jitter, behind a per-target circuit
+    breaker. Latency (including retries) is recorded per target.
+
+    Targets that resolve to private, loopback or link-local addresses are
+    refused unless they are in ``allowed_targets``, so a captured webhook
+    can't be pointed at internal services.
+    """
+
+    def __init__(
+            self,
+            max_connections: int = 100,
+            timeout: float = 10.0,
+            max_retries: int = 3,
+            backoff_seconds: float = 0.2,
+            breaker_failures: int = 5,
+            breaker_reset_seconds: float = 30,
+            live_max_pending: int = 1000,
+            allowed_targets: Iterable[str] = (),
+            own_base_urls: Iterable[str] = (),
+            transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.live_max_pending = live_max_pending
+        self.allowed_targets = tuple(prefix for prefix in allowed_targets if prefix)
+        self._allowed_parts = tuple(urlsplit(prefix) for prefix in self.allowed_targets)
+        self.own_base_urls = tuple(base_url for base_url in own_base_urls if base_url)
+        self.transport = transport
+        self.body_spool = body_spool
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self.targets: "OrderedDict[str, ForwardTarget]" = OrderedDict()
+        self.jobs: "OrderedDict[str, ReplayJob]" = OrderedDict()
+        self._live: Set[asyncio.Task] = set()
+        self.live_dropped = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Forwarder is not started")
+        return self._client
+
+    def start(self) -> None:
+        """Open the shared connection pool; the app lifespan calls this, ``close()`` undoes it."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self.transport
+            )
+
+    async def check_target(self, url: str, own_base_url: Optional[str] = None) -> str:
+        """Validate a forward/replay target; ``own_base_url`` is how this server was reached."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ForwardingError(f"Target must be an http(s) URL: {url}")
+        if parts.username is not None or parts.password is not None:
+            raise ForwardingError(f"Target must not contain credentials: {url}")
+        if self._is_own_webhook(parts, own_base_url):
+            raise ForwardingError(f"Target is a webhook URL of this server: {url}")
+        if self._is_allowlisted(url):
+            return url
+        if self.allowed_targets:
+            raise ForwardingError(f"Target is not in FORWARD_ALLOWED_TARGETS: {url}")
+        await self._check_addresses(url)
+        return url
+
+    def _is_allowlisted(self, url: str) -> bool:
+        # Parsed, not string prefixes: "http://staging" must not admit "http://staging.evil.com/"
+        parts = urlsplit(url)
+        if parts.username is not None or parts.password is not None:
+            return False
+        return any(_is_under(parts, prefix) for prefix in self._allowed_parts)
+
+    async def _check_addresses(self, url: str) -> None:
+        parts = urlsplit(url)
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(
+                parts.hostname, _port_of(parts), type=socket.SOCK_STREAM
+            )
+        except socket.gaierror:
+            # Not resolvable (yet) - it is checked again before every send
+            return
+        for *_, sockaddr in addresses:
+            if _is_internal(sockaddr[0]):
+                raise ForwardingError(
+                    f"Target resolves to internal address {sockaddr[0]} (allow it with FORWARD_ALLOWED_TARGETS): {url}"
+                )
+
+    async def _address_allowed(self, target: ForwardTarget) -> bool:
+        """Re-resolve the target now and then, since DNS can start pointing it inside."""
+        if self._is_allowlisted(target.url):
+            return True
+        now = time.monotonic()
+        if target.address_checked_at is not None and now - target.address_checked_at < ADDRESS_CHECK_SECONDS:
+            return True
+        try:
+            await self._check_addresses(target.url)
+        except ForwardingError as e:
+            logger.warning(f"⚠️ {e}")
+            return False
+        target.address_checked_at = now
+        return True
+
+    def _is_own_webhook(self, parts, own_base_url: Optional[str]) -> bool:
+        """Whether the URL lands on this server's ``/w/`` capture route - forwarding there loops."""
+        base_urls = self.own_base_urls + ((own_base_url,) if own_base_url else ())
+        for base_url in base_urls:
+            own = urlsplit(base_url)
+            if (parts.hostname, _port_of(parts)) != (own.hostname, _port_of(own)):
+                continue
+            if parts.path.startswith(own.path.rstrip("/") + "/w/"):
+                return True
+        return False
+
+    def target(self, url: str) -> ForwardTarget:
+        target = self.targets.get(url)
+        if target is None:
+            target = self.targets[url] = ForwardTarget(
+                url,
+                CircuitBreaker(self.breaker_failures, self.breaker_reset_seconds)
+            )
+            if len(self.targets) > MAX_TARGETS:
+                self.targets.popitem(last=False)
+        else:
+            self.targets.move_to_end(url)
+        return target
+
+    async def send(self, url: str, request_data: Dict[str, Any]) -> bool:
+        """Deliver one captured request to ``url``; True once it got a non-retryable answer."""
+        target = self.target(url)
+        if not await self._address_allowed(target):
+            target.blocked += 1
+            return False
+        if not target.breaker.allow():
+            target.rejected_open += 1
+            return False
+
+        probing = target.breaker.state == BREAKER_HALF_OPEN
+        try:
+            return await self._deliver(target, request_data)
+        finally:
+            if probing:
+                # No-op once the probe recorded an outcome; a cancelled probe must not block the next one
+                target.breaker.release()
+
+    async def _deliver(self, target: ForwardTarget, request_data: Dict[str, Any]) -> bool:
+        body = await self._body_of(request_data)
+        headers = {
+            name: value
+            for name, value in (request_data.get("headers") or {}).items()
+            if name.lower() not in SKIPPED_HEADERS
+        }
+        headers[REPLAY_HEADER] = request_data["id"]
+
+        target.sent += 1
+        started = time.perf_counter()
+        status_code = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                target.retries += 1
+                await asyncio.sleep(self.backoff_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            try:
+                response = await self.client.request(
+                    request_data.get("method", "POST"),
+                    target.url,
+                    params=request_data.get("query_params") or None,
+                    headers=headers,
+                    content=body
+                )
+                status_code = response.status_code
+                if not _is_retryable(status_code):
+                    break
+            except httpx.HTTPError:
+                status_code = None
+
+        target.latency.observe((time.perf_counter() - started) * 1000)
+        status_class = f"{status_code // 100}xx" if status_code else "error"
+        target.status_classes[status_class] = target.status_classes.get(status_class, 0) + 1
+
+        if status_code is None or _is_retryable(status_code):
+            target.failed += 1
+            target.breaker.record_failure()
+            return False
+
+        target.succeeded += 1
+        target.breaker.record_success()
+        return True
+
+    def forward_live(self, url: str, request_data: Dict[str, Any]) -> None:
+        """Send a just-captured request in the background; dropped when too many are in flight."""
+        if len(self._live) >= self.live_max_pending:
+            self.live_dropped += 1
+            return
+
+        task = asyncio.create_task(self._forward_quietly(url, request_data))
+        self._live.add(task)
+        task.add_done_callback(self._live.discard)
+
+    def start_replay(
+            self,
+            endpoint_id: str,
+            url: str,
+            requests: List[Dict[str, Any]],
+            rps: Optional[float] = None,
+            concurrency: int = 10
+    ) -> ReplayJob:
+        job = ReplayJob(endpoint_id, url, len(requests), rps, concurrency)
+        job.task = asyncio.create_task(self._run_replay(job, requests))
+
+        self.jobs[job.id] = job
+        while len(self.jobs) > MAX_REPLAY_JOBS:
+            oldest_id = next(iter(self.jobs))
+            if self.jobs[oldest_id].status == "running":
+                break
+            del self.jobs[oldest_id]
+        return job
+
+    def cancel_replay(self, job_id: str) -> Optional[ReplayJob]:
+        job = self.jobs.get(job_id)
+        if job is not None and job.task is not None and not job.task.done():
+            job.task.cancel()
+        return job
+
+    async def close(self) -> None:
+        tasks = [job.task for job in self.jobs.values() if job.task is not None] + list(self._live)
+        tasks = [task for task in tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "targets": {url: target.get_stats() for url, target in self.targets.items()},
+            "live_in_flight": len(self._live),
+            "live_dropped": self.live_dropped,
+            "replays_running": sum(1 for job in self.jobs.values() if job.status == "running")
+        }
+
+    async def _forward_quietly(self, url: str, request_data: Dict[str, Any]) -> None:
+        try:
+            await self.send(url, request_data)
+        except Exception as e:
+            logger.error(f"❌ Forwarding {request_data.get('id')} to {url} failed: {e}")
+
+    async def _run_replay(self, job: ReplayJob, requests: List[Dict[str, Any]]) -> None:
+        pacer = Pacer(job.rps)
+        pending = iter(requests)
+
+        async def worker():
+            for request_data in pending:
+                await pacer.wait()
+                delivered = await self.send(job.target_url, request_data)
+                job.sent += 1
+                if delivered:
+                    job.succeeded += 1
+                else:
+                    job.failed += 1
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(1, job.concurrency))))
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            logger.error(f"❌ Replay {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            logger.info(f"🔁 Replay {job.id} {job.status}: {job.succeeded}/{job.total} delivered to {job.target_url}")
+
+    async def _body_of(self, request_data: Dict[str, Any]) -> bytes:
+        if request_data.get("body_truncated"):
+            path = Path(self.body_spool.path_for(request_data["id"]))
+            if path.exists():
+                return await asyncio.to_thread(path.read_bytes)
+
+        body = request_data.get("body_raw") or b""
+        if isinstance(body, bytes):
+            return body
+        if request_data.get("body_encoding") == "base64":
+            return base64.b64decode(body)
+        return body.encode("utf-8")
+
+
+forwarder = Forwarder(
+    max_connections=settings.FORWARD_MAX_CONNECTIONS,
+    timeout=settings.FORWARD_TIMEOUT_SECONDS,
+    max_retries=settings.FORWARD_MAX_RETRIES,
+    backoff_seconds=settings.FORWARD_BACKOFF_SECONDS,
+    breaker_failures=settings.FORWARD_BREAKER_FAILURES,
+    breaker_reset_seconds=settings.FORWARD_BREAKER_RESET_SECONDS,
+    live_max_pending=settings.FORWARD_LIVE_MAX_PENDING,
+    allowed_targets=settings.FORWARD_ALLOWED_TARGETS.split(","),
+    own_base_urls=[settings.BASE_URL]
+)
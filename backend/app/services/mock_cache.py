@@ -0,0 +1,150 @@
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from core.config import settings
+
+
+FINGERPRINT_HEADERS = (
+    "content-type",
+    "x-github-event",
+    "x-gitlab-event",
+    "x-shopify-topic",
+    "x-event-key",
+    "x-event-type",
+)
+
+DISCRIMINATOR_KEYS = ("type", "event", "event_type", "action", "topic")
+
+MAX_SCHEMA_DEPTH = 8
+
+
+def json_schema_of(value: Any, depth: int = 0) -> Any:
+    if depth >= MAX_SCHEMA_DEPTH:
+        return "..."
+    if isinstance(value, dict):
+        return {key: json_schema_of(value[key], depth + 1) for key in sorted(value)}
+    if isinstance(value, list):
+        item_schemas = {
+            json.dumps(json_schema_of(item, depth + 1), sort_keys=True)
+            for item in value
+        }
+        return ["list", sorted(item_schemas)]
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if value is None:
+        return "null"
+    return "string"
+
+
+def fingerprint_request(
+        method: str,
+        headers: Dict[str, str],
+        body_json: Any,
+        body_raw: Optional[Union[str, bytes]]
+) -> str:
+    lowered = {name.lower(): value for name, value in (headers or {}).items()}
+
+    key_headers = {}
+    for name in FINGERPRINT_HEADERS:
+        if name in lowered:
+            value = lowered[name]
+            if name == "content-type":
+                value = value.split(";")[0].strip().lower()
+            key_headers[name] = value
+
+    if body_json is not None:
+        body_key = {"schema": json_schema_of(body_json)}
+        if isinstance(body_json, dict):
+            body_key["discriminators"] = {
+                key: body_json[key]
+                for key in DISCRIMINATOR_KEYS
+                if isinstance(body_json.get(key), str)
+            }
+    else:
+        if isinstance(body_raw, bytes):
+            body_raw = hashlib.blake2b(body_raw, digest_size=16).hexdigest()
+        body_key = {"raw": body_raw or ""}
+
+    canonical = json.dumps(
+        [method.upper(), key_headers, body_key],
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class MockResponseCache:
+    def __init__(
+            self,
+            max_entries: int = 1024,
+            max_bytes: int = 4 * 1024 * 1024,
+            ttl_seconds: float = 3600,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, int]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> bool:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, self._clock() + self.ttl_seconds, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+mock_cache = MockResponseCache(
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    max_bytes=settings.AI_CACHE_MAX_BYTES,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS
+)
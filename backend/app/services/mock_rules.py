@@ -0,0 +1,244 @@
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.config import settings
+from core.log import get_logger
+from core.serialization import dumps_text, loads
+from storage.captured_request import CapturedRequest
+from storage.json_index import MISSING, json_value
+from storage.search_index import JsonPredicate
+
+
+logger = get_logger(__name__)
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+
+# Tried after any rules from MOCK_RULES_PATH, in this order
+BUILTIN_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "slack-url-verification",
+        "headers": {"x-slack-signature": None},
+        "when": ["$.type == url_verification"],
+        "response": {"challenge": "{{body.challenge}}"}
+    },
+    {
+        "name": "slack",
+        "headers": {"x-slack-signature": None},
+        "response": {"ok": True}
+    },
+    {
+        "name": "github-ping",
+        "headers": {"x-github-event": "ping"},
+        "response": {"message": "pong", "hook_id": "{{body.hook_id}}", "zen": "{{body.zen}}"}
+    },
+    {
+        "name": "github",
+        "headers": {"x-github-event": None},
+        "response": {"received": True, "event": "{{header.x-github-event}}", "delivery": "{{header.x-github-delivery}}"}
+    },
+    {
+        "name": "gitlab",
+        "headers": {"x-gitlab-event": None},
+        "response": {"status": "ok", "event": "{{header.x-gitlab-event}}"}
+    },
+    {
+        "name": "stripe",
+        "headers": {"stripe-signature": None},
+        "response": {"received": True}
+    },
+    {
+        "name": "shopify",
+        "headers": {"x-shopify-topic": None},
+        "response": {"received": True, "topic": "{{header.x-shopify-topic}}"}
+    },
+    {
+        "name": "twilio",
+        "headers": {"x-twilio-signature": None},
+        "response": {"received": True}
+    }
+]
+
+Renderer = Callable[[Dict[str, Any], Dict[str, str]], Any]
+
+PLACEHOLDER_SOURCES = ("body", "header", "query", "request")
+PLACEHOLDER_VALUES = ("now", "timestamp", "uuid")
+REQUEST_FIELDS = ("id", "method", "content_type", "ip_address")
+
+
+def _check_reference(reference: str) -> None:
+    source, _, name = reference.partition(".")
+    if reference in PLACEHOLDER_VALUES or (source in PLACEHOLDER_SOURCES and name):
+        if source != "request" or name in REQUEST_FIELDS:
+            return
+    raise ValueError(f"Unknown template placeholder: {{{{{reference}}}}}")
+
+
+def _lookup(reference: str, request_data: Dict[str, Any], headers: Dict[str, str]) -> Any:
+    source, _, name = reference.partition(".")
+    if source == "body":
+        return json_value(request_data, name)
+    if source == "header":
+        return headers.get(name.lower(), MISSING)
+    if source == "query":
+        return (request_data.get("query_params") or {}).get(name, MISSING)
+    if source == "request":
+        return request_data.get(name, MISSING)
+    if reference == "now":
+        return datetime.now(timezone.utc).isoformat()
+    if reference == "timestamp":
+        return int(time.time())
+    return str(uuid.uuid4())
+
+
+def compile_template(template: Any) -> Renderer:
+    """Turn a response template into a function of ``(request_data, headers)``.
+
+    Strings may embed ``{{body.path}}``, ``{{header.name}}``,
+    ``{{query.name}}``, ``{{request.id}}``, ``{{now}}``, ``{{timestamp}}``
+    or ``{{uuid}}``. A string that is exactly one placeholder takes the
+    value's own JSON type (null when missing); embedded placeholders are
+    rendered as text. Parsing happens here, once per rule.
+    """
+    if isinstance(template, dict):
+        items = [(key, compile_template(value)) for key, value in template.items()]
+        return lambda request_data, headers: {key: render(request_data, headers) for key, render in items}
+
+    if isinstance(template, list):
+        renderers = [compile_template(value) for value in template]
+        return lambda request_data, headers: [render(request_data, headers) for render in renderers]
+
+    if not isinstance(template, str) or "{{" not in template:
+        return lambda request_data, headers: template
+
+    whole = PLACEHOLDER_PATTERN.fullmatch(template)
+    parts = PLACEHOLDER_PATTERN.split(template)
+    for reference in parts[1::2]:
+        _check_reference(reference)
+
+    if whole is not None:
+        reference = whole.group(1)
+
+        def render_value(request_data: Dict[str, Any], headers: Dict[str, str]) -> Any:
+            value = _lookup(reference, request_data, headers)
+            return None if value is MISSING else value
+
+        return render_value
+
+    def render_text(request_data: Dict[str, Any], headers: Dict[str, str]) -> str:
+        rendered = []
+        for index, part in enumerate(parts):
+            if index % 2 == 0:
+                rendered.append(part)
+                continue
+            value = _lookup(part, request_data, headers)
+            if value is not MISSING and value is not None:
+                rendered.append(value if isinstance(value, str) else dumps_text(value))
+        return "".join(rendered)
+
+    return render_text
+
+
+class MockRule:
+    __slots__ = ("index", "name", "headers", "predicates", "status_code", "render")
+
+    def __init__(self, index: int, spec: Dict[str, Any]):
+        if not isinstance(spec, dict) or "response" not in spec:
+            raise ValueError(f"Mock rule #{index} needs a 'response'")
+
+        self.index = index
+        self.name = spec.get("name") or f"rule-{index}"
+        self.headers: Tuple[Tuple[str, Optional[str]], ...] = tuple(
+            (name.lower(), value) for name, value in (spec.get("headers") or {}).items()
+        )
+        self.predicates = tuple(JsonPredicate.parse(expression) for expression in spec.get("when") or ())
+        self.status_code = int(spec.get("status_code", 200))
+        self.render = compile_template(spec["response"])
+
+    def matches(self, request_data: Dict[str, Any], headers: Dict[str, str]) -> bool:
+        for name, expected in self.headers:
+            value = headers.get(name)
+            if value is None or (expected is not None and value != expected):
+                return False
+        return all(predicate.matches(request_data) for predicate in self.predicates)
+
+
+class MockRuleEngine:
+    """Deterministic mocks for well-known senders, tried before the LLM.
+
+    Rules are compiled once into a dispatch table keyed by the first header
+    each rule requires, so a request only evaluates the rules whose
+    signature header it carries, plus rules that need no header. The first
+    matching rule (in declaration order) renders the mock.
+    """
+
+    def __init__(self, specs: Sequence[Dict[str, Any]]):
+        self.rules = [MockRule(index, spec) for index, spec in enumerate(specs)]
+        self._by_header: Dict[str, List[MockRule]] = {}
+        self._headerless: List[MockRule] = []
+        for rule in self.rules:
+            if rule.headers:
+                self._by_header.setdefault(rule.headers[0][0], []).append(rule)
+            else:
+                self._headerless.append(rule)
+
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+
+    def match(self, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The rendered mock for the first matching rule, or None."""
+        if isinstance(request_data, CapturedRequest):
+            header_items = zip(request_data.header_names, request_data.header_values)
+        else:
+            header_items = (request_data.get("headers") or {}).items()
+        headers = {name.lower(): value for name, value in header_items}
+
+        candidates = [rule for name in headers for rule in self._by_header.get(name, ())]
+        if len(candidates) > 1 or self._headerless:
+            candidates = sorted(candidates + self._headerless, key=lambda rule: rule.index)
+
+        for rule in candidates:
+            if rule.matches(request_data, headers):
+                self.hits[rule.name] = self.hits.get(rule.name, 0) + 1
+                return {
+                    "mock_response": rule.render(request_data, headers),
+                    "status_code": rule.status_code,
+                    "rule": rule.name,
+                    "source": "rule",
+                    "generated_at": request_data.get("timestamp"),
+                    "tokens_used": 0
+                }
+
+        self.misses += 1
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.rules),
+            "hits": dict(self.hits),
+            "misses": self.misses
+        }
+
+
+def load_rule_specs(path: str) -> List[Dict[str, Any]]:
+    specs = loads(Path(path).read_bytes())
+    if not isinstance(specs, list):
+        raise ValueError(f"{path} must contain a JSON array of mock rules")
+    return specs
+
+
+def create_mock_rules() -> Optional[MockRuleEngine]:
+    if not settings.MOCK_RULES_ENABLED:
+        return None
+
+    specs = load_rule_specs(settings.MOCK_RULES_PATH) if settings.MOCK_RULES_PATH else []
+    engine = MockRuleEngine([*specs, *BUILTIN_RULES])
+    logger.info(f"📐 Loaded {len(engine.rules)} mock response rules")
+    return engine
+
+
+mock_rules = create_mock_rules()
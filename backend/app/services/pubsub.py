@@ -0,0 +1,178 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+from core.config import settings
+from core.log import get_logger
+from core.resp_client import RespError, encode_command, open_async_connection, read_reply_async
+
+
+logger = get_logger(__name__)
+
+
+MessageHandler = Callable[[str, str], None]
+
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_PENDING_PUBLISHES = 10_000
+
+
+class PubSub(ABC):
+    """Carries encoded events from whichever worker received a webhook to
+    every worker's local WebSocket subscribers.
+
+    Handlers are called with ``(endpoint_id, payload)``.
+    """
+
+    distributed = False
+
+    def __init__(self):
+        self._handlers: List[MessageHandler] = []
+
+    def subscribe(self, handler: MessageHandler) -> None:
+        self._handlers.append(handler)
+
+    @abstractmethod
+    def publish(self, endpoint_id: str, payload: str) -> None:
+        ...
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def _dispatch(self, endpoint_id: str, payload: str) -> None:
+        for handler in self._handlers:
+            try:
+                handler(endpoint_id, payload)
+            except Exception as e:
+                logger.error(f"❌ Pub/sub handler error: {e}")
+
+
+class InProcessPubSub(PubSub):
+    """Single-node bus: publishing delivers straight to local handlers."""
+
+    def publish(self, endpoint_id: str, payload: str) -> None:
+        self._dispatch(endpoint_id, payload)
+
+
+class RedisPubSub(PubSub):
+    """Bus over a Redis-protocol server, one channel per endpoint.
+
+    Publishing is non-blocking: payloads are queued and written in batches
+    by a publisher task. A second connection PSUBSCRIBEs to every endpoint
+    channel and hands messages to the local handlers. Both connections
+    reconnect on failure.
+    """
+
+    distributed = True
+
+    def __init__(self, url: str, channel_prefix: str = "webhook-debugger:events:"):
+        super().__init__()
+        self.url = url
+        self.channel_prefix = channel_prefix
+        self._outbox: "asyncio.Queue[tuple]" = asyncio.Queue(maxsize=MAX_PENDING_PUBLISHES)
+        self._tasks: List[asyncio.Task] = []
+        self._subscribed: Optional[asyncio.Event] = None
+        self.dropped = 0
+
+    def publish(self, endpoint_id: str, payload: str) -> None:
+        try:
+            self._outbox.put_nowait((self.channel_prefix + endpoint_id, payload))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"⚠️  Pub/sub outbox full, dropped event for {endpoint_id}")
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._subscribed = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run_publisher()),
+            asyncio.create_task(self._run_subscriber())
+        ]
+
+    async def wait_until_subscribed(self, timeout: float = 5.0) -> None:
+        await asyncio.wait_for(self._subscribed.wait(), timeout)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_publisher(self) -> None:
+        batch = []
+        while True:
+            if not batch:
+                batch.append(await self._outbox.get())
+
+            try:
+                reader, writer = await open_async_connection(self.url)
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.error(f"❌ Pub/sub publisher cannot connect: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+
+            try:
+                while True:
+                    while not self._outbox.empty() and len(batch) < 500:
+                        batch.append(self._outbox.get_nowait())
+
+                    writer.write(b"".join(
+                        encode_command("PUBLISH", channel, payload)
+                        for channel, payload in batch
+                    ))
+                    await writer.drain()
+                    for _ in batch:
+                        await read_reply_async(reader)
+
+                    batch = [await self._outbox.get()]
+            except (ConnectionError, OSError, RespError) as e:
+                logger.error(f"❌ Pub/sub publisher connection lost: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                writer.close()
+
+    async def _run_subscriber(self) -> None:
+        pattern = self.channel_prefix + "*"
+        prefix_length = len(self.channel_prefix)
+
+        while True:
+            try:
+                reader, writer = await open_async_connection(self.url)
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.error(f"❌ Pub/sub subscriber cannot connect: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+
+            try:
+                writer.write(encode_command("PSUBSCRIBE", pattern))
+                await writer.drain()
+
+                while True:
+                    message = await read_reply_async(reader)
+                    kind = message[0]
+
+                    if kind == b"psubscribe":
+                        self._subscribed.set()
+                    elif kind == b"pmessage":
+                        channel = message[2].decode("utf-8")
+                        self._dispatch(channel[prefix_length:], message[3].decode("utf-8"))
+            except (ConnectionError, OSError, RespError) as e:
+                logger.error(f"❌ Pub/sub subscriber connection lost: {e}")
+                self._subscribed.clear()
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                writer.close()
+
+
+def create_pubsub() -> PubSub:
+    if settings.PUBSUB_BACKEND == "redis":
+        return RedisPubSub(settings.REDIS_URL, channel_prefix=settings.PUBSUB_CHANNEL_PREFIX)
+
+    return InProcessPubSub()
+
+
+event_bus = create_pubsub()
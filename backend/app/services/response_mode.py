@@ -0,0 +1,108 @@
+import math
+import random
+from typing import Any, Dict, Optional
+
+from core.serialization import dumps
+
+
+MODE_ENVELOPE = "envelope"
+MODE_MOCK = "mock"
+
+LATENCY_NONE = "none"
+LATENCY_FIXED = "fixed"
+LATENCY_UNIFORM = "uniform"
+LATENCY_PERCENTILES = "percentiles"
+
+MAX_DELAY_SECONDS = 60.0
+
+# z-score of the 99th percentile of a standard normal distribution
+Z_P99 = 2.3263
+
+DEFAULT_MOCK_BODY = {"received": True}
+
+
+def sample_latency(latency: Optional[Dict[str, Any]], rng: random.Random = random) -> float:
+    """Seconds to hold the response, drawn from an endpoint's latency profile.
+
+    ``fixed`` always waits ``ms``; ``uniform`` draws between ``min_ms`` and
+    ``max_ms``; ``percentiles`` draws from a log-normal distribution whose
+    median is ``p50_ms`` and whose 99th percentile is ``p99_ms`` - the long
+    right tail real upstreams show. Capped at ``MAX_DELAY_SECONDS``.
+    """
+    if not latency:
+        return 0.0
+
+    distribution = latency.get("distribution", LATENCY_NONE)
+    if distribution == LATENCY_FIXED:
+        delay_ms = latency.get("ms", 0)
+    elif distribution == LATENCY_UNIFORM:
+        delay_ms = rng.uniform(latency.get("min_ms", 0), latency.get("max_ms", 0))
+    elif distribution == LATENCY_PERCENTILES:
+        p50 = latency.get("p50_ms", 0)
+        p99 = latency.get("p99_ms", p50)
+        if p50 <= 0:
+            return 0.0
+        sigma = math.log(max(p99, p50) / p50) / Z_P99
+        delay_ms = rng.lognormvariate(math.log(p50), sigma)
+    else:
+        return 0.0
+
+    return min(max(delay_ms, 0) / 1000, MAX_DELAY_SECONDS)
+
+
+class MockReply:
+    """The HTTP response an endpoint in ``mock`` mode sends back to the sender."""
+
+    __slots__ = ("status_code", "headers", "body", "delay")
+
+    def __init__(self, status_code: int, headers: Dict[str, str], body: Any, delay: float = 0.0):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.delay = delay
+
+    @property
+    def media_type(self) -> str:
+        for name, value in self.headers.items():
+            if name.lower() == "content-type":
+                return value
+        return "text/plain" if isinstance(self.body, (str, bytes)) else "application/json"
+
+    def render(self) -> bytes:
+        if isinstance(self.body, bytes):
+            return self.body
+        if isinstance(self.body, str):
+            return self.body.encode("utf-8")
+        return dumps(self.body)
+
+
+def is_mock_mode(response_config: Optional[Dict[str, Any]]) -> bool:
+    return bool(response_config) and response_config.get("mode") == MODE_MOCK
+
+
+def has_static_body(response_config: Optional[Dict[str, Any]]) -> bool:
+    return is_mock_mode(response_config) and response_config.get("body") is not None
+
+
+def build_mock_reply(response_config: Dict[str, Any], ai_mock: Optional[Dict[str, Any]]) -> MockReply:
+    """Status, headers and body for a mock-mode endpoint.
+
+    The configured ``body`` wins; otherwise the rule or AI mock is sent, and
+    ``{"received": true}`` when there is none (e.g. the AI call was rate
+    limited). The status code comes from the config, then from the matching
+    rule, then defaults to 200.
+    """
+    ai_mock = ai_mock or {}
+
+    body = response_config.get("body")
+    if body is None:
+        body = ai_mock["mock_response"] if "mock_response" in ai_mock else DEFAULT_MOCK_BODY
+
+    status_code = response_config.get("status_code") or ai_mock.get("status_code") or 200
+
+    return MockReply(
+        status_code=status_code,
+        headers=dict(response_config.get("headers") or {}),
+        body=body,
+        delay=sample_latency(response_config.get("latency"))
+    )
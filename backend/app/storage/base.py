@@ -0,0 +1,144 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Any, List, Tuple
+
+from storage.query import RequestQuery, RequestPage
+from storage.search_index import RequestSearch
+
+
+REAP_TTL = "ttl"
+REAP_IDLE = "idle"
+REAP_MEMORY = "memory"
+
+
+def expiry_for(created_at: datetime, ttl_seconds: int) -> Optional[datetime]:
+    """When an endpoint created at ``created_at`` expires; None means never (``ttl_seconds`` of 0)."""
+    return created_at + timedelta(seconds=ttl_seconds) if ttl_seconds > 0 else None
+
+
+class BaseEndpointStore(ABC):
+    """Storage interface shared by the in-memory and persistent backends."""
+
+    # Whether calls can wait on I/O; the service then keeps them off the event loop
+    blocking = False
+
+    @abstractmethod
+    def create(
+            self,
+            endpoint_id: str,
+            name: Optional[str] = None,
+            max_requests: Optional[int] = None,
+            ttl_seconds: Optional[int] = None
+    ) -> Dict:
+        """``max_requests`` and ``ttl_seconds`` override the default history capacity and lifetime."""
+
+    @abstractmethod
+    def delete(self, endpoint_id: str) -> Optional[int]:
+        """Remove an endpoint with its requests and spooled bodies.
+
+        Returns how many requests were dropped, or None for unknown endpoints.
+        """
+
+    @abstractmethod
+    def set_response_config(self, endpoint_id: str, response_config: Optional[Dict[str, Any]]) -> bool:
+        """Store how the endpoint answers webhooks (see ``services.response_mode``); None resets it."""
+
+    @abstractmethod
+    def set_forward_url(self, endpoint_id: str, forward_url: Optional[str]) -> bool:
+        """Store where new webhooks are forwarded to (see ``services.forwarder``); None stops forwarding."""
+
+    @abstractmethod
+    def touch(self, endpoint_id: str) -> None:
+        """Record activity on an endpoint (new webhook, viewer or API read)."""
+
+    @abstractmethod
+    def find_expired(self, now: float, idle_before: Optional[float] = None, limit: int = 1000) -> List[Tuple[str, str]]:
+        """Up to ``limit`` ``(endpoint_id, reason)`` pairs due for removal.
+
+        Reason is ``REAP_TTL`` for endpoints past ``expires_at`` and
+        ``REAP_IDLE`` for those without activity since ``idle_before``
+        (epoch seconds; None skips the idle check).
+        """
+
+    @abstractmethod
+    def get(self, endpoint_id: str) -> Optional[Dict]:
+        """Endpoint metadata together with its stored requests."""
+
+    @abstractmethod
+    def get_metadata(self, endpoint_id: str) -> Optional[Dict]:
+        """Endpoint metadata only - cheap enough to call on every webhook."""
+
+    @abstractmethod
+    def increment_count(self, endpoint_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def add_request(self, endpoint_id: str, request_data: Dict) -> bool:
+        """Append a request, setting its ``seq`` to the endpoint's next event number."""
+
+    @abstractmethod
+    def update_request(self, endpoint_id: str, request_id: str, fields: Dict[str, Any]) -> bool:
+        ...
+
+    @abstractmethod
+    def get_request(self, endpoint_id: str, request_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def list_requests(
+            self,
+            endpoint_id: str,
+            limit: Optional[int] = None,
+            since_id: Optional[str] = None
+    ) -> Optional[List[Dict]]:
+        """A window of stored requests, oldest first.
+
+        ``since_id`` returns the requests newer than that id, ``limit`` caps
+        the window to the most recent entries (or the first ``limit`` after
+        ``since_id``). Returns None for unknown endpoints.
+        """
+
+    @abstractmethod
+    def requests_after_seq(self, endpoint_id: str, after_seq: int, limit: int) -> Optional[List[Dict]]:
+        """Up to ``limit`` stored requests whose ``seq`` is greater than ``after_seq``, oldest first.
+
+        ``seq`` is the per-endpoint event number ``add_request`` assigns
+        (1, 2, 3, ...). Requests already evicted are simply absent, so a
+        first result above ``after_seq + 1`` means the caller missed some.
+        Returns None for unknown endpoints.
+        """
+
+    @abstractmethod
+    def query_requests(self, endpoint_id: str, query: RequestQuery) -> Optional[RequestPage]:
+        """One cursor page of requests matching ``query``; None for unknown endpoints.
+
+        Raises ``UnknownCursorError`` when ``after``/``before`` is not stored.
+        """
+
+    @abstractmethod
+    def search_requests(self, endpoint_id: str, search: RequestSearch) -> Optional[RequestPage]:
+        """Requests matching ``search``, newest first; None for unknown endpoints.
+
+        Raises ``UnknownCursorError`` when ``before`` is not stored.
+        """
+
+    @abstractmethod
+    def get_request_count(self, endpoint_id: str) -> int:
+        ...
+
+    def memory_usage(self) -> int:
+        """Estimated bytes held by stored requests; 0 for stores that keep them on disk."""
+        return 0
+
+    def shed_memory(self, budget_bytes: int) -> List[Tuple[str, int, int]]:
+        """Clear least recently used histories until ``memory_usage`` fits ``budget_bytes``.
+
+        Returns ``(endpoint_id, requests_dropped, bytes_freed)`` per cleared endpoint.
+        """
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+    def close(self) -> None:
+        pass
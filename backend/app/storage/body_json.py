@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Union
+
+from core.config import settings
+from core.serialization import loads
+from storage.captured_request import CapturedRequest
+
+
+_MISSING = object()
+
+
+def parse_json_body(raw: Union[str, bytes, None], content_type: Optional[str] = None) -> Any:
+    """Parse a text body that looks like JSON; anything else is None."""
+    if not raw:
+        return None
+
+    head = raw.lstrip()[:1]
+    looks_like_json = head in ("{", "[", b"{", b"[")
+    if not looks_like_json and "json" not in (content_type or ""):
+        return None
+
+    try:
+        return loads(raw)
+    except ValueError:
+        return None
+
+
+def parse_request_json(request_data: Dict[str, Any]) -> Any:
+    if "body_json" in request_data:
+        return request_data["body_json"]
+    if request_data.get("body_truncated") or request_data.get("body_encoding", "utf-8") != "utf-8":
+        return None
+    return parse_json_body(request_data.get("body_raw"), request_data.get("content_type"))
+
+
+class JsonBodyCache:
+    """Bounded LRU of parsed request bodies, keyed by request id.
+
+    Stored requests keep only ``body_raw``; the parsed form is built the
+    first time something asks for it and dropped again under pressure, so
+    entries for evicted or deleted requests simply age out.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, request_data: Dict[str, Any]) -> Any:
+        if "body_json" in request_data:
+            return request_data["body_json"]
+
+        request_id = request_data.get("id")
+        if request_id is None:
+            return parse_request_json(request_data)
+
+        value = self._entries.get(request_id, _MISSING)
+        if value is not _MISSING:
+            self._entries.move_to_end(request_id)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = parse_request_json(request_data)
+        if self.max_entries > 0:
+            self._entries[request_id] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def peek(self, request_data: Dict[str, Any], default: Any = None) -> Any:
+        """The parsed body if it is already known, else ``default`` - never parses."""
+        if "body_json" in request_data:
+            return request_data["body_json"]
+        return self._entries.get(request_data.get("id"), default)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+body_json_cache = JsonBodyCache(settings.BODY_JSON_CACHE_ENTRIES)
+
+
+def body_json_of(request_data: Dict[str, Any]) -> Any:
+    return body_json_cache.get(request_data)
+
+
+def with_body_json(request_data: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """API view of a stored request: ``body_json`` filled in, optionally projected."""
+    if fields:
+        return {
+            field: body_json_of(request_data) if field == "body_json" else request_data.get(field)
+            for field in fields
+        }
+
+    data = request_data.to_dict() if isinstance(request_data, CapturedRequest) else dict(request_data)
+    data["body_json"] = body_json_of(request_data)
+    return data
+
+
+def with_cached_body_json(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Like ``with_body_json``, but ``body_json`` is only included when already parsed."""
+    data = request_data.to_dict() if isinstance(request_data, CapturedRequest) else dict(request_data)
+    body_json = body_json_cache.peek(request_data, _MISSING)
+    if body_json is not _MISSING:
+        data["body_json"] = body_json
+    return data
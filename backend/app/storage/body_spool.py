@@ -0,0 +1,54 @@
+import os
+import tempfile
+from typing import BinaryIO, Iterable, Optional
+
+from core.config import settings
+from core.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class BodySpool:
+    """Disk home for request bodies too large to keep inline.
+
+    Files are named after the request id, so every worker sharing the
+    directory can serve or delete a body no matter which one received it.
+    Bodies are written to a ``.part`` file and renamed once complete.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "webhook-debugger-bodies")
+
+    def path_for(self, request_id: str) -> str:
+        return os.path.join(self.directory, f"{request_id}.body")
+
+    def open_for_write(self, request_id: str) -> BinaryIO:
+        os.makedirs(self.directory, exist_ok=True)
+        return open(self.path_for(request_id) + ".part", "wb")
+
+    def commit(self, request_id: str) -> None:
+        path = self.path_for(request_id)
+        os.replace(path + ".part", path)
+
+    def discard(self, request_id: str) -> None:
+        self._unlink(self.path_for(request_id) + ".part")
+
+    def exists(self, request_id: str) -> bool:
+        return os.path.exists(self.path_for(request_id))
+
+    def release(self, request_ids: Iterable[str]) -> None:
+        for request_id in request_ids:
+            self._unlink(self.path_for(request_id))
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"❌ Could not remove spooled body {path}: {e}")
+
+
+body_spool = BodySpool(settings.BODY_SPOOL_DIR or None)
@@ -0,0 +1,195 @@
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from storage.cold_tier import CompressedBody
+
+
+MAX_SHARED_NAME_TUPLES = 4096
+
+# Measured per-record overhead (see CapturedRequest) and its plain-dict equivalent;
+# tests/test_captured_request.py re-measures the record figure
+RECORD_OVERHEAD_BYTES = 370
+DICT_OVERHEAD_BYTES = 1070
+
+_name_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def shared_names(names: Iterable[str]) -> Tuple[str, ...]:
+    """One interned tuple per distinct header/param name list.
+
+    Webhooks from the same sender carry the same headers in the same order,
+    so thousands of requests end up pointing at a handful of tuples.
+    """
+    key = tuple(sys.intern(name) for name in names)
+    shared = _name_tuples.get(key)
+    if shared is not None:
+        return shared
+    if len(_name_tuples) < MAX_SHARED_NAME_TUPLES:
+        _name_tuples[key] = key
+    return key
+
+
+def _split(mapping: Optional[Mapping[str, str]]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    if not mapping:
+        return (), ()
+    return shared_names(mapping.keys()), tuple(mapping.values())
+
+
+class CapturedRequest:
+    """Compact in-memory record of one captured webhook.
+
+    Replaces the plain dict (plus nested ``headers``/``query_params`` dicts)
+    each request used to be stored as: header and query names live in shared
+    interned tuples, values in a tuple, and the timestamp is an epoch float.
+    The body itself is unchanged.
+
+    Per-request overhead measured with tracemalloc for a Stripe-style
+    webhook with 14 headers and no query params: about 1,070 bytes as
+    dicts, about 370 bytes as a record (40 of them the sequence number).
+    This excludes the header values and the body, which both layouts hold
+    as the same strings.
+
+    Reads go through a read-only mapping interface (``record["headers"]``,
+    ``record.get("timestamp")``) that rebuilds the public shape on access,
+    so stores, filters and the AI service work unchanged. ``to_dict()``
+    produces the ``WebhookRequest`` shape at the API boundary.
+    """
+
+    __slots__ = (
+        "id", "created_at", "method", "header_names", "header_values",
+        "_body", "body_encoding", "body_truncated", "content_type",
+        "content_length", "ip_address", "query_names", "query_values",
+        "seq", "ai_mock_response"
+    )
+
+    FIELDS = (
+        "id", "timestamp", "method", "headers", "body_raw", "body_encoding",
+        "body_truncated", "content_type", "content_length", "ip_address",
+        "query_params", "seq", "ai_mock_response"
+    )
+    _FIELD_SET = frozenset(FIELDS)
+    _MUTABLE = frozenset({"seq", "ai_mock_response"})
+
+    def __init__(
+            self,
+            id: str,
+            method: str,
+            headers: Optional[Mapping[str, str]] = None,
+            body_raw: Union[str, bytes] = "",
+            body_encoding: str = "utf-8",
+            body_truncated: bool = False,
+            content_type: Optional[str] = None,
+            content_length: int = 0,
+            ip_address: Optional[str] = None,
+            query_params: Optional[Mapping[str, str]] = None,
+            created_at: Optional[float] = None,
+            seq: int = 0,
+            ai_mock_response: Optional[Dict[str, Any]] = None
+    ):
+        self.id = id
+        self.created_at = time.time() if created_at is None else created_at
+        self.method = sys.intern(method)
+        self.header_names, self.header_values = _split(headers)
+        self._body = body_raw
+        self.body_encoding = sys.intern(body_encoding)
+        self.body_truncated = body_truncated
+        self.content_type = content_type
+        self.content_length = content_length
+        self.ip_address = ip_address
+        self.query_names, self.query_values = _split(query_params)
+        self.seq = seq
+        self.ai_mock_response = ai_mock_response
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at)
+
+    @property
+    def body_raw(self) -> Union[str, bytes]:
+        body = self._body
+        if isinstance(body, CompressedBody):
+            return body.expand()
+        return body
+
+    @property
+    def is_cold(self) -> bool:
+        return isinstance(self._body, CompressedBody)
+
+    @property
+    def cold_body(self) -> Optional[CompressedBody]:
+        return self._body if isinstance(self._body, CompressedBody) else None
+
+    def freeze(self, compressed: CompressedBody) -> None:
+        """Swap the inline body for its compressed form; reads decompress on demand."""
+        self._body = compressed
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return dict(zip(self.header_names, self.header_values))
+
+    @property
+    def query_params(self) -> Dict[str, str]:
+        return dict(zip(self.query_names, self.query_values))
+
+    def keys(self) -> List[str]:
+        if self.ai_mock_response is None:
+            return list(self.FIELDS[:-1])
+        return list(self.FIELDS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            return default
+        return getattr(self, key)
+
+    def update(self, fields: Mapping[str, Any]) -> None:
+        for key, value in fields.items():
+            self[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._MUTABLE:
+            raise KeyError(f"{key} cannot be changed on a captured request")
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        if key == "ai_mock_response":
+            return self.ai_mock_response is not None
+        return key in self._FIELD_SET
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __repr__(self) -> str:
+        return f"CapturedRequest(id={self.id!r}, method={self.method!r}, content_length={self.content_length})"
+
+
+def received_at(request_data: Any) -> Optional[float]:
+    """Unix time a stored request was received, for records and plain dicts alike."""
+    if isinstance(request_data, CapturedRequest):
+        return request_data.created_at
+
+    timestamp = request_data.get("timestamp")
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else None
+
+
+def estimated_size(request_data: Any) -> int:
+    """Approximate bytes a stored request keeps alive, body counted as currently stored."""
+    if isinstance(request_data, CapturedRequest):
+        body = request_data._body
+        body_size = len(body.blob) if isinstance(body, CompressedBody) else len(body)
+        return RECORD_OVERHEAD_BYTES + sum(map(len, request_data.header_values)) + body_size
+
+    body = request_data.get("body_raw") or ""
+    return DICT_OVERHEAD_BYTES + len(body)
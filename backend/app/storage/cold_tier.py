@@ -0,0 +1,109 @@
+import zlib
+from typing import Any, Dict, Iterable, Optional, Union
+
+
+ZDICT_MAX_BYTES = 32 * 1024
+TRAINING_SAMPLES = 32
+
+
+class BodyCodec:
+    """zlib with a preset dictionary built from an endpoint's own bodies.
+
+    Webhooks to one endpoint share nearly all of their structure (keys,
+    event names, sender metadata), so priming zlib with recent bodies lets
+    each compressed body store little more than what makes it different.
+    """
+
+    __slots__ = ("zdict", "level")
+
+    def __init__(self, samples: Iterable[bytes], level: int = 6):
+        # zlib favours the end of the dictionary, so the newest samples go last
+        self.zdict = b"".join(samples)[-ZDICT_MAX_BYTES:]
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self.level, zdict=self.zdict) if self.zdict else zlib.compressobj(self.level)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, blob: bytes) -> bytes:
+        decompressor = zlib.decompressobj(zdict=self.zdict) if self.zdict else zlib.decompressobj()
+        return decompressor.decompress(blob) + decompressor.flush()
+
+
+class CompressedBody:
+    __slots__ = ("blob", "codec", "is_text", "raw_size")
+
+    def __init__(self, blob: bytes, codec: BodyCodec, is_text: bool, raw_size: int):
+        self.blob = blob
+        self.codec = codec
+        self.is_text = is_text
+        self.raw_size = raw_size
+
+    def expand(self) -> Union[str, bytes]:
+        data = self.codec.decompress(self.blob)
+        return data.decode("utf-8") if self.is_text else data
+
+
+def _as_bytes(body: Union[str, bytes]) -> bytes:
+    return body.encode("utf-8") if isinstance(body, str) else body
+
+
+class ColdTier:
+    """Compresses the bodies of requests that have aged out of an
+    endpoint's hot window (the newest ``hot_size`` requests).
+
+    The dictionary is trained once, from the hot bodies present when the
+    first request goes cold; each compressed body keeps a reference to the
+    codec it was written with.
+    """
+
+    def __init__(self, hot_size: int, min_body_bytes: int = 128):
+        self.hot_size = hot_size
+        self.min_body_bytes = min_body_bytes
+        self.codec: Optional[BodyCodec] = None
+        self.compressed = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def train(self, bodies: Iterable[Any]) -> BodyCodec:
+        samples = [_as_bytes(body) for body in bodies if isinstance(body, (str, bytes)) and body]
+        self.codec = BodyCodec(samples[-TRAINING_SAMPLES:])
+        return self.codec
+
+    def freeze(self, record: Any, hot_bodies: Iterable[Any] = ()) -> bool:
+        """Compress ``record``'s body in place if that saves space."""
+        body = record.body_raw if not record.is_cold else None
+        if not isinstance(body, (str, bytes)):
+            return False
+
+        data = _as_bytes(body)
+        if len(data) < self.min_body_bytes:
+            return False
+
+        codec = self.codec or self.train(hot_bodies)
+        blob = codec.compress(data)
+        if len(blob) >= len(data):
+            return False
+
+        record.freeze(CompressedBody(blob, codec, isinstance(body, str), len(data)))
+        self.compressed += 1
+        self.raw_bytes += len(data)
+        self.stored_bytes += len(blob)
+        return True
+
+    def forget(self, record: Any) -> None:
+        """Account for a cold record leaving the history."""
+        if getattr(record, "is_cold", False):
+            cold_body = record.cold_body
+            self.compressed -= 1
+            self.stored_bytes -= len(cold_body.blob)
+            self.raw_bytes -= cold_body.raw_size
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "hot_size": self.hot_size,
+            "compressed_bodies": self.compressed,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "dictionary_bytes": len(self.codec.zdict) if self.codec else 0
+        }
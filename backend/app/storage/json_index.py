@@ -0,0 +1,144 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from core.config import settings
+from core.log import get_logger
+from storage.body_json import body_json_of, parse_request_json
+
+
+logger = get_logger(__name__)
+
+
+MISSING = object()
+
+MAX_PENDING_INDEX_JOBS = 10_000
+
+
+def split_path(path: str) -> Tuple[str, ...]:
+    return tuple(part for part in path.strip().split(".") if part)
+
+
+def extract_path(document: Any, parts: Sequence[str]) -> Any:
+    """Follow dotted ``parts`` through dicts and lists; MISSING when absent."""
+    value = document
+    for part in parts:
+        if isinstance(value, dict):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return MISSING
+        if value is MISSING:
+            return MISSING
+    return value
+
+
+class JsonPathIndex:
+    """Values of a few configured JSON paths for each captured request.
+
+    Filtering on an indexed path reads a small tuple instead of parsing the
+    body. Requests are indexed by a background task so ingest never waits
+    on parsing. Each endpoint's entries are capped at its history capacity,
+    so entries for evicted requests fall out in the same FIFO order.
+    """
+
+    def __init__(self, paths: Sequence[str] = ()):
+        self.paths = [path.strip() for path in paths if path.strip()]
+        self._parts = [split_path(path) for path in self.paths]
+        self._position = {path: i for i, path in enumerate(self.paths)}
+        self._values: Dict[str, Tuple[Any, ...]] = {}
+        self._order: Dict[str, Deque[str]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.paths)
+
+    def submit(self, endpoint_id: str, request_data: Dict[str, Any], capacity: int) -> None:
+        """Queue a request for indexing; a no-op unless the indexer is running."""
+        if self._task is None:
+            return
+        try:
+            self._queue.put_nowait((endpoint_id, request_data, capacity))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def add(self, endpoint_id: str, request_data: Dict[str, Any], capacity: int) -> None:
+        document = parse_request_json(request_data)
+        request_id = request_data["id"]
+
+        self._values[request_id] = tuple(extract_path(document, parts) for parts in self._parts)
+
+        order = self._order.setdefault(endpoint_id, deque())
+        order.append(request_id)
+        while len(order) > capacity:
+            self._values.pop(order.popleft(), None)
+
+    def lookup(self, request_id: str, path: str) -> Any:
+        """Indexed value of ``path``; MISSING when the path or request is not indexed."""
+        position = self._position.get(path)
+        values = self._values.get(request_id)
+        if position is None or values is None:
+            return MISSING
+        return values[position]
+
+    def is_indexed(self, request_id: str, path: str) -> bool:
+        return path in self._position and request_id in self._values
+
+    def drop_endpoint(self, endpoint_id: str) -> None:
+        for request_id in self._order.pop(endpoint_id, ()):
+            self._values.pop(request_id, None)
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=MAX_PENDING_INDEX_JOBS)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "paths": self.paths,
+            "indexed_requests": len(self._values),
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "dropped": self.dropped
+        }
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    async def _run(self) -> None:
+        while True:
+            endpoint_id, request_data, capacity = await self._queue.get()
+            try:
+                self.add(endpoint_id, request_data, capacity)
+            except Exception as e:
+                logger.error(f"❌ JSON index failed for {request_data.get('id')}: {e}")
+
+
+def parse_index_paths(value: str) -> List[str]:
+    return [path.strip() for path in value.split(",") if path.strip()]
+
+
+json_index = JsonPathIndex(parse_index_paths(settings.JSON_INDEX_PATHS))
+
+
+def json_value(request_data: Dict[str, Any], path: str) -> Any:
+    """Value of a dotted JSON path in a request body, served from the index when possible."""
+    request_id = request_data.get("id")
+    if json_index.is_indexed(request_id, path):
+        return json_index.lookup(request_id, path)
+    return extract_path(body_json_of(request_data), split_path(path))
@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.serialization import dumps_text
+from storage.captured_request import CapturedRequest
+from storage.json_index import MISSING, json_value
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.astimezone(timezone.utc)
+    return value
+
+
+class UnknownCursorError(ValueError):
+    """A cursor request id that the endpoint does not (or no longer) hold."""
+
+    def __init__(self, request_id: str):
+        super().__init__(f"Unknown or expired cursor: {request_id}")
+        self.request_id = request_id
+
+
+@dataclass
+class RequestQuery:
+    """Cursor and filter parameters for listing an endpoint's requests.
+
+    ``after``/``before`` are request ids; results are always returned oldest
+    first. Without ``after`` the page ends at the newest matching request.
+    A cursor that is not stored raises ``UnknownCursorError``.
+    """
+
+    limit: int = 50
+    after: Optional[str] = None
+    before: Optional[str] = None
+    method: Optional[str] = None
+    content_type: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    has_headers: Tuple[str, ...] = ()
+    json_equals: Tuple[Tuple[str, str], ...] = ()
+
+    def __post_init__(self):
+        if self.method:
+            self.method = self.method.upper()
+        if self.content_type:
+            self.content_type = self.content_type.lower()
+        self.has_headers = tuple(name.lower() for name in self.has_headers)
+        if self.start_time is not None:
+            self.start_time = _as_utc(self.start_time)
+        if self.end_time is not None:
+            self.end_time = _as_utc(self.end_time)
+
+    @property
+    def has_filters(self) -> bool:
+        return bool(
+            self.method or self.content_type or self.has_headers
+            or self.start_time or self.end_time or self.json_equals
+        )
+
+    def matches(self, request_data: Dict[str, Any]) -> bool:
+        if self.method and request_data.get("method") != self.method:
+            return False
+
+        if self.content_type:
+            content_type = (request_data.get("content_type") or "").lower()
+            if not content_type.startswith(self.content_type):
+                return False
+
+        if self.start_time or self.end_time:
+            if isinstance(request_data, CapturedRequest):
+                timestamp = request_data.created_at
+            else:
+                timestamp = request_data.get("timestamp")
+                if not isinstance(timestamp, datetime):
+                    return False
+                timestamp = _as_utc(timestamp).timestamp()
+            if self.start_time and timestamp < self.start_time.timestamp():
+                return False
+            if self.end_time and timestamp > self.end_time.timestamp():
+                return False
+
+        if self.has_headers:
+            if isinstance(request_data, CapturedRequest):
+                names = request_data.header_names
+            else:
+                names = request_data.get("headers") or {}
+            header_names = {name.lower() for name in names}
+            if not all(name in header_names for name in self.has_headers):
+                return False
+
+        for path, expected in self.json_equals:
+            value = json_value(request_data, path)
+            if value is MISSING:
+                return False
+            if (value if isinstance(value, str) else dumps_text(value)) != expected:
+                return False
+
+        return True
+
+
+@dataclass
+class RequestPage:
+    requests: List[Dict[str, Any]] = field(default_factory=list)
+    has_more: bool = False
+
+
+def collect_page(candidates: Iterable[Dict[str, Any]], query: RequestQuery, forward: bool) -> RequestPage:
+    """Fill a page from candidates ordered away from the cursor.
+
+    ``forward`` candidates run oldest to newest (paging after a cursor),
+    otherwise newest to oldest; the page itself is always oldest first.
+    """
+    requests = []
+    for request_data in candidates:
+        if not query.matches(request_data):
+            continue
+        requests.append(request_data)
+        if len(requests) > query.limit:
+            break
+
+    has_more = len(requests) > query.limit
+    del requests[query.limit:]
+    if not forward:
+        requests.reverse()
+
+    return RequestPage(requests=requests, has_more=has_more)
@@ -0,0 +1,166 @@
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from storage.captured_request import received_at
+
+
+class RequestHistory(Sequence):
+    """Fixed-capacity ring buffer of captured requests, oldest first.
+
+    Every appended request gets a monotonically increasing sequence number;
+    the slot it lives in is ``seq % capacity``. Appending and evicting are
+    O(1) and windows ("last N", "since request X") are read straight from
+    the slots without copying the rest of the history.
+
+    Requests arrive here almost, but not exactly, in the order they were
+    received (a slow upload is stored after a quicker, later one). Each slot
+    also keeps the latest receive time seen up to it - a sorted column that
+    time ranges are bisected on.
+    """
+
+    __slots__ = ("capacity", "_slots", "_first_seq", "_next_seq", "_seq_by_id", "_latest", "_top", "_lag")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._first_seq = 0
+        self._next_seq = 0
+        self._seq_by_id: Dict[str, int] = {}
+        self._latest: List[float] = [0.0] * capacity
+        self._top = 0.0
+        self._lag = 0.0
+
+    @property
+    def first_seq(self) -> int:
+        return self._first_seq
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def append(self, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Store a request, returning the one it evicted (if any)."""
+        evicted = None
+        if len(self) == self.capacity:
+            evicted = self._slots[self._first_seq % self.capacity]
+            self._seq_by_id.pop(evicted["id"], None)
+            self._first_seq += 1
+
+        seq = self._next_seq
+        self._slots[seq % self.capacity] = request_data
+
+        timestamp = received_at(request_data)
+        if timestamp is not None:
+            self._top = max(self._top, timestamp)
+            self._lag = max(self._lag, self._top - timestamp)
+        self._latest[seq % self.capacity] = self._top
+
+        self._seq_by_id[request_data["id"]] = seq
+        self._next_seq += 1
+        return evicted
+
+    def seq_of(self, request_id: str) -> Optional[int]:
+        return self._seq_by_id.get(request_id)
+
+    def find(self, request_id: str) -> Optional[Dict[str, Any]]:
+        seq = self._seq_by_id.get(request_id)
+        if seq is None:
+            return None
+        return self._slots[seq % self.capacity]
+
+    def at(self, seq: int) -> Optional[Dict[str, Any]]:
+        if not self._first_seq <= seq < self._next_seq:
+            return None
+        return self._slots[seq % self.capacity]
+
+    def window(self, start_seq: int, end_seq: int) -> List[Dict[str, Any]]:
+        """Requests with ``start_seq <= seq < end_seq`` that are still retained."""
+        start = max(start_seq, self._first_seq)
+        end = min(end_seq, self._next_seq)
+        return [self._slots[seq % self.capacity] for seq in range(start, end)]
+
+    def iter_range(self, start_seq: int, end_seq: int, reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        start = max(start_seq, self._first_seq)
+        end = min(end_seq, self._next_seq)
+        seqs = range(end - 1, start - 1, -1) if reverse else range(start, end)
+        for seq in seqs:
+            yield self._slots[seq % self.capacity]
+
+    def time_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """Seq bounds enclosing every retained request received within ``[start, end]``.
+
+        Nothing stored before the latest time first reaches ``start`` can be
+        that late, and nothing stored after it passes ``end`` plus the worst
+        lateness seen so far can be that early. Both are binary searches.
+        """
+        lo, hi = self._first_seq, self._next_seq
+        if start is not None:
+            lo = self._bisect(start, lo, hi, inclusive=True)
+        if end is not None:
+            hi = self._bisect(end + self._lag, lo, hi, inclusive=False)
+        return lo, hi
+
+    def _bisect(self, value: float, lo: int, hi: int, inclusive: bool) -> int:
+        """First seq in ``[lo, hi)`` whose latest time reaches ``value`` (or passes it, if not ``inclusive``)."""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            latest = self._latest[mid % self.capacity]
+            if latest < value or (not inclusive and latest == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def last(self, n: int) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        return self.window(self._next_seq - n, self._next_seq)
+
+    def since(self, request_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Requests newer than ``request_id``.
+
+        If the id has already been evicted, everything still retained is
+        returned - the caller has fallen further behind than the buffer.
+        """
+        seq = self._seq_by_id.get(request_id)
+        start = self._first_seq if seq is None else seq + 1
+        end = self._next_seq if limit is None else min(self._next_seq, start + limit)
+        return self.window(start, end)
+
+    def clear(self) -> None:
+        self._slots = [None] * self.capacity
+        self._lag = 0.0
+        self._first_seq = self._next_seq
+        self._seq_by_id.clear()
+
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                self._slots[(self._first_seq + i) % self.capacity]
+                for i in range(*index.indices(len(self)))
+            ]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("request history index out of range")
+        return self._slots[(self._first_seq + index) % self.capacity]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for seq in range(self._first_seq, self._next_seq):
+            yield self._slots[seq % self.capacity]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (RequestHistory, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RequestHistory(capacity={self.capacity}, size={len(self)})"
@@ -0,0 +1,254 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.serialization import dumps_text
+from storage.captured_request import CapturedRequest
+from storage.json_index import MISSING, json_value
+from storage.query import RequestPage
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+BODY_SCAN_CHARS = 64 * 1024
+
+
+def tokenize(text: str) -> Iterable[str]:
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH:
+            yield token
+
+
+def _token_sources(request_data: Dict[str, Any]) -> List[Any]:
+    """Header values, query params and body text, in that order."""
+    if isinstance(request_data, CapturedRequest):
+        sources = [*request_data.header_values, *request_data.query_values]
+    else:
+        sources = [
+            *(request_data.get("headers") or {}).values(),
+            *(request_data.get("query_params") or {}).values()
+        ]
+    body = request_data.get("body_raw")
+    if isinstance(body, str):
+        sources.append(body)
+    return sources
+
+
+def scan_tokens(request_data: Dict[str, Any], max_tokens: int = 256) -> Tuple[Set[str], bool]:
+    """Up to ``max_tokens`` searchable tokens of a request, and whether that is all of them.
+
+    Only the first ``BODY_SCAN_CHARS`` of the body are read.
+    """
+    tokens: Set[str] = set()
+    complete = True
+
+    for source in _token_sources(request_data):
+        text = str(source)
+        if len(text) > BODY_SCAN_CHARS:
+            text = text[:BODY_SCAN_CHARS]
+            complete = False
+        for token in tokenize(text):
+            tokens.add(token)
+            if len(tokens) >= max_tokens:
+                return tokens, False
+    return tokens, complete
+
+
+def request_tokens(request_data: Dict[str, Any], max_tokens: int = 256) -> Set[str]:
+    """Searchable tokens of a request: header values, query params and body text."""
+    return scan_tokens(request_data, max_tokens)[0]
+
+
+def contains_terms(request_data: Dict[str, Any], terms: Iterable[str]) -> bool:
+    """Whether every term occurs in the request - all of it, however long."""
+    missing = set(terms)
+    if not missing:
+        return True
+
+    for source in _token_sources(request_data):
+        for token in tokenize(str(source)):
+            missing.discard(token)
+            if not missing:
+                return True
+    return False
+
+
+class SearchIndex:
+    """Inverted index from token to the sequence numbers of the requests
+    that contain it, maintained alongside an endpoint's request history.
+
+    Evicted requests are re-tokenized to find their postings, so the index
+    holds nothing beyond the posting sets themselves.
+
+    Requests with more tokens than ``max_tokens_per_request`` (or a body
+    longer than ``BODY_SCAN_CHARS``) are only partly indexed. Their sequence
+    numbers are kept in ``unindexed`` and searches check them in full.
+    """
+
+    def __init__(self, max_tokens_per_request: int = 256):
+        self.max_tokens_per_request = max_tokens_per_request
+        self._postings: Dict[str, Set[int]] = {}
+        self.unindexed: Set[int] = set()
+
+    def add(self, seq: int, request_data: Dict[str, Any]) -> None:
+        tokens, complete = scan_tokens(request_data, self.max_tokens_per_request)
+        if not complete:
+            self.unindexed.add(seq)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = {seq}
+            else:
+                postings.add(seq)
+
+    def remove(self, seq: int, request_data: Dict[str, Any]) -> None:
+        self.unindexed.discard(seq)
+        for token in request_tokens(request_data, self.max_tokens_per_request):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(seq)
+            if not postings:
+                del self._postings[token]
+
+    def candidates(self, terms: Iterable[str]) -> Set[int]:
+        """Sequence numbers of requests containing every term."""
+        postings = sorted(
+            (self._postings.get(term, set()) for term in set(terms)),
+            key=len
+        )
+        if not postings:
+            return set()
+
+        result = set(postings[0])
+        for other in postings[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self.unindexed.clear()
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+
+PREDICATE_PATTERN = re.compile(r"^\s*(?P<path>[^=!]+?)\s*(?:(?P<op>==|!=)\s*(?P<value>.*?))?\s*$")
+BRACKET_PATTERN = re.compile(r"\[\s*(?:'([^']*)'|\"([^\"]*)\"|(\d+))\s*\]")
+
+
+def normalize_json_path(path: str) -> str:
+    """``$.data.items[0]['id']`` -> ``data.items.0.id``"""
+    path = path.strip()
+    if path.startswith("$"):
+        path = path[1:]
+    path = BRACKET_PATTERN.sub(lambda m: "." + next(group for group in m.groups() if group is not None), path)
+    return path.strip(".")
+
+
+@dataclass(frozen=True)
+class JsonPredicate:
+    path: str
+    op: Optional[str] = None
+    value: Optional[str] = None
+
+    @classmethod
+    def parse(cls, expression: str) -> "JsonPredicate":
+        """``$.path`` (exists), ``$.path == value`` or ``$.path != value``."""
+        match = PREDICATE_PATTERN.match(expression)
+        if not match or not normalize_json_path(match.group("path")):
+            raise ValueError(f"Invalid JSON predicate: {expression}")
+
+        value = match.group("value")
+        if value is not None and len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+
+        return cls(normalize_json_path(match.group("path")), match.group("op"), value)
+
+    def matches(self, request_data: Dict[str, Any]) -> bool:
+        value = json_value(request_data, self.path)
+        if self.op is None:
+            return value is not MISSING
+
+        text = None
+        if value is not MISSING:
+            text = value if isinstance(value, str) else dumps_text(value)
+        return (text == self.value) == (self.op == "==")
+
+    def required_terms(self) -> Tuple[str, ...]:
+        """Tokens any matching body must contain, for narrowing via the index.
+
+        Only for equality on values JSON would never escape - printable
+        ASCII without quotes or backslashes.
+        """
+        if self.op != "==" or not self.value:
+            return ()
+        if not self.value.isascii() or not self.value.isprintable() or '"' in self.value or "\\" in self.value:
+            return ()
+        return tuple(tokenize(self.value))
+
+
+@dataclass
+class RequestSearch:
+    """Free-text terms (all must match) plus JSON predicates, newest first."""
+
+    terms: Tuple[str, ...] = ()
+    predicates: Tuple[JsonPredicate, ...] = ()
+    limit: int = 50
+    before: Optional[str] = None
+
+    @classmethod
+    def from_text(
+            cls,
+            text: Optional[str],
+            predicates: Iterable[str] = (),
+            limit: int = 50,
+            before: Optional[str] = None
+    ) -> "RequestSearch":
+        return cls(
+            terms=tuple(dict.fromkeys(tokenize(text or ""))),
+            predicates=tuple(JsonPredicate.parse(expression) for expression in predicates),
+            limit=limit,
+            before=before
+        )
+
+    @property
+    def index_terms(self) -> Tuple[str, ...]:
+        """Search terms plus the tokens implied by equality predicates."""
+        terms = list(self.terms)
+        for predicate in self.predicates:
+            terms.extend(predicate.required_terms())
+        return tuple(dict.fromkeys(terms))
+
+    def matches_predicates(self, request_data: Dict[str, Any]) -> bool:
+        return all(predicate.matches(request_data) for predicate in self.predicates)
+
+    def matches(self, request_data: Dict[str, Any]) -> bool:
+        return contains_terms(request_data, self.terms) and self.matches_predicates(request_data)
+
+
+def collect_search_page(
+        candidates: Iterable[Dict[str, Any]],
+        search: RequestSearch,
+        check_terms: bool = True
+) -> RequestPage:
+    """Up to ``search.limit`` matches from newest-first candidates.
+
+    ``check_terms`` is False when the candidates already come from the
+    inverted index, so only the JSON predicates are left to evaluate.
+    """
+    matches = search.matches if check_terms else search.matches_predicates
+    requests = []
+    for request_data in candidates:
+        if matches(request_data):
+            requests.append(request_data)
+            if len(requests) > search.limit:
+                break
+
+    has_more = len(requests) > search.limit
+    return RequestPage(requests=requests[:search.limit], has_more=has_more)
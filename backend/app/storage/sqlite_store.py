@@ -0,0 +1,610 @@
+import time
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, List, Any, Tuple, Iterator
+
+from core.log import get_logger
+from core.serialization import dumps_text, loads
+from storage.base import BaseEndpointStore, REAP_IDLE, REAP_TTL, expiry_for
+from storage.body_spool import body_spool
+from storage.query import RequestQuery, RequestPage, UnknownCursorError, collect_page
+from storage.search_index import RequestSearch, collect_search_page
+
+
+logger = get_logger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS endpoints (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    created_at TEXT NOT NULL,
+    max_requests INTEGER,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL,
+    last_activity REAL,
+    response_config TEXT,
+    forward_url TEXT,
+    last_seq INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS requests (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    endpoint_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL,
+    endpoint_seq INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_requests_endpoint_timestamp
+    ON requests (endpoint_id, timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_requests_endpoint_seq
+    ON requests (endpoint_id, seq);
+"""
+
+LIFECYCLE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_endpoints_expires_at
+    ON endpoints (expires_at) WHERE expires_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_endpoints_last_activity
+    ON endpoints (last_activity);
+
+CREATE INDEX IF NOT EXISTS idx_requests_endpoint_event_seq
+    ON requests (endpoint_id, endpoint_seq);
+"""
+
+QUERY_CHUNK_SIZE = 200
+
+# Event sequence numbers each worker reserves per endpoint with one UPDATE
+SEQ_BLOCK_SIZE = 64
+
+RETENTION_SWEEP_INTERVAL_SECONDS = 60
+
+
+def _decode_request(data: str) -> Dict:
+    request_data = loads(data)
+    if isinstance(request_data.get("timestamp"), str):
+        request_data["timestamp"] = datetime.fromisoformat(request_data["timestamp"])
+    return request_data
+
+
+def _timestamp_of(request_data: Dict) -> float:
+    timestamp = request_data.get("timestamp")
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return time.time()
+
+
+class SQLiteEndpointStore(BaseEndpointStore):
+    """SQLite (WAL) backed store, safe to share between uvicorn workers.
+
+    Requests are buffered and written in batches by a background thread -
+    every ``flush_interval`` seconds, or as soon as ``batch_size`` rows are
+    pending. Reads flush first, so a worker always sees its own writes.
+    ``touch`` only records the time; flush writes it with the batch.
+
+    Event sequence numbers come from blocks of ``SEQ_BLOCK_SIZE`` that each
+    worker reserves per endpoint, so numbering a request needs no write.
+    Numbers are unique and increase within a worker; across workers they
+    interleave block by block.
+
+    Calls may wait on the database lock, so ``blocking`` is set and the
+    service runs the hot paths in worker threads.
+    """
+
+    blocking = True
+
+    def __init__(
+            self,
+            path: str,
+            max_requests_per_endpoint: int = 100,
+            batch_size: int = 50,
+            flush_interval: float = 0.25,
+            retention_hours: float = 0,
+            default_ttl_seconds: int = 0
+    ):
+        self.path = path
+        self.MAX_REQUESTS_PER_ENDPOINT = max_requests_per_endpoint
+        self.DEFAULT_TTL_SECONDS = default_ttl_seconds
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retention_seconds = retention_hours * 3600
+        self.body_spool = body_spool
+
+        self._lock = threading.RLock()
+        self._pending: List[Tuple[str, Dict]] = []
+        self._pending_counts: Dict[str, int] = {}
+        self._seq_blocks: Dict[str, Tuple[int, int]] = {}
+        self._touched: Dict[str, float] = {}
+        self._last_retention_sweep = 0.0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+        self._closed = threading.Event()
+        self._flush_now = threading.Event()
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically,
+                name="sqlite-store-flusher",
+                daemon=True
+            )
+            self._flusher.start()
+
+    def create(
+            self,
+            endpoint_id: str,
+            name: Optional[str] = None,
+            max_requests: Optional[int] = None,
+            ttl_seconds: Optional[int] = None
+    ) -> Dict:
+        created_at = datetime.now(timezone.utc)
+        capacity = max_requests or self.MAX_REQUESTS_PER_ENDPOINT
+        expires_at = expiry_for(created_at, self.DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO endpoints (id, name, created_at, max_requests, request_count, expires_at, last_activity) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                (endpoint_id, name, created_at.isoformat(), capacity,
+                 expires_at.timestamp() if expires_at else None, created_at.timestamp())
+            )
+
+        return {
+            "id": endpoint_id,
+            "name": name,
+            "created_at": created_at,
+            "expires_at": expires_at,
+            "response": None,
+            "forward_url": None,
+            "max_requests": capacity,
+            "request_count": 0,
+            "requests": []
+        }
+
+    def get(self, endpoint_id: str) -> Optional[Dict]:
+        endpoint_data = self.get_metadata(endpoint_id)
+        if not endpoint_data:
+            return None
+
+        endpoint_data["requests"] = self.list_requests(endpoint_id)
+        return endpoint_data
+
+    def get_metadata(self, endpoint_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, name, created_at, max_requests, request_count, expires_at, response_config, forward_url "
+                "FROM endpoints WHERE id = ?",
+                (endpoint_id,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            return {
+                "id": row[0],
+                "name": row[1],
+                "created_at": datetime.fromisoformat(row[2]),
+                "max_requests": row[3] or self.MAX_REQUESTS_PER_ENDPOINT,
+                "request_count": row[4] + self._pending_counts.get(endpoint_id, 0),
+                "expires_at": datetime.fromtimestamp(row[5], timezone.utc) if row[5] is not None else None,
+                "response": loads(row[6]) if row[6] else None,
+                "forward_url": row[7]
+            }
+
+    def set_response_config(self, endpoint_id: str, response_config: Optional[Dict[str, Any]]) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE endpoints SET response_config = ? WHERE id = ?",
+                (dumps_text(response_config) if response_config is not None else None, endpoint_id)
+            )
+        return cursor.rowcount > 0
+
+    def set_forward_url(self, endpoint_id: str, forward_url: Optional[str]) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE endpoints SET forward_url = ? WHERE id = ?",
+                (forward_url, endpoint_id)
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, endpoint_id: str) -> Optional[int]:
+        with self._lock:
+            self._pending = [(pending_id, request_data) for pending_id, request_data in self._pending if pending_id != endpoint_id]
+            pending_count = self._pending_counts.pop(endpoint_id, 0)
+            self._seq_blocks.pop(endpoint_id, None)
+            self._touched.pop(endpoint_id, None)
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("DELETE FROM endpoints WHERE id = ?", (endpoint_id,)).rowcount == 0:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                spooled = self._conn.execute(
+                    "SELECT id FROM requests WHERE endpoint_id = ? AND json_extract(data, '$.body_truncated')",
+                    (endpoint_id,)
+                ).fetchall()
+                dropped = self._conn.execute("DELETE FROM requests WHERE endpoint_id = ?", (endpoint_id,)).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        self.body_spool.release(row[0] for row in spooled)
+        return dropped + pending_count
+
+    def touch(self, endpoint_id: str) -> None:
+        with self._lock:
+            self._touched[endpoint_id] = time.time()
+
+    def find_expired(self, now: float, idle_before: Optional[float] = None, limit: int = 1000) -> List[Tuple[str, str]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, ? FROM endpoints WHERE expires_at <= ? LIMIT ?",
+                (REAP_TTL, now, limit)
+            ).fetchall()
+            if idle_before is not None and len(rows) < limit:
+                rows += self._conn.execute(
+                    "SELECT id, ? FROM endpoints WHERE last_activity < ? AND (expires_at IS NULL OR expires_at > ?) "
+                    "ORDER BY last_activity LIMIT ?",
+                    (REAP_IDLE, idle_before, now, limit - len(rows))
+                ).fetchall()
+        return [(endpoint_id, reason) for endpoint_id, reason in rows]
+
+    def increment_count(self, endpoint_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE endpoints SET request_count = request_count + 1 WHERE id = ?",
+                (endpoint_id,)
+            )
+
+    def add_request(self, endpoint_id: str, request_data: Dict) -> bool:
+        with self._lock:
+            seq = self._next_seq(endpoint_id)
+            if seq is None:
+                return False
+
+            request_data["seq"] = seq
+            self._pending.append((endpoint_id, request_data))
+            self._pending_counts[endpoint_id] = self._pending_counts.get(endpoint_id, 0) + 1
+            should_flush = len(self._pending) >= self.batch_size
+
+        if should_flush:
+            if self._flusher is not None:
+                self._flush_now.set()
+            else:
+                self.flush()
+        return True
+
+    def update_request(self, endpoint_id: str, request_id: str, fields: Dict[str, Any]) -> bool:
+        with self._lock:
+            for pending_endpoint, request_data in self._pending:
+                if pending_endpoint == endpoint_id and request_data["id"] == request_id:
+                    request_data.update(fields)
+                    return True
+
+            row = self._conn.execute(
+                "SELECT data FROM requests WHERE id = ? AND endpoint_id = ?",
+                (request_id, endpoint_id)
+            ).fetchone()
+            if row is None:
+                return False
+
+            request_data = _decode_request(row[0])
+            request_data.update(fields)
+            self._conn.execute(
+                "UPDATE requests SET data = ? WHERE id = ?",
+                (dumps_text(request_data), request_id)
+            )
+            return True
+
+    def get_request(self, endpoint_id: str, request_id: str) -> Optional[Dict]:
+        with self._lock:
+            for pending_endpoint, request_data in self._pending:
+                if pending_endpoint == endpoint_id and request_data["id"] == request_id:
+                    return request_data
+
+            row = self._conn.execute(
+                "SELECT data FROM requests WHERE id = ? AND endpoint_id = ?",
+                (request_id, endpoint_id)
+            ).fetchone()
+
+        return _decode_request(row[0]) if row else None
+
+    def requests_after_seq(self, endpoint_id: str, after_seq: int, limit: int) -> Optional[List[Dict]]:
+        self.flush()
+        if self.get_metadata(endpoint_id) is None:
+            return None
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM requests WHERE endpoint_id = ? AND endpoint_seq > ? "
+                "ORDER BY endpoint_seq ASC LIMIT ?",
+                (endpoint_id, after_seq, limit)
+            ).fetchall()
+        return [_decode_request(row[0]) for row in rows]
+
+    def list_requests(
+            self,
+            endpoint_id: str,
+            limit: Optional[int] = None,
+            since_id: Optional[str] = None
+    ) -> Optional[List[Dict]]:
+        self.flush()
+        endpoint_data = self.get_metadata(endpoint_id)
+        if not endpoint_data:
+            return None
+
+        capacity = endpoint_data["max_requests"]
+        with self._lock:
+            if since_id is not None:
+                rows = self._conn.execute(
+                    "SELECT data FROM requests WHERE endpoint_id = ? AND seq > COALESCE("
+                    "  (SELECT seq FROM requests WHERE id = ? AND endpoint_id = ?), 0"
+                    ") ORDER BY seq ASC LIMIT ?",
+                    (endpoint_id, since_id, endpoint_id, limit if limit is not None else capacity)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT data FROM ("
+                    "  SELECT seq, data FROM requests WHERE endpoint_id = ?"
+                    "  ORDER BY seq DESC LIMIT ?"
+                    ") ORDER BY seq ASC",
+                    (endpoint_id, min(limit, capacity) if limit is not None else capacity)
+                ).fetchall()
+
+        return [_decode_request(row[0]) for row in rows]
+
+    def query_requests(self, endpoint_id: str, query: RequestQuery) -> Optional[RequestPage]:
+        self.flush()
+        if self.get_metadata(endpoint_id) is None:
+            return None
+
+        lower_seq = 0
+        upper_seq = None
+
+        if query.after is not None:
+            lower_seq = self._seq_of(endpoint_id, query.after)
+            if lower_seq is None:
+                raise UnknownCursorError(query.after)
+
+        if query.before is not None:
+            upper_seq = self._seq_of(endpoint_id, query.before)
+            if upper_seq is None:
+                raise UnknownCursorError(query.before)
+
+        forward = query.after is not None
+        return collect_page(
+            self._iter_range(endpoint_id, lower_seq, upper_seq, forward, query),
+            query,
+            forward
+        )
+
+    def search_requests(self, endpoint_id: str, search: RequestSearch) -> Optional[RequestPage]:
+        """Scans newest first - the inverted index only exists for in-memory storage."""
+        self.flush()
+        if self.get_metadata(endpoint_id) is None:
+            return None
+
+        upper_seq = None
+        if search.before is not None:
+            upper_seq = self._seq_of(endpoint_id, search.before)
+            if upper_seq is None:
+                raise UnknownCursorError(search.before)
+
+        return collect_search_page(
+            self._iter_range(endpoint_id, 0, upper_seq, False, RequestQuery(limit=QUERY_CHUNK_SIZE)),
+            search
+        )
+
+    def get_request_count(self, endpoint_id: str) -> int:
+        endpoint_data = self.get_metadata(endpoint_id)
+        return endpoint_data["request_count"] if endpoint_data else 0
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending and not self._touched:
+                self._sweep_expired()
+                return
+
+            pending, self._pending = self._pending, []
+            counts, self._pending_counts = self._pending_counts, {}
+            touched, self._touched = self._touched, {}
+
+            rows = [
+                (
+                    request_data["id"],
+                    endpoint_id,
+                    _timestamp_of(request_data),
+                    dumps_text(request_data),
+                    request_data.get("seq")
+                )
+                for endpoint_id, request_data in pending
+            ]
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another worker may have deleted the endpoint since its seqs were reserved
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO requests (id, endpoint_id, timestamp, data, endpoint_seq) "
+                    "SELECT ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM endpoints WHERE id = ?)",
+                    [(*row, row[1]) for row in rows]
+                )
+                flushed_at = time.time()
+                self._conn.executemany(
+                    "UPDATE endpoints SET request_count = request_count + ?, last_activity = ? WHERE id = ?",
+                    [(count, flushed_at, endpoint_id) for endpoint_id, count in counts.items()]
+                )
+                self._conn.executemany(
+                    "UPDATE endpoints SET last_activity = MAX(COALESCE(last_activity, 0), ?) WHERE id = ?",
+                    [(touched_at, endpoint_id) for endpoint_id, touched_at in touched.items()]
+                )
+                evicted = []
+                for endpoint_id in counts:
+                    evicted.extend(self._trim(endpoint_id))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self.body_spool.release(evicted)
+
+            self._sweep_expired()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._flush_now.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.flush_interval * 4 + 1)
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _next_seq(self, endpoint_id: str) -> Optional[int]:
+        """Next event number from this worker's block; None for unknown endpoints."""
+        next_seq, end_seq = self._seq_blocks.get(endpoint_id, (0, 0))
+        if next_seq >= end_seq:
+            row = self._conn.execute(
+                "UPDATE endpoints SET last_seq = last_seq + ? WHERE id = ? RETURNING last_seq",
+                (SEQ_BLOCK_SIZE, endpoint_id)
+            ).fetchone()
+            if row is None:
+                return None
+            next_seq, end_seq = row[0] - SEQ_BLOCK_SIZE + 1, row[0] + 1
+
+        self._seq_blocks[endpoint_id] = (next_seq + 1, end_seq)
+        return next_seq
+
+    def _seq_of(self, endpoint_id: str, request_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq FROM requests WHERE id = ? AND endpoint_id = ?",
+                (request_id, endpoint_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _iter_range(
+            self,
+            endpoint_id: str,
+            lower_seq: int,
+            upper_seq: Optional[int],
+            forward: bool,
+            query: RequestQuery
+    ) -> Iterator[Dict]:
+        conditions = ["endpoint_id = ?"]
+        params: List[Any] = [endpoint_id]
+
+        if upper_seq is not None:
+            conditions.append("seq < ?")
+            params.append(upper_seq)
+        if query.start_time is not None:
+            conditions.append("timestamp >= ?")
+            params.append(query.start_time.timestamp())
+        if query.end_time is not None:
+            conditions.append("timestamp <= ?")
+            params.append(query.end_time.timestamp())
+
+        chunk_size = QUERY_CHUNK_SIZE if query.has_filters else query.limit + 1
+        cursor_seq = lower_seq if forward else upper_seq
+
+        while True:
+            chunk_conditions = list(conditions)
+            chunk_params = list(params)
+            if forward:
+                chunk_conditions.append("seq > ?")
+                chunk_params.append(cursor_seq)
+            else:
+                chunk_conditions.append("seq > ?")
+                chunk_params.append(lower_seq)
+                if cursor_seq is not None:
+                    chunk_conditions.append("seq < ?")
+                    chunk_params.append(cursor_seq)
+
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT seq, data FROM requests WHERE {' AND '.join(chunk_conditions)} "
+                    f"ORDER BY seq {'ASC' if forward else 'DESC'} LIMIT ?",
+                    (*chunk_params, chunk_size)
+                ).fetchall()
+
+            for seq, data in rows:
+                yield _decode_request(data)
+
+            if len(rows) < chunk_size:
+                return
+            cursor_seq = rows[-1][0]
+
+    def _trim(self, endpoint_id: str) -> List[str]:
+        """Drop requests beyond the endpoint's capacity; returns ids with spooled bodies."""
+        cutoff = (
+            "endpoint_id = ? AND seq <= ("
+            "  SELECT seq FROM requests WHERE endpoint_id = ?"
+            "  ORDER BY seq DESC LIMIT 1 OFFSET COALESCE("
+            "    (SELECT max_requests FROM endpoints WHERE id = ?), ?"
+            "  )"
+            ")"
+        )
+        params = (endpoint_id, endpoint_id, endpoint_id, self.MAX_REQUESTS_PER_ENDPOINT)
+
+        spooled = self._conn.execute(
+            f"SELECT id FROM requests WHERE {cutoff} AND json_extract(data, '$.body_truncated')",
+            params
+        ).fetchall()
+        self._conn.execute(f"DELETE FROM requests WHERE {cutoff}", params)
+        return [row[0] for row in spooled]
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(endpoints)")}
+        if "max_requests" not in columns:
+            self._conn.execute("ALTER TABLE endpoints ADD COLUMN max_requests INTEGER")
+        if "expires_at" not in columns:
+            self._conn.execute("ALTER TABLE endpoints ADD COLUMN expires_at REAL")
+        if "response_config" not in columns:
+            self._conn.execute("ALTER TABLE endpoints ADD COLUMN response_config TEXT")
+        if "forward_url" not in columns:
+            self._conn.execute("ALTER TABLE endpoints ADD COLUMN forward_url TEXT")
+        if "last_seq" not in columns:
+            self._conn.execute("ALTER TABLE endpoints ADD COLUMN last_seq INTEGER NOT NULL DEFAULT 0")
+        request_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(requests)")}
+        if "endpoint_seq" not in request_columns:
+            self._conn.execute("ALTER TABLE requests ADD COLUMN endpoint_seq INTEGER")
+        if "last_activity" not in columns:
+            self._conn.execute("ALTER TABLE endpoints ADD COLUMN last_activity REAL")
+            self._conn.execute("UPDATE endpoints SET last_activity = CAST(strftime('%s', 'now') AS REAL)")
+        self._conn.executescript(LIFECYCLE_INDEXES)
+
+    def _sweep_expired(self) -> None:
+        if not self.retention_seconds:
+            return
+
+        now = time.time()
+        if now - self._last_retention_sweep < RETENTION_SWEEP_INTERVAL_SECONDS:
+            return
+
+        self._last_retention_sweep = now
+        cutoff = now - self.retention_seconds
+        spooled = self._conn.execute(
+            "SELECT id FROM requests WHERE timestamp < ? AND json_extract(data, '$.body_truncated')",
+            (cutoff,)
+        ).fetchall()
+        self._conn.execute("DELETE FROM requests WHERE timestamp < ?", (cutoff,))
+        self.body_spool.release(row[0] for row in spooled)
+
+    def _flush_periodically(self) -> None:
+        while True:
+            self._flush_now.wait(self.flush_interval)
+            self._flush_now.clear()
+            if self._closed.is_set():
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ SQLite flush failed: {e}")
@@ -1,31 +1,149 @@
-from typing import Dict,Optional,List
+import time
+import heapq
+from collections import OrderedDict
+from typing import Dict,Optional,List,Any,Tuple
 from datetime import datetime, timezone
 
+from core.config import settings
+from storage.base import BaseEndpointStore, REAP_IDLE, REAP_TTL, expiry_for
+from storage.body_spool import body_spool
+from storage.captured_request import CapturedRequest, estimated_size
+from storage.cold_tier import ColdTier
+from storage.request_history import RequestHistory
+from storage.query import RequestQuery, RequestPage, UnknownCursorError, collect_page
+from storage.search_index import RequestSearch, SearchIndex, collect_search_page, contains_terms
+
+
+class EndpointStore(BaseEndpointStore):
+    """In-memory store.
+
+    ``_endpoints`` is kept in activity order (least recently active first),
+    so idle endpoints and memory-budget victims are found from the front
+    without scanning. TTLs sit in a min-heap; entries for endpoints that
+    were deleted earlier are skipped when popped.
+    """
 
-class EndpointStore:
     def __init__(self):
-        self._endpoints: Dict[str, Dict[str, any]] = {}
-        self.MAX_REQUESTS_PER_ENDPOINT = 100
+        self._endpoints: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._memory_bytes = 0
+        self.MAX_REQUESTS_PER_ENDPOINT = settings.MAX_REQUESTS_PER_ENDPOINT
+        self.DEFAULT_TTL_SECONDS = settings.ENDPOINT_TTL_SECONDS
+        self.body_spool = body_spool
 
 
-    def create(self,endpoint_id: str, name:Optional[str]=None) -> Dict:
+    def create(self,endpoint_id: str, name:Optional[str]=None, max_requests:Optional[int]=None, ttl_seconds:Optional[int]=None) -> Dict:
+        capacity = max_requests or self.MAX_REQUESTS_PER_ENDPOINT
+        created_at = datetime.now(timezone.utc)
+        expires_at = expiry_for(created_at, self.DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
         endpoint_data: Dict = {
                 "id": endpoint_id,
                 "name": name,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": created_at,
+                "expires_at": expires_at,
+                "last_activity": time.time(),
+                "max_requests": capacity,
                 "request_count": 0,
-                "requests": []
+                "memory_bytes": 0,
+                "last_seq": 0,
+                "response": None,
+                "forward_url": None
         }
+        self._reset_history(endpoint_data)
 
         self._endpoints[endpoint_id] = endpoint_data
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at.timestamp(), endpoint_id))
 
         return endpoint_data
 
 
+    def delete(self,endpoint_id: str) -> Optional[int]:
+        endpoint_data = self._endpoints.pop(endpoint_id, None)
+        if endpoint_data is None:
+            return None
+
+        dropped = len(endpoint_data["requests"])
+        self._release_history(endpoint_data)
+        return dropped
+
+
+    def set_response_config(self,endpoint_id: str, response_config:Optional[Dict[str, Any]]) -> bool:
+        endpoint_data = self._endpoints.get(endpoint_id)
+        if endpoint_data is None:
+            return False
+
+        endpoint_data["response"] = response_config
+        return True
+
+
+    def set_forward_url(self,endpoint_id: str, forward_url:Optional[str]) -> bool:
+        endpoint_data = self._endpoints.get(endpoint_id)
+        if endpoint_data is None:
+            return False
+
+        endpoint_data["forward_url"] = forward_url
+        return True
+
+
+    def touch(self,endpoint_id: str) -> None:
+        endpoint_data = self._endpoints.get(endpoint_id)
+        if endpoint_data is not None:
+            endpoint_data["last_activity"] = time.time()
+            self._endpoints.move_to_end(endpoint_id)
+
+
+    def find_expired(self,now: float, idle_before:Optional[float]=None, limit:int=1000) -> List[Tuple[str, str]]:
+        expired: Dict[str, str] = {}
+
+        heap = self._expiry_heap
+        due = []
+        while heap and heap[0][0] <= now and len(expired) < limit:
+            entry = heapq.heappop(heap)
+            if entry[1] in self._endpoints:
+                expired[entry[1]] = REAP_TTL
+                due.append(entry)
+        # Entries leave the heap only once their endpoint has been deleted
+        for entry in due:
+            heapq.heappush(heap, entry)
+
+        if idle_before is not None:
+            for endpoint_id, endpoint_data in self._endpoints.items():
+                if len(expired) >= limit or endpoint_data["last_activity"] >= idle_before:
+                    break
+                expired.setdefault(endpoint_id, REAP_IDLE)
+
+        return list(expired.items())
+
+
+    def memory_usage(self) -> int:
+        return self._memory_bytes
+
+
+    def shed_memory(self,budget_bytes: int) -> List[Tuple[str, int, int]]:
+        shed = []
+        for endpoint_id, endpoint_data in self._endpoints.items():
+            if self._memory_bytes <= budget_bytes:
+                break
+            if not endpoint_data["requests"]:
+                continue
+
+            dropped = len(endpoint_data["requests"])
+            freed = endpoint_data["memory_bytes"]
+            self._release_history(endpoint_data)
+            self._reset_history(endpoint_data)
+            shed.append((endpoint_id, dropped, freed))
+        return shed
+
+
     def get(self,endpoint_id: str) -> Optional[Dict]:
         return self._endpoints.get(endpoint_id)
 
 
+    def get_metadata(self,endpoint_id: str) -> Optional[Dict]:
+        return self._endpoints.get(endpoint_id)
+
+
     def increment_count(self,endpoint_id: str) -> None:
         if endpoint_id in self._endpoints:
             self._endpoints[endpoint_id]["request_count"] += 1
@@ -35,15 +153,232 @@ class EndpointStore:
         if endpoint_id not in self._endpoints:
             return False
 
-        requests = self._endpoints[endpoint_id]["requests"]
+        endpoint_data = self._endpoints[endpoint_id]
+        history = endpoint_data["requests"]
+        search = endpoint_data["search"]
+
+        endpoint_data["last_seq"] += 1
+        request_data["seq"] = endpoint_data["last_seq"]
+
+        cold = endpoint_data["cold"]
+
+        evicted = history.append(request_data)
+        added_bytes = estimated_size(request_data)
+        if search is not None:
+            search.add(history.next_seq - 1, request_data)
+        if cold is not None:
+            added_bytes += self._freeze_aged(history, cold)
+
+        if evicted is not None:
+            added_bytes -= estimated_size(evicted)
+            if cold is not None:
+                cold.forget(evicted)
+            if search is not None:
+                search.remove(history.first_seq - 1, evicted)
+            if evicted.get("body_truncated"):
+                self.body_spool.release([evicted["id"]])
 
-        if len(requests) >= self.MAX_REQUESTS_PER_ENDPOINT:
-            requests.pop(0)
+        endpoint_data["memory_bytes"] += added_bytes
+        self._memory_bytes += added_bytes
 
-        requests.append(request_data)
         self.increment_count(endpoint_id)
+        self.touch(endpoint_id)
         return True
 
 
-endpoint_store = EndpointStore()
+    def update_request(self,endpoint_id: str, request_id: str, fields: Dict[str, Any]) -> bool:
+        if endpoint_id not in self._endpoints:
+            return False
+
+        request_data = self._endpoints[endpoint_id]["requests"].find(request_id)
+        if request_data is None:
+            return False
+
+        request_data.update(fields)
+        return True
+
+
+    def get_request(self,endpoint_id: str, request_id: str) -> Optional[Dict]:
+        if endpoint_id not in self._endpoints:
+            return None
+
+        return self._endpoints[endpoint_id]["requests"].find(request_id)
+
+
+    def list_requests(self,endpoint_id: str, limit:Optional[int]=None, since_id:Optional[str]=None) -> Optional[List[Dict]]:
+        if endpoint_id not in self._endpoints:
+            return None
+
+        requests = self._endpoints[endpoint_id]["requests"]
+
+        if since_id is not None:
+            return requests.since(since_id, limit=limit)
+        if limit is not None:
+            return requests.last(limit)
+        return requests[:]
+
+
+    def requests_after_seq(self,endpoint_id: str, after_seq: int, limit: int) -> Optional[List[Dict]]:
+        if endpoint_id not in self._endpoints:
+            return None
+
+        history = self._endpoints[endpoint_id]["requests"]
+        oldest = history.at(history.first_seq)
+        if oldest is None:
+            return []
+
+        # Event numbers and ring positions both grow by one per append, so
+        # the event after ``after_seq`` sits at a fixed offset in the ring
+        start = history.first_seq + max(0, after_seq + 1 - oldest["seq"])
+        return history.window(start, start + limit)
+
+
+    def query_requests(self,endpoint_id: str, query: RequestQuery) -> Optional[RequestPage]:
+        if endpoint_id not in self._endpoints:
+            return None
+
+        requests = self._endpoints[endpoint_id]["requests"]
+        start_seq = requests.first_seq
+        end_seq = requests.next_seq
+
+        if query.after is not None:
+            after_seq = requests.seq_of(query.after)
+            if after_seq is None:
+                raise UnknownCursorError(query.after)
+            start_seq = after_seq + 1
+
+        if query.before is not None:
+            before_seq = requests.seq_of(query.before)
+            if before_seq is None:
+                raise UnknownCursorError(query.before)
+            end_seq = before_seq
+
+        if query.start_time is not None or query.end_time is not None:
+            first_seq, last_seq = requests.time_range(
+                query.start_time.timestamp() if query.start_time is not None else None,
+                query.end_time.timestamp() if query.end_time is not None else None
+            )
+            start_seq = max(start_seq, first_seq)
+            end_seq = min(end_seq, last_seq)
+
+        forward = query.after is not None
+        return collect_page(
+            requests.iter_range(start_seq, end_seq, reverse=not forward),
+            query,
+            forward
+        )
+
+
+    def search_requests(self,endpoint_id: str, search: RequestSearch) -> Optional[RequestPage]:
+        if endpoint_id not in self._endpoints:
+            return None
+
+        endpoint_data = self._endpoints[endpoint_id]
+        requests = endpoint_data["requests"]
+        index = endpoint_data["search"]
+
+        end_seq = requests.next_seq
+        if search.before is not None:
+            before_seq = requests.seq_of(search.before)
+            if before_seq is None:
+                raise UnknownCursorError(search.before)
+            end_seq = before_seq
+
+        index_terms = search.index_terms
+        if index_terms and index is not None:
+            indexed = index.candidates(index_terms)
+            seqs = sorted((seq for seq in indexed | index.unindexed if seq < end_seq), reverse=True)
+            # Partly indexed requests are not in the postings for every token they hold
+            candidates = (
+                requests.at(seq) for seq in seqs
+                if seq in indexed or contains_terms(requests.at(seq), search.terms)
+            )
+            return collect_search_page(candidates, search, check_terms=False)
+
+        return collect_search_page(
+            requests.iter_range(requests.first_seq, end_seq, reverse=True),
+            search
+        )
+
+
+    def get_request_count(self,endpoint_id: str) -> int:
+        endpoint_data = self._endpoints.get(endpoint_id)
+        return endpoint_data["request_count"] if endpoint_data else 0
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            "endpoints": len(self._endpoints),
+            "requests": 0,
+            "memory_bytes": self._memory_bytes,
+            "cold_bodies": 0,
+            "cold_raw_bytes": 0,
+            "cold_stored_bytes": 0
+        }
+        for endpoint_data in self._endpoints.values():
+            stats["requests"] += len(endpoint_data["requests"])
+            cold = endpoint_data["cold"]
+            if cold is not None:
+                stats["cold_bodies"] += cold.compressed
+                stats["cold_raw_bytes"] += cold.raw_bytes
+                stats["cold_stored_bytes"] += cold.stored_bytes
+        return stats
+
+
+    def _create_cold_tier(self, capacity: int) -> Optional[ColdTier]:
+        hot_size = settings.COLD_TIER_HOT_REQUESTS
+        if hot_size <= 0 or capacity <= hot_size:
+            return None
+        return ColdTier(hot_size, min_body_bytes=settings.COLD_TIER_MIN_BODY_BYTES)
+
+
+    def _reset_history(self, endpoint_data: Dict) -> None:
+        capacity = endpoint_data["max_requests"]
+        endpoint_data["requests"] = RequestHistory(capacity)
+        endpoint_data["search"] = SearchIndex(settings.SEARCH_MAX_TOKENS_PER_REQUEST) if settings.SEARCH_INDEX_ENABLED else None
+        endpoint_data["cold"] = self._create_cold_tier(capacity)
+        endpoint_data["memory_bytes"] = 0
+
+
+    def _release_history(self, endpoint_data: Dict) -> None:
+        """Give back the memory and spooled bodies held by an endpoint's requests."""
+        self._memory_bytes -= endpoint_data["memory_bytes"]
+        spooled = [request_data["id"] for request_data in endpoint_data["requests"] if request_data.get("body_truncated")]
+        if spooled:
+            self.body_spool.release(spooled)
+
+
+    @staticmethod
+    def _freeze_aged(history: RequestHistory, cold: ColdTier) -> int:
+        """Compress the request that just slid out of the hot window; returns the size change."""
+        if len(history) <= cold.hot_size:
+            return 0
+
+        aged = history.at(history.next_seq - 1 - cold.hot_size)
+        if not isinstance(aged, CapturedRequest) or aged.is_cold:
+            return 0
+
+        before = estimated_size(aged)
+        hot = history.iter_range(history.next_seq - cold.hot_size, history.next_seq)
+        cold.freeze(aged, hot_bodies=(request_data.get("body_raw") for request_data in hot))
+        return estimated_size(aged) - before
+
+
+def create_endpoint_store() -> BaseEndpointStore:
+    if settings.STORAGE_BACKEND == "sqlite":
+        from storage.sqlite_store import SQLiteEndpointStore
+
+        return SQLiteEndpointStore(
+            path=settings.SQLITE_PATH,
+            max_requests_per_endpoint=settings.MAX_REQUESTS_PER_ENDPOINT,
+            batch_size=settings.SQLITE_BATCH_SIZE,
+            flush_interval=settings.SQLITE_FLUSH_INTERVAL_SECONDS,
+            retention_hours=settings.SQLITE_RETENTION_HOURS,
+            default_ttl_seconds=settings.ENDPOINT_TTL_SECONDS
+        )
+
+    return EndpointStore()
+
+
+endpoint_store = create_endpoint_store()
 
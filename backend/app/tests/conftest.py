@@ -10,9 +10,18 @@ from services.endpoint_service import EndpointService
 from main import app
 
 
+@pytest.fixture(autouse=True)
+def ai_disabled(monkeypatch):
+    """No model calls from the suite, with or without ANTHROPIC_API_KEY; AI tests build their own service."""
+    from services.ai_service import ai_service
+    monkeypatch.setattr(ai_service, "enabled", False)
+
+
 @pytest.fixture
 def client():
-    return TestClient(app)
+    # The lifespan starts the AI workers and the forwarding client
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture
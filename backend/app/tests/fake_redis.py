@@ -0,0 +1,136 @@
+import fnmatch
+import socketserver
+import threading
+
+from core.resp_client import RespReader
+
+
+def encode_reply(value):
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return f"-ERR {value}\r\n".encode()
+    if isinstance(value, bool):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b"".join(encode_reply(item) for item in value)
+    if isinstance(value, str) and value in ("OK", "PONG"):
+        return f"+{value}\r\n".encode()
+    data = value if isinstance(value, bytes) else str(value).encode()
+    return f"${len(data)}\r\n".encode() + data + b"\r\n"
+
+
+def format_number(value):
+    text = repr(float(value))
+    return text[:-2] if text.endswith(".0") else text
+
+
+class FakeRedisServer:
+    """In-process stand-in for a Redis server, speaking RESP over TCP."""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.hang_up_after = set()
+        outer = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.write_lock = threading.Lock()
+                reader = RespReader(self.rfile)
+                try:
+                    while True:
+                        try:
+                            command = reader.read_reply()
+                        except ConnectionError:
+                            return
+                        if command[0].decode().upper() in outer.hang_up_after:
+                            # Run the command, then drop the connection before replying
+                            outer.hang_up_after.discard(command[0].decode().upper())
+                            outer.dispatch(command)
+                            return
+                        if command[0].decode().upper() == "PSUBSCRIBE":
+                            outer.psubscribe(self, command[1].decode())
+                        else:
+                            self.send(outer.dispatch(command))
+                finally:
+                    outer.unsubscribe(self)
+
+            def send(self, value):
+                with self.write_lock:
+                    self.wfile.write(encode_reply(value))
+                    self.wfile.flush()
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def psubscribe(self, handler, pattern):
+        with self.lock:
+            self.subscribers.append((handler, pattern))
+        handler.send(["psubscribe", pattern, 1])
+
+    def unsubscribe(self, handler):
+        with self.lock:
+            self.subscribers = [entry for entry in self.subscribers if entry[0] is not handler]
+
+    def publish(self, channel, message):
+        with self.lock:
+            matches = [
+                (handler, pattern) for handler, pattern in self.subscribers
+                if fnmatch.fnmatchcase(channel, pattern)
+            ]
+        for handler, pattern in matches:
+            try:
+                handler.send(["pmessage", pattern, channel, message])
+            except OSError:
+                pass
+        return len(matches)
+
+    def dispatch(self, command):
+        name = command[0].decode().upper()
+        args = [arg.decode() for arg in command[1:]]
+
+        if name == "PUBLISH":
+            return self.publish(args[0], args[1])
+
+        with self.lock:
+            if name == "PING":
+                return "PONG"
+            if name in ("AUTH", "SELECT", "EXPIRE"):
+                return "OK" if name != "EXPIRE" else 1
+            if name == "GET":
+                return self.data.get(args[0])
+            if name == "SET":
+                self.data[args[0]] = args[1]
+                return "OK"
+            if name in ("INCR", "DECR"):
+                value = int(self.data.get(args[0], 0)) + (1 if name == "INCR" else -1)
+                self.data[args[0]] = str(value)
+                return value
+            if name == "INCRBYFLOAT":
+                value = float(self.data.get(args[0], 0)) + float(args[1])
+                self.data[args[0]] = format_number(value)
+                return self.data[args[0]]
+
+        return Exception(f"unknown command '{name}'")
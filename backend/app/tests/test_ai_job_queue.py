@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+
+from services.ai_job_queue import AIJobQueue, QueueFullError
+
+
+@pytest.mark.asyncio
+async def test_endpoints_are_served_round_robin():
+    queue = AIJobQueue(workers=1, max_pending=100)
+    queue.start()
+    order = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        await gate.wait()
+
+    def job(endpoint_id):
+        async def run():
+            order.append(endpoint_id)
+        return run
+
+    first = queue.submit("noisy", blocker)
+    await asyncio.sleep(0)
+    futures = [queue.submit("noisy", job("noisy")) for _ in range(5)]
+    futures += [queue.submit("quiet", job("quiet")), queue.submit("other", job("other"))]
+
+    assert queue.get_stats()["deepest_endpoint_queue"] == 5
+    gate.set()
+    await asyncio.gather(first, *futures)
+
+    assert order[:3] == ["noisy", "quiet", "other"]
+    assert queue.get_stats()["completed"] == 8
+    assert queue.get_stats()["max_wait_ms"] > 0
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_failures_propagate():
+    queue = AIJobQueue(workers=1, max_pending=1)
+    queue.start()
+
+    async def fail():
+        raise ValueError("boom")
+
+    failing = queue.submit("ep", fail)
+    with pytest.raises(QueueFullError):
+        queue.submit("ep", fail)
+    with pytest.raises(ValueError):
+        await failing
+
+    assert queue.get_stats()["rejected"] == 1
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_submit_needs_a_started_queue():
+    queue = AIJobQueue(workers=1)
+
+    async def job():
+        return "done"
+
+    with pytest.raises(RuntimeError):
+        queue.submit("ep", job)
+
+    queue.start()
+    assert await queue.submit("ep", job) == "done"
+    await queue.stop()
+    with pytest.raises(RuntimeError):
+        queue.submit("ep", job)
@@ -0,0 +1,217 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+
+from services.ai_job_queue import AIJobQueue
+from services.ai_service import AIService, OVERFLOW_DEGRADE
+from services.micro_batcher import MicroBatcher
+from services.mock_cache import MockResponseCache
+from storage.body_json import body_json_cache
+from storage.json_index import MISSING
+
+
+class SlowMessages:
+    def __init__(self, delay, reply='{"status": "ok"}'):
+        self.delay = delay
+        self.reply = reply
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts = []
+
+    async def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][0]["content"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=self.reply)],
+            usage=SimpleNamespace(input_tokens=120, output_tokens=30)
+        )
+
+
+@pytest_asyncio.fixture
+async def make_service():
+    """Builds started services with a fake model client; shuts them down after the test."""
+    services = []
+
+    def make(delay, timeout=1.0, concurrency=2, jobs=None):
+        service = AIService()
+        service.client = SimpleNamespace(messages=SlowMessages(delay))
+        service.enabled = True
+        service.timeout = timeout
+        service._semaphore = asyncio.Semaphore(concurrency)
+        service.cache = MockResponseCache()
+        if jobs is not None:
+            service.jobs = jobs
+        service.start()
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        await service.shutdown()
+
+
+def webhook(i=0, key="n"):
+    return {"method": "POST", "body_raw": f'{{"{key}": {i}}}', "headers": {}, "timestamp": None}
+
+
+@pytest.mark.asyncio
+async def test_generate_mock_response_is_async(make_service):
+    service = make_service(delay=0.01)
+
+    result = await service.generate_mock_response(webhook(), endpoint_id="ai-async")
+
+    assert result["mock_response"] == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_fingerprinting_does_not_fill_the_shared_body_cache(make_service):
+    service = make_service(delay=0)
+    request_data = {**webhook(key="private"), "id": "ai-private-parse"}
+
+    await service.generate_mock_response(request_data, endpoint_id="ai-private")
+
+    assert body_json_cache.peek(request_data, MISSING) is MISSING
+
+
+@pytest.mark.asyncio
+async def test_generate_mock_response_timeout(make_service):
+    service = make_service(delay=1.0, timeout=0.05)
+
+    result = await service.generate_mock_response(webhook(), endpoint_id="ai-timeout")
+
+    assert result["error"] == "AI generation timed out"
+
+
+@pytest.mark.asyncio
+async def test_generate_mock_response_respects_concurrency_cap(make_service):
+    service = make_service(delay=0.02, concurrency=2)
+
+    await asyncio.gather(*[
+        service.generate_mock_response(webhook(i, key=f"n{i}"), endpoint_id=f"ai-cap-{i}")
+        for i in range(6)
+    ])
+
+    assert service.client.messages.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_mock_response_served_from_cache(make_service):
+    service = make_service(delay=0)
+
+    first = await service.generate_mock_response(
+        {"method": "POST", "body_raw": "", "body_json": {"type": "push", "id": 1}, "headers": {}},
+        endpoint_id="ai-cache"
+    )
+    second = await service.generate_mock_response(
+        {"method": "POST", "body_raw": "", "body_json": {"type": "push", "id": 2}, "headers": {}},
+        endpoint_id="ai-cache"
+    )
+
+    assert first["source"] == "ai"
+    assert first["tokens_used"] == 150
+    assert second["source"] == "cache"
+    assert second["mock_response"] == first["mock_response"]
+    assert service.client.messages.max_in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_identical_shapes_share_one_generation(make_service):
+    service = make_service(delay=0.02)
+    service.cache = None
+
+    results = await asyncio.gather(*[
+        service.generate_mock_response(webhook(i), endpoint_id="ai-coalesce")
+        for i in range(5)
+    ])
+
+    assert len(service.client.messages.prompts) == 1
+    assert all(result["mock_response"] == {"status": "ok"} for result in results)
+    assert [result.get("coalesced", False) for result in results] == [False, True, True, True, True]
+    assert service.get_stats()["coalesced"] == 4
+    assert service.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_micro_batching_groups_distinct_requests(make_service):
+    service = make_service(delay=0)
+    service.client.messages.reply = '[{"status": "one"}, {"status": "two"}, {"status": "three"}]'
+    service.batcher = MicroBatcher(service._run_batch, window_seconds=0.02, max_size=8)
+
+    results = await asyncio.gather(*[
+        service.generate_mock_response(webhook(i, key=f"batch{i}"), endpoint_id="ai-batch")
+        for i in range(3)
+    ])
+
+    assert [result["mock_response"] for result in results] == [{"status": "one"}, {"status": "two"}, {"status": "three"}]
+    assert service.model_calls == 1
+    assert "REQUEST 3:" in service.client.messages.prompts[0]
+    assert service.get_stats()["batching"]["largest_batch"] == 3
+
+
+@pytest.mark.asyncio
+async def test_batches_are_not_capped_by_the_worker_count(make_service):
+    service = make_service(delay=0.01, concurrency=4, jobs=AIJobQueue(workers=4))
+    service.client.messages.reply = "[" + ", ".join(['{"status": "ok"}'] * 8) + "]"
+    service.batcher = MicroBatcher(service._run_batch, window_seconds=0.02, max_size=8)
+
+    results = await asyncio.gather(*[
+        service.generate_mock_response(webhook(i, key=f"wide{i}"), endpoint_id=f"ai-wide-{i % 4}")
+        for i in range(16)
+    ])
+
+    assert all(result["mock_response"] == {"status": "ok"} for result in results)
+    assert service.model_calls == 2
+    assert service.get_stats()["batching"]["largest_batch"] == 8
+    assert service.jobs.completed == 2
+
+
+@pytest.mark.asyncio
+async def test_mismatched_batch_reply_falls_back_to_single_calls(make_service):
+    service = make_service(delay=0)
+    service.batcher = MicroBatcher(service._run_batch, window_seconds=0.02, max_size=2)
+
+    results = await asyncio.gather(*[
+        service.generate_mock_response(webhook(i, key=f"fallback{i}"), endpoint_id="ai-fallback")
+        for i in range(2)
+    ])
+
+    assert [result["mock_response"] for result in results] == [{"status": "ok"}, {"status": "ok"}]
+    assert service.model_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_propagates_failures():
+    async def fail(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(fail, window_seconds=0.01)
+
+    with pytest.raises(ValueError):
+        await batcher.submit("item")
+
+
+@pytest.mark.asyncio
+async def test_ai_service_rejects_or_degrades_when_the_queue_is_full(make_service):
+    service = make_service(delay=0.05, jobs=AIJobQueue(workers=1, max_pending=1))
+
+    results = await asyncio.gather(*[
+        service.generate_mock_response(webhook(i, key=f"queue{i}"), endpoint_id="ai-queue")
+        for i in range(3)
+    ])
+    assert [result.get("queue_full", False) for result in results] == [False, True, True]
+
+    service.overflow_policy = OVERFLOW_DEGRADE
+    results = await asyncio.gather(*[
+        service.generate_mock_response(webhook(i, key=f"degrade{i}"), endpoint_id="ai-degrade")
+        for i in range(2)
+    ])
+    assert results[1]["degraded"] is True
+    assert results[1]["source"] == "static"
+    assert results[1]["mock_response"] == {"received": True}
+    assert service.get_stats()["overflowed"] == 3
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from fastapi import status
 
@@ -121,4 +123,276 @@ def test_full_flow_create_and_receive(client):
     assert get_response.status_code == 200
 
     endpoint_data = get_response.json()
-    assert endpoint_data["id"] == endpoint_id
\ No newline at end of file
+    assert endpoint_data["id"] == endpoint_id
+
+def test_create_endpoint_with_capacity(client):
+    response = client.post("/endpoints", json={"name": "Capacity", "max_requests": 2})
+    assert response.status_code == status.HTTP_201_CREATED
+    endpoint_id = response.json()["id"]
+    assert response.json()["max_requests"] == 2
+
+    for i in range(3):
+        client.post(f"/w/{endpoint_id}", json={"event": f"test_{i}"})
+
+    data = client.get(f"/endpoints/{endpoint_id}/requests").json()
+    assert data["request_count"] == 3
+    assert [r["body_json"]["event"] for r in data["requests"]] == ["test_1", "test_2"]
+
+    window = client.get(f"/endpoints/{endpoint_id}/requests?limit=1").json()
+    assert [r["body_json"]["event"] for r in window["requests"]] == ["test_2"]
+
+
+def test_create_endpoint_capacity_validation(client):
+    response = client.post("/endpoints", json={"max_requests": 0})
+    assert response.status_code == 422
+
+
+def test_request_listing_cursor_pagination(client):
+    endpoint_id = client.post("/endpoints", json={"name": "Paging"}).json()["id"]
+
+    for i in range(5):
+        client.post(f"/w/{endpoint_id}", json={"event": f"test_{i}"})
+
+    first = client.get(f"/endpoints/{endpoint_id}/requests?limit=2").json()
+    assert [r["body_json"]["event"] for r in first["requests"]] == ["test_3", "test_4"]
+    assert first["has_more"] is True
+
+    older = client.get(
+        f"/endpoints/{endpoint_id}/requests?limit=2&before={first['cursors']['before']}"
+    ).json()
+    assert [r["body_json"]["event"] for r in older["requests"]] == ["test_1", "test_2"]
+
+    oldest = client.get(
+        f"/endpoints/{endpoint_id}/requests?limit=2&before={older['cursors']['before']}"
+    ).json()
+    assert [r["body_json"]["event"] for r in oldest["requests"]] == ["test_0"]
+    assert oldest["has_more"] is False
+
+    newer = client.get(
+        f"/endpoints/{endpoint_id}/requests?after={older['cursors']['after']}"
+    ).json()
+    assert [r["body_json"]["event"] for r in newer["requests"]] == ["test_3", "test_4"]
+    assert newer["has_more"] is False
+
+    # Unknown (or evicted) cursors are an error in either direction, not an empty or full page
+    for cursor in ("after", "before"):
+        stale = client.get(f"/endpoints/{endpoint_id}/requests?{cursor}=evicted-id")
+        assert stale.status_code == 400
+        assert "evicted-id" in stale.json()["detail"]
+    assert client.get(f"/endpoints/{endpoint_id}/search?q=test_1&before=evicted-id").status_code == 400
+
+
+def test_request_listing_filters_and_projection(client):
+    endpoint_id = client.post("/endpoints", json={"name": "Filters"}).json()["id"]
+
+    client.post(f"/w/{endpoint_id}", json={"event": "json"}, headers={"X-Signature": "abc"})
+    client.put(f"/w/{endpoint_id}", content="plain", headers={"Content-Type": "text/plain"})
+    client.get(f"/w/{endpoint_id}")
+
+    by_method = client.get(f"/endpoints/{endpoint_id}/requests?method=put").json()
+    assert [r["method"] for r in by_method["requests"]] == ["PUT"]
+
+    by_type = client.get(f"/endpoints/{endpoint_id}/requests?content_type=application/json").json()
+    assert [r["method"] for r in by_type["requests"]] == ["POST"]
+
+    by_header = client.get(f"/endpoints/{endpoint_id}/requests?header=x-signature").json()
+    assert [r["method"] for r in by_header["requests"]] == ["POST"]
+
+    by_body = client.get(f"/endpoints/{endpoint_id}/requests?where=event=json").json()
+    assert [r["body_json"] for r in by_body["requests"]] == [{"event": "json"}]
+
+    bad_filter = client.get(f"/endpoints/{endpoint_id}/requests?where=event")
+    assert bad_filter.status_code == 400
+
+    future = client.get(f"/endpoints/{endpoint_id}/requests?start_time=2999-01-01T00:00:00").json()
+    assert future["requests"] == []
+
+    projected = client.get(f"/endpoints/{endpoint_id}/requests?fields=method,content_length").json()
+    assert set(projected["requests"][0]) == {"id", "method", "content_length"}
+
+    invalid = client.get(f"/endpoints/{endpoint_id}/requests?fields=nope")
+    assert invalid.status_code == 400
+
+
+def test_request_listing_nonexistent_endpoint(client):
+    response = client.get("/endpoints/fake-id-12345/requests")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_websocket_receives_new_requests():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        endpoint_id = client.post("/endpoints", json={"name": "Live"}).json()["id"]
+
+        with client.websocket_connect(f"/ws/{endpoint_id}") as websocket:
+            client.post(f"/w/{endpoint_id}", json={"event": "live"})
+            message = websocket.receive_json()
+
+    assert message["type"] == "new_request"
+    assert json.loads(message["data"]["body_raw"]) == {"event": "live"}
+    # The broadcast carries the raw body; nothing has asked for the parsed one yet
+    assert "body_json" not in message["data"]
+
+
+def test_large_and_binary_bodies(client, tmp_path, monkeypatch):
+    from core.config import settings
+    from services.endpoint_service import endpoint_service
+
+    monkeypatch.setattr(settings, "BODY_SPILL_THRESHOLD_BYTES", 1024)
+    monkeypatch.setattr(settings, "BODY_PREVIEW_BYTES", 16)
+    monkeypatch.setattr(endpoint_service.body_spool, "directory", str(tmp_path))
+
+    endpoint_id = client.post("/endpoints", json={"name": "Bodies"}).json()["id"]
+    large = b"a" * 5000
+    binary = b"\x89PNG\r\n\x1a\n\xff"
+
+    large_id = client.post(f"/w/{endpoint_id}", content=large).json()["request_id"]
+    binary_id = client.post(
+        f"/w/{endpoint_id}",
+        content=binary,
+        headers={"content-type": "image/png"}
+    ).json()["request_id"]
+
+    requests = {
+        request_data["id"]: request_data
+        for request_data in client.get(f"/endpoints/{endpoint_id}/requests").json()["requests"]
+    }
+    assert requests[large_id]["body_truncated"] is True
+    assert requests[large_id]["body_raw"] == "a" * 16
+    assert requests[large_id]["content_length"] == 5000
+    assert requests[binary_id]["body_encoding"] == "base64"
+
+    large_body = client.get(f"/endpoints/{endpoint_id}/requests/{large_id}/body")
+    assert large_body.content == large
+
+    binary_body = client.get(f"/endpoints/{endpoint_id}/requests/{binary_id}/body")
+    assert binary_body.content == binary
+    assert binary_body.headers["content-type"] == "image/png"
+
+    missing = client.get(f"/endpoints/{endpoint_id}/requests/fake-id/body")
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_search_requests(client):
+    endpoint_id = client.post("/endpoints", json={"name": "Search"}).json()["id"]
+
+    client.post(f"/w/{endpoint_id}?source=stripe", json={"type": "invoice.paid", "customer": "cus_123"})
+    client.post(f"/w/{endpoint_id}", json={"type": "invoice.paid", "customer": "cus_456"})
+
+    by_text = client.get(f"/endpoints/{endpoint_id}/search?q=cus_123&fields=body_json").json()
+    assert [r["body_json"]["customer"] for r in by_text["requests"]] == ["cus_123"]
+
+    by_path = client.get(
+        f"/endpoints/{endpoint_id}/search",
+        params={"json": "$.customer == cus_456"}
+    ).json()
+    assert len(by_path["requests"]) == 1
+
+    assert client.get(f"/endpoints/{endpoint_id}/search").status_code == 400
+    assert client.get(f"/endpoints/{endpoint_id}/search?json===x").status_code == 400
+    assert client.get("/endpoints/fake-id/search?q=anything").status_code == 404
+
+
+def test_mock_response_mode(client):
+    create_response = client.post("/endpoints", json={
+        "name": "Mock Mode",
+        "response": {"mode": "mock", "status_code": 503, "headers": {"retry-after": "5"}, "body": {"error": "busy"}}
+    })
+    endpoint_id = create_response.json()["id"]
+    assert create_response.json()["response"]["mode"] == "mock"
+
+    response = client.post(f"/w/{endpoint_id}", json={"event": "order.created"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert response.json() == {"error": "busy"}
+
+    update_response = client.put(f"/endpoints/{endpoint_id}/response", json={
+        "mode": "mock",
+        "latency": {"distribution": "fixed", "ms": 20}
+    })
+    assert update_response.status_code == 200
+
+    response = client.post(f"/w/{endpoint_id}", headers={"stripe-signature": "t=1"}, json={"type": "charge.succeeded"})
+    assert response.status_code == 200
+    assert response.json() == {"received": True}
+
+    history = client.get(f"/endpoints/{endpoint_id}/requests").json()
+    assert history["request_count"] == 2
+
+    invalid = client.put(f"/endpoints/{endpoint_id}/response", json={
+        "latency": {"distribution": "uniform", "min_ms": 10, "max_ms": 5}
+    })
+    assert invalid.status_code == 422
+    assert client.put("/endpoints/missing/response", json={}).status_code == 404
+
+
+def test_forward_and_replay_validation(client):
+    endpoint_id = client.post("/endpoints", json={"name": "Forwarding"}).json()["id"]
+
+    response = client.put(f"/endpoints/{endpoint_id}/forward", json={"target_url": "http://upstream.test/hook"})
+    assert response.status_code == 200
+    assert response.json()["forward_url"] == "http://upstream.test/hook"
+    assert client.put(f"/endpoints/{endpoint_id}/forward", json={"target_url": None}).json()["forward_url"] is None
+
+    assert client.put(f"/endpoints/{endpoint_id}/forward", json={"target_url": "ftp://example.com"}).status_code == 400
+    assert client.put(f"/endpoints/{endpoint_id}/forward", json={"target_url": "http://169.254.169.254/"}).status_code == 400
+    assert client.put(f"/endpoints/{endpoint_id}/forward", json={"target_url": f"http://testserver/w/{endpoint_id}"}).status_code == 400
+    assert client.post(f"/endpoints/{endpoint_id}/replays", json={"target_url": f"http://testserver/w/{endpoint_id}"}).status_code == 400
+    assert client.put("/endpoints/missing/forward", json={}).status_code == 404
+    assert client.post("/endpoints/missing/replays", json={"target_url": "http://upstream.test/"}).status_code == 404
+    assert client.post(f"/endpoints/{endpoint_id}/replays", json={"target_url": "http://upstream.test/", "rps": 0}).status_code == 422
+    assert client.get(f"/endpoints/{endpoint_id}/replays/unknown").status_code == 404
+
+
+def test_metrics_endpoint(client):
+    endpoint_id = client.post("/endpoints", json={"name": "Metrics"}).json()["id"]
+    client.post(f"/w/{endpoint_id}", json={"event": "metrics"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'webhook_debugger_ingest_seconds_count{mode="envelope"}' in response.text
+    assert "webhook_debugger_body_bytes_bucket" in response.text
+    assert "webhook_debugger_store_endpoints" in response.text
+
+
+def test_websocket_resumes_after_since_and_events_route_validates():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        endpoint_id = client.post("/endpoints", json={"name": "Resume"}).json()["id"]
+        for number in range(3):
+            client.post(f"/w/{endpoint_id}", json={"n": number})
+
+        with client.websocket_connect(f"/ws/{endpoint_id}?since=1") as websocket:
+            replayed = [websocket.receive_json() for _ in range(2)]
+            client.post(f"/w/{endpoint_id}", json={"n": 3})
+            live = websocket.receive_json()
+
+        bad_id = client.get(f"/endpoints/{endpoint_id}/events", headers={"Last-Event-ID": "abc"})
+        missing = client.get("/endpoints/fake-id-12345/events")
+
+    assert [(m["seq"], json.loads(m["data"]["body_raw"])["n"]) for m in replayed] == [(2, 1), (3, 2)]
+    assert (live["seq"], json.loads(live["data"]["body_raw"])["n"]) == (4, 3)
+    assert bad_id.status_code == 400
+    assert missing.status_code == 404
+
+
+def test_get_single_request(client):
+    endpoint_id = client.post("/endpoints", json={"name": "Single"}).json()["id"]
+    first = client.post(f"/w/{endpoint_id}", json={"n": 1}).json()["request_id"]
+    second = client.post(f"/w/{endpoint_id}", json={"n": 2}).json()["request_id"]
+
+    response = client.get(f"/endpoints/{endpoint_id}/requests/{first}")
+    projected = client.get(f"/endpoints/{endpoint_id}/requests/{second}?fields=body_json")
+    missing = client.get(f"/endpoints/{endpoint_id}/requests/unknown-id")
+
+    assert first < second
+    assert response.status_code == 200
+    assert response.json()["body_json"] == {"n": 1}
+    assert projected.json() == {"id": second, "body_json": {"n": 2}}
+    assert missing.status_code == 404
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks import scenarios
+from benchmarks.harness import compare, percentile, summarize
+
+
+def test_summary_percentiles_and_compare():
+    latencies = [number / 1000 for number in range(1, 1001)]
+    result = {"scenario": "store", **summarize(latencies, 2.0, history=100)}
+
+    assert percentile(sorted(latencies), 0.5) == 0.5
+    assert result["throughput"] == 500.0
+    assert result["latency_ms"]["p99"] == 990.0
+    assert result["latency_ms"]["p999"] == 999.0
+
+    faster = {**result, "throughput": 750.0}
+    rows = compare({"results": [result]}, {"results": [faster, {**result, "params": {"history": 5}}]})
+    assert len(rows) == 1
+    assert rows[0]["throughput"] == 50.0
+    assert rows[0]["p50"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_scenarios_run_at_small_sizes():
+    ingest = await scenarios.ingest(requests=20, concurrency=4, payload_bytes=256, endpoints=2, subscribers=2)
+    fanout = await scenarios.broadcast_fanout(subscribers=3, events=10)
+    store = scenarios.store_add_request(history=50, requests=100)
+    limiter = scenarios.rate_limiter_checks(keys=10, checks=100)
+
+    assert ingest["ops"] == 20
+    assert ingest["ai_calls"] == 20
+    assert ingest["ws_messages_delivered"] == 40
+    assert fanout["ops"] == 10
+    assert store["params"] == {"history": 50, "payload_bytes": 1024}
+    assert limiter["ops"] == 100
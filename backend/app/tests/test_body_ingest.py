@@ -0,0 +1,106 @@
+import os
+import pytest
+
+from services.body_ingest import BodyTooLargeError, ingest_body
+from storage.body_spool import BodySpool
+from storage.store import EndpointStore
+
+
+async def chunked(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return BodySpool(str(tmp_path))
+
+
+async def ingest(spool, *chunks, threshold=64, preview=8, max_bytes=0):
+    return await ingest_body(
+        chunked(*chunks),
+        "req-1",
+        spool=spool,
+        spill_threshold=threshold,
+        preview_bytes=preview,
+        max_bytes=max_bytes
+    )
+
+
+@pytest.mark.asyncio
+async def test_small_text_body_stays_inline(spool):
+    body = await ingest(spool, b'{"event": ', b'"ping"}')
+
+    assert not body.spilled
+    assert body.size == 17
+    assert body.raw == '{"event": "ping"}'
+    assert body.encoding == "utf-8"
+    assert not os.listdir(spool.directory)
+
+
+@pytest.mark.asyncio
+async def test_multibyte_character_split_across_chunks_is_text(spool):
+    encoded = "zażółć".encode("utf-8")
+
+    body = await ingest(spool, encoded[:3], encoded[3:])
+
+    assert body.is_text
+    assert body.raw == "zażółć"
+
+
+@pytest.mark.asyncio
+async def test_non_utf8_body_is_kept_as_bytes(spool):
+    body = await ingest(spool, b"\xff\xfe\x00binary")
+
+    assert not body.is_text
+    assert body.encoding == "base64"
+    assert body.raw == b"\xff\xfe\x00binary"
+
+
+@pytest.mark.asyncio
+async def test_large_body_spills_with_preview(spool):
+    payload = b'{"items": [' + b"1," * 100 + b"1]}"
+
+    body = await ingest(spool, payload[:50], payload[50:120], payload[120:])
+
+    assert body.spilled
+    assert body.size == len(payload)
+    assert body.raw == payload[:8].decode()
+    with open(spool.path_for("req-1"), "rb") as f:
+        assert f.read() == payload
+
+
+@pytest.mark.asyncio
+async def test_body_over_limit_is_rejected_and_cleaned_up(spool):
+    with pytest.raises(BodyTooLargeError):
+        await ingest(spool, b"x" * 100, b"x" * 100, max_bytes=150)
+
+    assert not os.listdir(spool.directory)
+
+
+@pytest.mark.asyncio
+async def test_broken_stream_removes_the_partial_spool_file(spool):
+    async def disconnecting():
+        yield b"x" * 100
+        yield b"x" * 100
+        raise ConnectionResetError("client went away")
+
+    with pytest.raises(ConnectionResetError):
+        await ingest_body(disconnecting(), "req-1", spool=spool, spill_threshold=64, preview_bytes=8)
+
+    assert not os.listdir(spool.directory)
+
+
+@pytest.mark.asyncio
+async def test_evicted_request_releases_spooled_body(spool):
+    store = EndpointStore()
+    store.body_spool = spool
+    store.create("ep", max_requests=1)
+
+    await ingest(spool, b"x" * 100)
+    store.add_request("ep", {"id": "req-1", "body_truncated": True})
+    assert spool.exists("req-1")
+
+    store.add_request("ep", {"id": "req-2", "body_truncated": False})
+
+    assert not spool.exists("req-1")
@@ -0,0 +1,101 @@
+import json
+import tracemalloc
+import pytest
+from datetime import datetime
+
+from core.serialization import dumps_text
+from schemas.endpoint import WebhookRequest
+from storage.body_json import with_body_json
+from storage.captured_request import RECORD_OVERHEAD_BYTES, CapturedRequest
+from storage.sqlite_store import SQLiteEndpointStore
+
+
+def make_record(request_id="rec-1", **overrides):
+    fields = {
+        "id": request_id,
+        "method": "POST",
+        "headers": {"content-type": "application/json", "x-github-event": "push"},
+        "body_raw": '{"ref": "main"}',
+        "content_type": "application/json",
+        "content_length": 15,
+        "ip_address": "127.0.0.1",
+        "query_params": {"token": "abc"},
+        "created_at": 1767322800.5
+    }
+    fields.update(overrides)
+    return CapturedRequest(**fields)
+
+
+def test_records_share_header_name_tuples():
+    first = make_record("rec-1")
+    second = make_record("rec-2", headers={"content-type": "text/plain", "x-github-event": "ping"})
+
+    assert first.header_names is second.header_names
+    assert first.query_names is second.query_names
+    assert not hasattr(first, "__dict__")
+
+
+def test_record_overhead_matches_the_documented_figure():
+    names = [f"x-header-{n}" for n in range(14)]
+    count = 2000
+    # Values and bodies exist up front: both layouts hold the same strings, so they are not overhead
+    headers = [[(name, f"value-{i}-{n}") for n, name in enumerate(names)] for i in range(count)]
+    ids = [f"req-{i:06d}" for i in range(count)]
+    body = '{"type": "charge.succeeded"}'
+    CapturedRequest("warm-up", "POST", headers=dict(headers[0]))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [
+        CapturedRequest(ids[i], "POST", headers=dict(headers[i]), body_raw=body, ip_address="10.0.0.1", seq=100_000 + i)
+        for i in range(count)
+    ]
+    per_record = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+
+    assert len(records) == count
+    assert abs(per_record - RECORD_OVERHEAD_BYTES) <= RECORD_OVERHEAD_BYTES * 0.15
+
+
+def test_record_reads_like_the_old_dict():
+    record = make_record()
+
+    assert record["headers"] == {"content-type": "application/json", "x-github-event": "push"}
+    assert record.get("query_params") == {"token": "abc"}
+    assert record["timestamp"] == datetime.fromtimestamp(1767322800.5)
+    assert "ai_mock_response" not in record
+    assert record.get("ai_mock_response") is None
+    assert record.get("body_json") is None
+    with pytest.raises(KeyError):
+        record["nope"]
+
+
+def test_only_the_mock_response_can_change():
+    record = make_record()
+
+    record.update({"ai_mock_response": {"status": "pending"}})
+    assert record["ai_mock_response"] == {"status": "pending"}
+
+    with pytest.raises(KeyError):
+        record["method"] = "GET"
+
+
+def test_api_view_matches_webhook_request_schema():
+    record = make_record()
+
+    view = with_body_json(record)
+
+    assert WebhookRequest(**view).body_json == {"ref": "main"}
+    assert json.loads(dumps_text(record))["headers"]["x-github-event"] == "push"
+
+
+def test_sqlite_store_persists_records(tmp_path):
+    store = SQLiteEndpointStore(str(tmp_path / "records.db"), flush_interval=0)
+    store.create("ep")
+    store.add_request("ep", make_record())
+
+    stored = store.list_requests("ep")[0]
+
+    assert stored["headers"]["x-github-event"] == "push"
+    assert stored["timestamp"] == datetime.fromtimestamp(1767322800.5)
+    store.close()
@@ -0,0 +1,80 @@
+import json
+import pytest
+
+from core.config import settings
+from storage.captured_request import CapturedRequest
+from storage.cold_tier import BodyCodec, ColdTier
+from storage.search_index import RequestSearch
+from storage.store import EndpointStore
+
+
+def make_body(i):
+    return json.dumps({
+        "type": "invoice.paid",
+        "data": {"object": {"id": f"in_{i:08d}", "customer": f"cus_{i:06d}", "currency": "usd", "paid": True}},
+        "livemode": False
+    })
+
+
+def make_record(i, body=None):
+    body = make_body(i) if body is None else body
+    return CapturedRequest(f"cold-{i}", "POST", {"content-type": "application/json"}, body, content_length=len(body))
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(settings, "COLD_TIER_HOT_REQUESTS", 3)
+    monkeypatch.setattr(settings, "COLD_TIER_MIN_BODY_BYTES", 32)
+    store = EndpointStore()
+    store.create("ep", max_requests=10)
+    return store
+
+
+def test_dictionary_beats_plain_zlib():
+    bodies = [make_body(i).encode() for i in range(40)]
+    with_dictionary = BodyCodec(bodies[:32])
+    plain = BodyCodec([])
+
+    sample = bodies[-1]
+    assert with_dictionary.decompress(with_dictionary.compress(sample)) == sample
+    assert len(with_dictionary.compress(sample)) < len(plain.compress(sample)) / 2
+
+
+def test_requests_leaving_the_hot_window_are_compressed(store):
+    for i in range(6):
+        store.add_request("ep", make_record(i))
+
+    requests = store.list_requests("ep")
+    assert [r.is_cold for r in requests] == [True, True, True, False, False, False]
+    assert [r["body_raw"] for r in requests] == [make_body(i) for i in range(6)]
+
+    stats = store.get_stats()
+    assert stats["cold_bodies"] == 3
+    assert stats["cold_stored_bytes"] < stats["cold_raw_bytes"]
+
+
+def test_cold_bodies_stay_searchable_and_are_released_on_eviction(store):
+    for i in range(12):
+        store.add_request("ep", make_record(i))
+
+    page = store.search_requests("ep", RequestSearch.from_text("cus_000003"))
+    assert [r["id"] for r in page.requests] == ["cold-3"]
+
+    stats = store.get_stats()
+    assert stats["requests"] == 10
+    assert stats["cold_bodies"] == 7
+
+
+def test_small_binary_and_dict_bodies():
+    tier = ColdTier(hot_size=1, min_body_bytes=32)
+
+    small = make_record(1, body="{}")
+    assert not tier.freeze(small)
+
+    binary = make_record(2, body=bytes(range(256)) * 4)
+    assert tier.freeze(binary, hot_bodies=[bytes(range(256))])
+    assert binary.body_raw == bytes(range(256)) * 4
+
+    tier.forget(binary)
+    assert tier.get_stats()["compressed_bodies"] == 0
+    assert tier.get_stats()["stored_bytes"] == 0
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import pytest
+
+from services.connection_manager import ConnectionManager, OVERFLOW_DROP_OLDEST
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.release = asyncio.Event()
+        if not delay:
+            self.release.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(json.loads(message))
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_does_not_wait_for_slow_clients():
+    manager = ConnectionManager(max_queue=10)
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=1)
+    await manager.connect("ep", fast)
+    await manager.connect("ep", slow)
+
+    manager.broadcast_new_request("ep", {"id": "r1"})
+    await settle()
+
+    assert [m["data"]["id"] for m in fast.sent] == ["r1"]
+    assert slow.sent == []
+
+    slow.release.set()
+    await settle()
+    assert [m["data"]["id"] for m in slow.sent] == ["r1"]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_overflow_reports_missed_requests():
+    manager = ConnectionManager(max_queue=2)
+    websocket = FakeWebSocket(delay=1)
+    await manager.connect("ep", websocket)
+    await settle()
+
+    for i in range(6):
+        manager.broadcast_new_request("ep", {"id": f"r{i}"})
+
+    stats = manager.get_stats()["clients"][0]
+    assert stats["queue_depth"] == 2
+    assert stats["dropped"] == 4
+
+    websocket.release.set()
+    await settle()
+
+    assert websocket.sent[0] == {"type": "missed_requests", "data": {"count": 4}}
+    assert [m["data"]["id"] for m in websocket.sent[1:]] == ["r4", "r5"]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_overflow_is_silent():
+    manager = ConnectionManager(max_queue=2, overflow_policy=OVERFLOW_DROP_OLDEST)
+    websocket = FakeWebSocket(delay=1)
+    await manager.connect("ep", websocket)
+    await settle()
+
+    for i in range(5):
+        manager.broadcast_new_request("ep", {"id": f"r{i}"})
+
+    websocket.release.set()
+    await settle()
+
+    assert [m["data"]["id"] for m in websocket.sent] == ["r3", "r4"]
+    assert manager.get_stats()["clients"][0]["dropped"] == 3
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_client_is_disconnected():
+    manager = ConnectionManager()
+    await manager.connect("ep", FakeWebSocket(fail=True))
+
+    manager.broadcast_new_request("ep", {"id": "r1"})
+    await settle()
+
+    assert "ep" not in manager.active_connections
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_sender():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    await manager.connect("ep", websocket)
+    client = manager.active_connections["ep"][0]
+
+    manager.disconnect("ep", websocket)
+    await settle()
+
+    assert client.task.cancelled()
+    assert manager.get_stats()["connections"] == 0
+
+
+@pytest.mark.asyncio
+async def test_payload_encoded_once_for_all_subscribers():
+    from datetime import datetime
+
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for websocket in sockets:
+        await manager.connect("ep", websocket)
+
+    manager.broadcast_new_request("ep", {"id": "r1", "timestamp": datetime(2026, 1, 2, 3, 4, 5)})
+
+    payloads = {id(client.queue._queue[0][1]) for client in manager.active_connections["ep"]}
+    assert len(payloads) == 1
+
+    await settle()
+    for websocket in sockets:
+        assert websocket.sent[0]["data"]["timestamp"] == "2026-01-02T03:04:05"
+    await manager.close()
+
+
+def stored(*seqs):
+    events = [{"id": f"r{seq}", "seq": seq} for seq in seqs]
+    return lambda after, limit: [event for event in events if event["seq"] > after][:limit]
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_backlog_then_skips_duplicates():
+    manager = ConnectionManager(max_queue=10)
+    websocket = FakeWebSocket()
+    await manager.connect("ep", websocket, since=2, backlog=stored(1, 2, 3, 4))
+
+    # r4 was stored before the client registered but broadcast after it
+    manager.broadcast_new_request("ep", {"id": "r4", "seq": 4})
+    manager.broadcast_new_request("ep", {"id": "r5", "seq": 5})
+    await settle()
+
+    assert [(m["seq"], m["data"]["id"]) for m in websocket.sent] == [(3, "r3"), (4, "r4"), (5, "r5")]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_resume_reports_evicted_and_too_old_gaps():
+    manager = ConnectionManager(max_queue=10, replay_limit=3)
+    evicted, behind = FakeWebSocket(), FakeWebSocket()
+    await manager.connect("ep", evicted, since=1, backlog=stored(4, 5))
+    await manager.connect("ep", behind, since=0, backlog=stored(1, 2, 3, 4, 5))
+    await settle()
+
+    assert evicted.sent[0] == {"type": "missed_requests", "data": {"count": 2}}
+    assert [m["seq"] for m in evicted.sent[1:]] == [4, 5]
+    assert behind.sent == [{"type": "missed_requests", "data": {"count": 4}}]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_event_stream_frames_and_cleanup():
+    manager = ConnectionManager(max_queue=10, keepalive_seconds=0.01)
+    stream = manager.stream("ep", since=0, backlog=stored(1))
+
+    first = await stream.__anext__()
+    keepalive = await stream.__anext__()
+    manager.broadcast_new_request("ep", {"id": "r2", "seq": 2})
+    live = await stream.__anext__()
+
+    assert first.startswith("id: 1\ndata: ") and first.endswith("\n\n")
+    assert json.loads(first.split("data: ", 1)[1])["data"]["id"] == "r1"
+    assert keepalive == ": keepalive\n\n"
+    assert live.startswith("id: 2\n")
+
+    await manager.drop_endpoint("ep", "deleted")
+    goodbye = await stream.__anext__()
+    assert json.loads(goodbye[len("data: "):])["type"] == "endpoint_removed"
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert manager.get_stats()["connections"] == 0
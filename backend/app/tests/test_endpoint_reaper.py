@@ -0,0 +1,151 @@
+import time
+import pytest
+
+from middleware.rate_limiter import rate_limiter
+from services.endpoint_reaper import EndpointReaper
+from storage.captured_request import CapturedRequest
+from storage.sqlite_store import SQLiteEndpointStore
+from storage.store import EndpointStore
+
+
+def make_record(request_id, body="x" * 1000):
+    return CapturedRequest(request_id, "POST", {"content-type": "text/plain"}, body, content_length=len(body))
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+class FakeManager:
+    def __init__(self, watched=()):
+        self.active_connections = {endpoint_id: [object()] for endpoint_id in watched}
+        self.dropped = []
+
+    async def drop_endpoint(self, endpoint_id, reason):
+        self.dropped.append((endpoint_id, reason))
+        return len(self.active_connections.pop(endpoint_id, []))
+
+
+def test_find_expired_by_ttl_and_idleness():
+    store = EndpointStore()
+    store.create("short", ttl_seconds=60)
+    store.create("forever", ttl_seconds=0)
+    store.create("idle", ttl_seconds=0)
+    store.touch("forever")
+    now = time.time()
+
+    assert store.find_expired(now) == []
+    assert store.find_expired(now + 61) == [("short", "ttl")]
+    assert store.find_expired(now + 61, idle_before=now - 3600) == [("short", "ttl")]
+    assert store.find_expired(now + 61) == [("short", "ttl")]
+    assert store.find_expired(now + 61, idle_before=store.get("forever")["last_activity"]) == [
+        ("short", "ttl"),
+        ("idle", "idle")
+    ]
+
+
+def test_memory_accounting_and_least_recently_used_shedding():
+    store = EndpointStore()
+    for endpoint_id in ("a", "b", "c"):
+        store.create(endpoint_id, max_requests=3)
+        for i in range(5):
+            store.add_request(endpoint_id, make_record(f"{endpoint_id}-{i}"))
+
+    per_endpoint = store.get("a")["memory_bytes"]
+    assert per_endpoint > 3000
+    assert store.memory_usage() == 3 * per_endpoint
+
+    store.touch("a")
+    shed = store.shed_memory(2 * per_endpoint)
+
+    assert shed == [("b", 3, per_endpoint)]
+    assert store.list_requests("b") == []
+    assert store.memory_usage() == 2 * per_endpoint
+    assert store.get_request_count("b") == 5
+
+
+@pytest.mark.asyncio
+async def test_reaper_cleans_up_and_records_why():
+    store = EndpointStore()
+    store.create("idle", ttl_seconds=0)
+    store.add_request("idle", make_record("idle-1"))
+    store.get("idle")["last_activity"] -= 3600
+    store.create("expired", ttl_seconds=60)
+    store.create("watched", ttl_seconds=0)
+    rate_limiter.check_and_consume("endpoint:idle", 10, 3600)
+
+    manager = FakeManager(watched=["watched"])
+    reaper = EndpointReaper(store, idle_seconds=1800)
+    reaper.set_websocket_manager(manager)
+
+    assert await reaper.reap(now=time.time() + 120) == 2
+
+    assert store.get("watched") is not None
+    assert store.get("idle") is None and store.get("expired") is None
+    assert manager.dropped == [("expired", "ttl"), ("idle", "idle")]
+    assert rate_limiter.get_remaining_calls("idle") == 10
+
+    stats = reaper.get_stats()
+    assert stats["reaped"] == {"ttl": 1, "idle": 1, "memory": 0}
+    assert stats["requests_dropped"] == 1
+    assert [reap["reason"] for reap in stats["recent"]] == ["ttl", "idle"]
+
+
+@pytest.mark.asyncio
+async def test_reaper_enforces_memory_budget():
+    store = EndpointStore()
+    for endpoint_id in ("old", "new"):
+        store.create(endpoint_id, ttl_seconds=0)
+        store.add_request(endpoint_id, make_record(f"{endpoint_id}-1"))
+
+    reaper = EndpointReaper(store, memory_budget_bytes=store.memory_usage() - 1)
+    await reaper.reap()
+
+    assert store.list_requests("old") == []
+    assert len(store.list_requests("new")) == 1
+    assert reaper.get_stats()["reaped"]["memory"] == 1
+    assert reaper.get_stats()["bytes_freed"] > 1000
+
+
+@pytest.mark.asyncio
+async def test_dropping_an_endpoint_closes_its_sockets():
+    from services.connection_manager import ConnectionManager
+
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    await manager.connect("ep", websocket)
+
+    assert await manager.drop_endpoint("ep", "ttl") == 1
+    assert await manager.drop_endpoint("ep", "ttl") == 0
+    assert "endpoint_removed" in websocket.sent[-1]
+    assert websocket.close_code == 4410
+    assert manager.get_stats()["connections"] == 0
+
+
+def test_sqlite_store_lifecycle(tmp_path):
+    store = SQLiteEndpointStore(str(tmp_path / "lifecycle.db"), flush_interval=0)
+    store.create("short", ttl_seconds=60)
+    store.create("forever", ttl_seconds=0)
+    store.add_request("short", make_record("short-1"))
+    now = time.time()
+
+    assert store.get_metadata("short")["expires_at"] is not None
+    assert store.find_expired(now + 61) == [("short", "ttl")]
+    # The pending request is flushed first, so "short" was active last
+    assert store.find_expired(now, idle_before=now + 1) == [("forever", "idle"), ("short", "idle")]
+
+    assert store.delete("short") == 1
+    assert store.delete("short") is None
+    assert store.get("short") is None
+    store.close()
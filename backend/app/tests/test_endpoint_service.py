@@ -1,7 +1,12 @@
+import asyncio
+import httpx
 import pytest
 from unittest.mock import Mock
 from fastapi import HTTPException
 
+from services.forwarder import Forwarder
+from storage.body_json import body_json_of
+
 def test_create_endpoint_with_name(clean_service):
     name = "My Webhook"
     result = clean_service.create_endpoint(name=name)
@@ -61,8 +66,8 @@ async def test_receive_webhook_success(clean_service):
     mock_request.client.host = "127.0.0.1"
 
     async def mock_body():
-        return b'{"test": "data"}'
-    mock_request.body = mock_body
+        yield b'{"test": "data"}'
+    mock_request.stream = mock_body
 
     result = await clean_service.receive_webhook(endpoint_id, mock_request)
 
@@ -82,9 +87,9 @@ async def test_receive_webhook_nonexistent_endpoint(clean_service):
     mock_request.client = None
 
     async def mock_body():
-        return b''
+        yield b''
 
-    mock_request.body = mock_body
+    mock_request.stream = mock_body
 
     with pytest.raises(HTTPException) as exc_info:
         await clean_service.receive_webhook("fake-id",mock_request)
@@ -107,9 +112,9 @@ async def test_receive_webhook_with_json_body(clean_service):
     json_data = '{"key": "value", "number": 123}'
 
     async def mock_body():
-        return json_data.encode('utf-8')
+        yield json_data.encode('utf-8')
 
-    mock_request.body = mock_body
+    mock_request.stream = mock_body
 
     result = await clean_service.receive_webhook(endpoint_id, mock_request)
 
@@ -117,7 +122,8 @@ async def test_receive_webhook_with_json_body(clean_service):
 
     endpoint = clean_service.store.get(endpoint_id)
     saved_request = endpoint["requests"][0]
-    assert saved_request["body_json"] == {"key": "value", "number": 123}
+    assert "body_json" not in saved_request
+    assert body_json_of(saved_request) == {"key": "value", "number": 123}
     assert saved_request["body_raw"] == json_data
 
 
@@ -135,16 +141,16 @@ async def test_receive_webhook_with_invalid_json(clean_service):
     invalid_json = '{invalid json}'
 
     async def mock_body():
-        return invalid_json.encode('utf-8')
+        yield invalid_json.encode('utf-8')
 
-    mock_request.body = mock_body
+    mock_request.stream = mock_body
 
     result = await clean_service.receive_webhook(endpoint_id, mock_request)
     assert result["status"] == "received"
 
     endpoint = clean_service.store.get(endpoint_id)
     saved_request = endpoint["requests"][0]
-    assert saved_request["body_json"] is None
+    assert body_json_of(saved_request) is None
     assert saved_request["body_raw"] == invalid_json
 
 
@@ -161,9 +167,9 @@ async def test_receive_multiple_webhooks(clean_service):
         mock_request.client = None
 
         async def mock_body():
-            return f'{{"request": {i}}}'.encode('utf-8')
+            yield f'{{"request": {i}}}'.encode('utf-8')
 
-        mock_request.body = mock_body
+        mock_request.stream = mock_body
 
         await clean_service.receive_webhook(endpoint_id, mock_request)
 
@@ -173,3 +179,98 @@ async def test_receive_multiple_webhooks(clean_service):
 
 
 
+
+
+@pytest.mark.asyncio
+async def test_receive_webhook_deferred_mock(clean_service, monkeypatch):
+    import services.endpoint_service as endpoint_module
+
+    class FakeAIService:
+        enabled = True
+
+        async def generate_mock_response(self, webhook_data, endpoint_id, ip_address=None):
+            return {"mock_response": {"status": "ok"}, "generated_at": webhook_data["timestamp"]}
+
+    class FakeManager:
+        def __init__(self):
+            self.mock_updates = []
+
+        def broadcast_new_request(self, endpoint_id, request_data):
+            pass
+
+        def broadcast_mock_response(self, endpoint_id, request_id, ai_mock):
+            self.mock_updates.append((request_id, ai_mock))
+
+    manager = FakeManager()
+    clean_service.set_websocket_manager(manager)
+    monkeypatch.setattr(endpoint_module, "ai_service", FakeAIService())
+    monkeypatch.setattr(clean_service.config, "AI_DEFERRED_RESPONSES", True)
+
+    created = clean_service.create_endpoint("Test")
+    endpoint_id = created["id"]
+
+    mock_request = Mock()
+    mock_request.method = "POST"
+    mock_request.headers = {"content-type": "application/json"}
+    mock_request.query_params = {}
+    mock_request.client = None
+
+    async def mock_body():
+        yield b'{"event": "deferred"}'
+
+    mock_request.stream = mock_body
+
+    result = await clean_service.receive_webhook(endpoint_id, mock_request)
+    assert result["ai_mock_response"] == {"status": "pending"}
+
+    await asyncio.gather(*clean_service._pending_mocks)
+
+    saved_request = clean_service.store.get(endpoint_id)["requests"][0]
+    assert saved_request["ai_mock_response"]["mock_response"] == {"status": "ok"}
+    assert manager.mock_updates[0][0] == result["request_id"]
+    assert manager.mock_updates[0][1]["mock_response"] == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_forwarding_and_replay(clean_service):
+    received = []
+
+    def handler(request):
+        received.append(request)
+        return httpx.Response(200)
+
+    clean_service.forwarder = Forwarder(transport=httpx.MockTransport(handler))
+    clean_service.forwarder.start()
+    endpoint_id = clean_service.create_endpoint("Forwarded")["id"]
+    await clean_service.set_forward_url(endpoint_id, "http://upstream.test/hooks")
+
+    mock_request = Mock()
+    mock_request.method = "POST"
+    mock_request.headers = {"content-type": "application/json", "x-github-event": "push"}
+    mock_request.query_params = {}
+    mock_request.client = None
+
+    async def mock_body():
+        yield b'{"ref": "main"}'
+
+    mock_request.stream = mock_body
+
+    result = await clean_service.receive_webhook(endpoint_id, mock_request)
+    await asyncio.gather(*clean_service.forwarder._live)
+
+    assert received[0].headers["x-webhook-debugger-replay"] == result["request_id"]
+    assert received[0].content == b'{"ref": "main"}'
+
+    # Something we forwarded coming back in is captured but not sent on again
+    mock_request.headers = {"content-type": "application/json", "x-webhook-debugger-replay": result["request_id"]}
+    await clean_service.receive_webhook(endpoint_id, mock_request)
+    assert not clean_service.forwarder._live
+    assert len(received) == 1
+
+    job = await clean_service.start_replay(endpoint_id, "http://staging.test/hooks", limit=10)
+    await clean_service.forwarder.jobs[job["id"]].task
+
+    assert clean_service.get_replay(endpoint_id, job["id"])["succeeded"] == 2
+    assert clean_service.get_replay("another-endpoint", job["id"]) is None
+    assert str(received[1].url) == "http://staging.test/hooks"
+    await clean_service.forwarder.close()
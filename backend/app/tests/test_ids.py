@@ -0,0 +1,17 @@
+import uuid
+
+import core.ids
+from core.ids import new_request_id
+
+
+def test_request_ids_are_uuid7_and_sort_by_time(monkeypatch):
+    monkeypatch.setattr(core.ids, "_last_ms", 0)
+
+    ids = [new_request_id(1_700_000_000) for _ in range(5000)]
+    later = new_request_id(1_700_000_000.002)
+    behind = new_request_id(1_600_000_000)
+
+    assert all(uuid.UUID(request_id).version == 7 for request_id in ids)
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert ids[-1] < later < behind
+    assert int(ids[0][:8] + ids[0][9:13], 16) == 1_700_000_000_000
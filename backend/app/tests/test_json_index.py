@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+
+from storage.body_json import JsonBodyCache, with_body_json
+from storage.json_index import MISSING, JsonPathIndex, extract_path, split_path
+from storage.query import RequestQuery
+
+
+def make_request(request_id, body_raw, content_type="application/json"):
+    return {"id": request_id, "body_raw": body_raw, "content_type": content_type}
+
+
+def test_body_json_is_parsed_once_and_cache_is_bounded():
+    cache = JsonBodyCache(max_entries=2)
+    first = make_request("r1", '{"event": "a"}')
+
+    assert cache.get(first) == {"event": "a"}
+    assert cache.get(first) == {"event": "a"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get(make_request("r2", '{"event": "b"}'))
+    cache.get(make_request("r3", '{"event": "c"}'))
+
+    assert len(cache) == 2
+    assert cache.get(first) == {"event": "a"}
+    assert cache.misses == 4
+
+
+def test_body_json_skips_non_json_and_truncated_bodies():
+    cache = JsonBodyCache()
+
+    assert cache.get(make_request("r1", "plain text", "text/plain")) is None
+    assert cache.get({**make_request("r2", '{"partial'), "body_truncated": True}) is None
+    assert cache.get({**make_request("r3", b"\xff"), "body_encoding": "base64"}) is None
+
+
+def test_with_body_json_projects_fields():
+    request_data = make_request("projected-1", '{"event": "a"}')
+
+    assert with_body_json(request_data, ["id", "body_json"]) == {"id": "projected-1", "body_json": {"event": "a"}}
+    assert "body_json" not in request_data
+
+
+def test_peek_never_parses():
+    cache = JsonBodyCache()
+    request_data = make_request("r1", '{"event": "a"}')
+
+    assert cache.peek(request_data) is None
+    assert len(cache) == 0
+    assert cache.misses == 0
+
+    cache.get(request_data)
+    assert cache.peek(request_data) == {"event": "a"}
+
+
+def test_extract_path():
+    document = {"data": {"object": {"id": "obj_1"}, "items": [{"sku": "a"}]}}
+
+    assert extract_path(document, split_path("data.object.id")) == "obj_1"
+    assert extract_path(document, split_path("data.items.0.sku")) == "a"
+    assert extract_path(document, split_path("data.missing")) is MISSING
+    assert extract_path(None, split_path("type")) is MISSING
+
+
+def test_index_is_capped_at_endpoint_capacity():
+    index = JsonPathIndex(["type", "data.object.id"])
+
+    for i in range(3):
+        index.add("ep", make_request(f"r{i}", f'{{"type": "t{i}", "data": {{"object": {{"id": "o{i}"}}}}}}'), capacity=2)
+
+    assert len(index) == 2
+    assert not index.is_indexed("r0", "type")
+    assert index.lookup("r2", "data.object.id") == "o2"
+    assert index.lookup("r2", "event") is MISSING
+
+
+@pytest.mark.asyncio
+async def test_background_indexer_feeds_query_filters(monkeypatch):
+    import storage.json_index as json_index_module
+
+    index = JsonPathIndex(["type"])
+    monkeypatch.setattr(json_index_module, "json_index", index)
+
+    requests = [
+        make_request("indexed-1", '{"type": "charge.succeeded", "amount": 5}'),
+        make_request("indexed-2", '{"type": "charge.failed", "amount": 7}')
+    ]
+
+    index.submit("ep", requests[0], capacity=10)
+    assert len(index) == 0
+
+    index.start()
+    for request_data in requests:
+        index.submit("ep", request_data, capacity=10)
+    for _ in range(10):
+        await asyncio.sleep(0)
+    await index.stop()
+
+    assert index.lookup("indexed-2", "type") == "charge.failed"
+
+    by_type = RequestQuery(json_equals=(("type", "charge.failed"),))
+    by_amount = RequestQuery(json_equals=(("amount", "5"),))
+
+    assert [r["id"] for r in requests if by_type.matches(r)] == ["indexed-2"]
+    assert [r["id"] for r in requests if by_amount.matches(r)] == ["indexed-1"]
@@ -0,0 +1,40 @@
+import logging
+from logging.handlers import QueueHandler
+
+from core.log import Sampler, get_logger
+from core.metrics import MetricsRegistry
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests by outcome", labelnames=("outcome",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    registry.gauge("queue_depth", "Depth", lambda: {(): 3})
+
+    requests.labels("ok").inc()
+    requests.labels("ok").inc(2)
+    requests.labels('say "hi"').inc()
+    for value in (0.05, 0.1, 0.5, 5):
+        latency.observe(value)
+
+    text = registry.render()
+
+    assert "# TYPE webhook_debugger_requests_total counter" in text
+    assert 'webhook_debugger_requests_total{outcome="ok"} 3' in text
+    assert 'webhook_debugger_requests_total{outcome="say \\"hi\\""} 1' in text
+    assert 'webhook_debugger_latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'webhook_debugger_latency_seconds_bucket{le="1"} 3' in text
+    assert 'webhook_debugger_latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "webhook_debugger_latency_seconds_count 4" in text
+    assert "webhook_debugger_queue_depth 3" in text
+    assert text.endswith("\n")
+
+
+def test_sampler_and_queued_logger():
+    sample = Sampler(every=10)
+    assert sum(sample() for _ in range(100)) == 10
+
+    logger = get_logger("tests")
+    handlers = logging.getLogger("webhook_debugger").handlers
+    assert any(isinstance(handler, QueueHandler) for handler in handlers)
+    logger.info("queued, not written on the calling thread")
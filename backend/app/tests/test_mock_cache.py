@@ -0,0 +1,69 @@
+from services.mock_cache import MockResponseCache, fingerprint_request, json_schema_of
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_schema_ignores_values():
+    assert json_schema_of({"a": 1, "b": "x"}) == json_schema_of({"b": "y", "a": 2})
+    assert json_schema_of({"a": 1}) != json_schema_of({"a": "1"})
+
+
+def test_fingerprint_uses_schema_and_discriminators():
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+    base = fingerprint_request("post", headers, {"type": "push", "id": 1}, None)
+
+    assert base == fingerprint_request("POST", headers, {"type": "push", "id": 99}, None)
+    assert base != fingerprint_request("POST", headers, {"type": "ping", "id": 1}, None)
+    assert base != fingerprint_request("PUT", headers, {"type": "push", "id": 1}, None)
+    assert base != fingerprint_request(
+        "POST", {**headers, "X-GitHub-Event": "push"}, {"type": "push", "id": 1}, None
+    )
+
+
+def test_fingerprint_ignores_irrelevant_headers():
+    first = fingerprint_request("POST", {"X-Request-Id": "1"}, {"a": 1}, None)
+    second = fingerprint_request("POST", {"X-Request-Id": "2"}, {"a": 1}, None)
+
+    assert first == second
+
+
+def test_cache_ttl_expiry():
+    clock = FakeClock()
+    cache = MockResponseCache(ttl_seconds=10, clock=clock)
+    cache.put("key", {"mock_response": {"ok": True}})
+
+    clock.now = 9
+    assert cache.get("key") is not None
+
+    clock.now = 10
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_cache_lru_eviction():
+    cache = MockResponseCache(max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    cache.get("a")
+    cache.put("c", {"v": 3})
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_cache_memory_bound():
+    cache = MockResponseCache(max_bytes=100)
+    cache.put("a", {"v": "x" * 60})
+    cache.put("b", {"v": "y" * 60})
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get_stats()["bytes"] <= 100
+    assert cache.put("huge", {"v": "z" * 200}) is False
@@ -0,0 +1,72 @@
+import pytest
+
+from services.mock_rules import BUILTIN_RULES, MockRuleEngine, compile_template
+from storage.captured_request import CapturedRequest
+
+
+def make_record(request_id, headers, body="{}"):
+    return CapturedRequest(request_id, "POST", headers, body, content_type="application/json", content_length=len(body))
+
+
+@pytest.fixture
+def engine():
+    return MockRuleEngine(BUILTIN_RULES)
+
+
+def test_signature_headers_pick_the_rule(engine):
+    stripe = engine.match(make_record("rules-1", {"stripe-signature": "t=1,v1=abc"}))
+    github = engine.match(make_record("rules-2", {"x-github-event": "push", "x-github-delivery": "d-1"}))
+
+    assert stripe["rule"] == "stripe"
+    assert stripe["source"] == "rule"
+    assert stripe["mock_response"] == {"received": True}
+    assert github["mock_response"] == {"received": True, "event": "push", "delivery": "d-1"}
+    assert engine.match(make_record("rules-3", {"content-type": "application/json"})) is None
+    assert engine.get_stats()["misses"] == 1
+
+
+def test_header_values_and_json_predicates(engine):
+    ping = engine.match(make_record(
+        "rules-4",
+        {"X-GitHub-Event": "ping"},
+        '{"zen": "Keep it logically awesome.", "hook_id": 42}'
+    ))
+    challenge = engine.match({
+        "id": "rules-5",
+        "headers": {"x-slack-signature": "v0=abc"},
+        "body_raw": '{"type": "url_verification", "challenge": "3eZbrw1a"}'
+    })
+    event = engine.match({
+        "id": "rules-6",
+        "headers": {"x-slack-signature": "v0=abc"},
+        "body_raw": '{"type": "event_callback"}'
+    })
+
+    assert ping["mock_response"] == {"message": "pong", "hook_id": 42, "zen": "Keep it logically awesome."}
+    assert challenge["mock_response"] == {"challenge": "3eZbrw1a"}
+    assert event["rule"] == "slack"
+
+
+def test_custom_rules_come_first_and_may_need_no_header():
+    engine = MockRuleEngine([
+        {
+            "name": "orders",
+            "when": ["$.kind == order"],
+            "status_code": 202,
+            "response": {"accepted": "{{body.order.id}}", "note": "order {{body.order.id}} via {{request.method}}"}
+        },
+        *BUILTIN_RULES
+    ])
+
+    result = engine.match(make_record("rules-7", {"stripe-signature": "x"}, '{"kind": "order", "order": {"id": 7}}'))
+
+    assert result["rule"] == "orders"
+    assert result["status_code"] == 202
+    assert result["mock_response"] == {"accepted": 7, "note": "order 7 via POST"}
+
+
+def test_unknown_placeholders_fail_at_compile_time():
+    with pytest.raises(ValueError):
+        compile_template({"id": "{{secrets.key}}"})
+    with pytest.raises(ValueError):
+        MockRuleEngine([{"name": "no-response"}])
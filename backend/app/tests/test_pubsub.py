@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+
+from services.connection_manager import ConnectionManager
+from services.pubsub import InProcessPubSub, RedisPubSub
+from tests.fake_redis import FakeRedisServer
+from tests.test_connection_manager import FakeWebSocket, settle
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.asyncio
+async def test_in_process_bus_delivers_to_local_subscribers():
+    bus = InProcessPubSub()
+    manager = ConnectionManager(bus=bus)
+    ws = FakeWebSocket()
+    await manager.connect("ep", ws)
+
+    manager.broadcast_new_request("ep", {"id": "r1"})
+    await settle()
+
+    assert [m["data"]["id"] for m in ws.sent] == ["r1"]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_fans_out_across_workers(redis_server):
+    bus_a = RedisPubSub(redis_server.url)
+    bus_b = RedisPubSub(redis_server.url)
+    worker_a = ConnectionManager(bus=bus_a)
+    worker_b = ConnectionManager(bus=bus_b)
+    await bus_a.start()
+    await bus_b.start()
+    await bus_a.wait_until_subscribed()
+    await bus_b.wait_until_subscribed()
+
+    viewer_a, viewer_b, other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect("ep", viewer_a)
+    await worker_b.connect("ep", viewer_b)
+    await worker_b.connect("other", other)
+
+    worker_a.broadcast_new_request("ep", {"id": "r1"})
+    worker_b.broadcast_mock_response("ep", "r1", {"mock_response": {"ok": True}})
+
+    await wait_for(lambda: len(viewer_a.sent) == 2 and len(viewer_b.sent) == 2)
+
+    for viewer in (viewer_a, viewer_b):
+        assert sorted(m["type"] for m in viewer.sent) == ["ai_mock_response", "new_request"]
+    assert other.sent == []
+
+    await bus_a.stop()
+    await bus_b.stop()
+    await worker_a.close()
+    await worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_delivers_batched_publishes_in_order(redis_server):
+    bus = RedisPubSub(redis_server.url)
+    received = []
+    bus.subscribe(lambda endpoint_id, payload: received.append((endpoint_id, payload)))
+
+    await bus.start()
+    await bus.wait_until_subscribed()
+    for i in range(50):
+        bus.publish("ep", f"event-{i}")
+
+    await wait_for(lambda: len(received) == 50)
+
+    assert received == [("ep", f"event-{i}") for i in range(50)]
+    await bus.stop()
@@ -0,0 +1,67 @@
+from middleware.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_check_and_consume_returns_remaining():
+    limiter = RateLimiter(clock=FakeClock())
+
+    results = [limiter.check_and_consume("key", max_calls=3, window_seconds=60) for _ in range(4)]
+
+    assert results == [(True, 2), (True, 1), (True, 0), (False, 0)]
+    assert limiter.remaining("key", max_calls=3, window_seconds=60) == 0
+
+
+def test_sliding_window_weights_previous_window():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+
+    for _ in range(10):
+        limiter.check_and_consume("key", max_calls=10, window_seconds=60)
+    assert limiter.check_and_consume("key", max_calls=10, window_seconds=60)[0] is False
+
+    clock.now += 90
+    assert limiter.remaining("key", max_calls=10, window_seconds=60) == 5
+
+    clock.now += 60
+    assert limiter.remaining("key", max_calls=10, window_seconds=60) == 10
+
+
+def test_endpoint_and_ip_limits_are_independent():
+    limiter = RateLimiter(clock=FakeClock())
+
+    assert limiter.check_endpoint_limit("shared", max_calls=1) is True
+    assert limiter.check_endpoint_limit("shared", max_calls=1) is False
+    assert limiter.check_ip_limit("shared", max_calls=1) is True
+    assert limiter.get_remaining_calls("shared", max_calls=1) == 0
+
+
+def test_sweep_evicts_idle_keys():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, idle_seconds=100)
+
+    limiter.check_and_consume("old", max_calls=5)
+    clock.now += 150
+    limiter.check_and_consume("fresh", max_calls=5)
+
+    assert limiter.sweep() == 1
+    assert len(limiter) == 1
+    assert limiter.remaining("old", max_calls=5) == 5
+
+
+def test_new_keys_trigger_opportunistic_sweep():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, idle_seconds=10, sweep_every=100)
+
+    for i in range(99):
+        limiter.check_and_consume(f"ip-{i}", max_calls=1)
+    clock.now += 20
+    limiter.check_and_consume("last", max_calls=1)
+
+    assert len(limiter) == 1
@@ -0,0 +1,88 @@
+import pytest
+
+from storage.request_history import RequestHistory
+
+
+def fill(history, count, start=0):
+    for i in range(start, start + count):
+        history.append({"id": f"request-{i}"})
+
+
+def ids(requests):
+    return [r["id"] for r in requests]
+
+
+def test_append_evicts_oldest():
+    history = RequestHistory(3)
+    fill(history, 3)
+
+    evicted = history.append({"id": "request-3"})
+
+    assert evicted == {"id": "request-0"}
+    assert len(history) == 3
+    assert ids(history) == ["request-1", "request-2", "request-3"]
+    assert history.find("request-0") is None
+
+
+def test_indexing_and_slicing():
+    history = RequestHistory(4)
+    fill(history, 6)
+
+    assert history[0]["id"] == "request-2"
+    assert history[-1]["id"] == "request-5"
+    assert ids(history[1:3]) == ["request-3", "request-4"]
+    with pytest.raises(IndexError):
+        history[4]
+
+
+def test_last_and_since():
+    history = RequestHistory(5)
+    fill(history, 8)
+
+    assert ids(history.last(2)) == ["request-6", "request-7"]
+    assert ids(history.last(50)) == ids(history)
+    assert history.last(0) == []
+    assert ids(history.since("request-5")) == ["request-6", "request-7"]
+    assert ids(history.since("request-4", limit=1)) == ["request-5"]
+    assert ids(history.since("request-0")) == ids(history)
+
+
+def test_equality_with_list():
+    history = RequestHistory(2)
+    assert history == []
+
+    fill(history, 1)
+    assert history == [{"id": "request-0"}]
+
+
+def test_clear():
+    history = RequestHistory(2)
+    fill(history, 2)
+    history.clear()
+
+    assert len(history) == 0
+    assert history.find("request-1") is None
+    fill(history, 1, start=10)
+    assert ids(history) == ["request-10"]
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        RequestHistory(0)
+
+
+
+def test_time_range_bisects_despite_late_arrivals():
+    from storage.captured_request import CapturedRequest
+
+    history = RequestHistory(8)
+    # request-3 was received at t=1.5 but stored after request-2 (t=3)
+    for i, received in enumerate([1, 2, 3, 1.5, 4, 5, 6, 7, 8, 9]):
+        history.append(CapturedRequest(f"request-{i}", "POST", {}, "", created_at=received))
+
+    start, end = history.time_range(1.5, 4)
+    assert (start, end) == (2, 6)
+    assert ids(r for r in history.window(start, end) if 1.5 <= r.created_at <= 4) == [
+        "request-2", "request-3", "request-4"
+    ]
+    assert history.time_range(None, None) == (2, 10)
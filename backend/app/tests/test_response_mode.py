@@ -0,0 +1,34 @@
+import random
+import statistics
+
+from services.response_mode import MAX_DELAY_SECONDS, build_mock_reply, sample_latency
+
+
+def test_fixed_and_uniform_latency():
+    rng = random.Random(1)
+
+    assert sample_latency(None) == 0.0
+    assert sample_latency({"distribution": "fixed", "ms": 250}) == 0.25
+    delays = [sample_latency({"distribution": "uniform", "min_ms": 10, "max_ms": 20}, rng) for _ in range(200)]
+    assert all(0.01 <= delay <= 0.02 for delay in delays)
+
+
+def test_percentile_profile_matches_its_p50_and_p99():
+    rng = random.Random(7)
+    profile = {"distribution": "percentiles", "p50_ms": 40, "p99_ms": 400}
+
+    delays = sorted(sample_latency(profile, rng) * 1000 for _ in range(20000))
+
+    assert 36 < statistics.median(delays) < 44
+    assert 340 < delays[int(len(delays) * 0.99)] < 470
+    assert sample_latency({"distribution": "fixed", "ms": 10 ** 9}) == MAX_DELAY_SECONDS
+
+
+def test_reply_prefers_config_then_rule_then_default():
+    rule_mock = {"mock_response": {"challenge": "abc"}, "status_code": 202}
+
+    assert build_mock_reply({"mode": "mock"}, rule_mock).status_code == 202
+    assert build_mock_reply({"mode": "mock"}, rule_mock).body == {"challenge": "abc"}
+    assert build_mock_reply({"mode": "mock", "status_code": 500, "body": "oops"}, rule_mock).render() == b"oops"
+    assert build_mock_reply({"mode": "mock"}, {"error": "AI rate limit exceeded"}).body == {"received": True}
+    assert build_mock_reply({"mode": "mock"}, None).media_type == "application/json"
@@ -0,0 +1,114 @@
+import pytest
+
+from storage.query import UnknownCursorError
+from storage.search_index import JsonPredicate, RequestSearch, SearchIndex, normalize_json_path, request_tokens
+from storage.sqlite_store import SQLiteEndpointStore
+from storage.store import EndpointStore
+
+
+def make_request(request_id, customer, event="charge.succeeded", headers=None):
+    return {
+        "id": request_id,
+        "method": "POST",
+        "headers": headers or {"content-type": "application/json"},
+        "query_params": {"source": "stripe"},
+        "body_raw": f'{{"type": "{event}", "data": {{"object": {{"customer": "{customer}"}}}}}}',
+        "content_type": "application/json"
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield EndpointStore()
+    else:
+        sqlite_store = SQLiteEndpointStore(str(tmp_path / "search.db"), batch_size=10, flush_interval=0)
+        yield sqlite_store
+        sqlite_store.close()
+
+
+def test_request_tokens_cover_headers_query_and_body():
+    tokens = request_tokens(make_request("s-1", "cus_123", headers={"X-GitHub-Event": "Push"}))
+
+    assert {"push", "stripe", "cus_123", "charge", "succeeded"} <= tokens
+
+
+def test_index_postings_follow_eviction():
+    index = SearchIndex()
+    index.add(0, make_request("s-1", "cus_1"))
+    index.add(1, make_request("s-2", "cus_2"))
+
+    assert index.candidates(["charge", "cus_2"]) == {1}
+
+    index.remove(0, make_request("s-1", "cus_1"))
+
+    assert index.candidates(["cus_1"]) == set()
+    assert index.candidates(["charge"]) == {1}
+
+
+def test_json_predicates():
+    assert normalize_json_path("$.data.items[0]['id']") == "data.items.0.id"
+
+    request_data = make_request("pred-1", "cus_9")
+    assert JsonPredicate.parse("$.data.object.customer == cus_9").matches(request_data)
+    assert JsonPredicate.parse("$.data.object.customer == 'cus_9'").matches(request_data)
+    assert JsonPredicate.parse("$.type != charge.failed").matches(request_data)
+    assert JsonPredicate.parse("$.data.object").matches(request_data)
+    assert not JsonPredicate.parse("$.data.missing").matches(request_data)
+
+    with pytest.raises(ValueError):
+        JsonPredicate.parse("== nothing")
+
+
+def test_search_is_newest_first_with_cursor(store):
+    store.create("ep", max_requests=10)
+    for i in range(5):
+        store.add_request("ep", make_request(f"{type(store).__name__}-{i}", f"cus_{i % 2}"))
+
+    page = store.search_requests("ep", RequestSearch.from_text("cus_0", limit=2))
+    ids = [r["id"] for r in page.requests]
+    assert [i[-1] for i in ids] == ["4", "2"]
+    assert page.has_more
+
+    older = store.search_requests("ep", RequestSearch.from_text("cus_0", limit=2, before=ids[-1]))
+    assert [r["id"][-1] for r in older.requests] == ["0"]
+    assert not older.has_more
+
+    by_predicate = store.search_requests(
+        "ep",
+        RequestSearch.from_text("charge", predicates=["$.data.object.customer == cus_1"])
+    )
+    assert [r["id"][-1] for r in by_predicate.requests] == ["3", "1"]
+
+    assert store.search_requests("missing", RequestSearch.from_text("cus_0")) is None
+    with pytest.raises(UnknownCursorError):
+        store.search_requests("ep", RequestSearch.from_text("cus_0", before="gone"))
+
+
+def test_evicted_requests_leave_the_index():
+    store = EndpointStore()
+    store.create("ep", max_requests=2)
+    for i in range(3):
+        store.add_request("ep", make_request(f"evict-{i}", f"cus_{i}"))
+
+    assert store.search_requests("ep", RequestSearch.from_text("cus_0")).requests == []
+    assert "cus_0" not in store.get("ep")["search"]._postings
+
+
+def test_tokens_past_the_index_cap_are_still_found(store):
+    import json
+
+    store.create("big")
+    body = {f"k{number}": f"v{number}" for number in range(300)}
+    body["status"] = "paid"
+    store.add_request("big", {**make_request("big-1", "cus_1"), "body_raw": json.dumps(body)})
+    store.add_request("big", make_request("small-1", "cus_2"))
+
+    def found(text=None, predicates=()):
+        page = store.search_requests("big", RequestSearch.from_text(text, predicates=predicates))
+        return [r["id"] for r in page.requests]
+
+    assert found(predicates=["$.status == paid"]) == ["big-1"]
+    assert found("paid") == ["big-1"]
+    assert found(predicates=["$.k1 == v1"]) == ["big-1"]
+    assert found("stripe") == ["small-1", "big-1"]
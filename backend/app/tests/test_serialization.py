@@ -0,0 +1,30 @@
+import json
+from datetime import datetime, timezone
+
+from core.serialization import dumps, dumps_text, loads, FastJSONResponse
+
+
+def test_dumps_handles_datetimes():
+    naive = datetime(2026, 1, 2, 3, 4, 5, 600000)
+    aware = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    encoded = json.loads(dumps({"naive": naive, "aware": aware}))
+
+    assert encoded["naive"] == naive.isoformat()
+    assert encoded["aware"] == aware.isoformat()
+
+
+def test_dumps_text_round_trip():
+    payload = {"type": "new_request", "data": {"body": "zażółć", "ids": ("a", "b")}}
+
+    text = dumps_text(payload)
+
+    assert isinstance(text, str)
+    assert loads(text) == {"type": "new_request", "data": {"body": "zażółć", "ids": ["a", "b"]}}
+
+
+def test_fast_json_response_renders_bytes():
+    response = FastJSONResponse({"at": datetime(2026, 1, 1)})
+
+    assert response.body == b'{"at":"2026-01-01T00:00:00"}'
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,226 @@
+import time
+import pytest
+from datetime import datetime
+
+from storage.query import UnknownCursorError
+from storage.sqlite_store import SEQ_BLOCK_SIZE, SQLiteEndpointStore
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "store.db")
+
+
+@pytest.fixture
+def sqlite_store(sqlite_path):
+    store = SQLiteEndpointStore(sqlite_path, batch_size=10, flush_interval=0)
+    yield store
+    store.close()
+
+
+def make_request(request_id):
+    return {
+        "id": request_id,
+        "timestamp": datetime.now(),
+        "method": "POST",
+        "headers": {"content-type": "application/json"},
+        "body_raw": '{"test": "data"}',
+        "body_json": {"test": "data"},
+        "content_type": "application/json",
+        "content_length": 16,
+        "ip_address": "127.0.0.1",
+        "query_params": {}
+    }
+
+
+def test_create_and_get_endpoint(sqlite_store):
+    sqlite_store.create("ep-1", "SQLite")
+
+    result = sqlite_store.get("ep-1")
+
+    assert result["id"] == "ep-1"
+    assert result["name"] == "SQLite"
+    assert result["requests"] == []
+    assert isinstance(result["created_at"], datetime)
+    assert sqlite_store.get("missing") is None
+
+
+def test_add_request_is_batched(sqlite_store):
+    sqlite_store.create("ep-batch", "Batch")
+
+    for i in range(3):
+        assert sqlite_store.add_request("ep-batch", make_request(f"req-{i}")) is True
+
+    assert sqlite_store._conn.execute("SELECT COUNT(*) FROM requests").fetchone()[0] == 0
+    assert sqlite_store.get_request_count("ep-batch") == 3
+
+    endpoint = sqlite_store.get("ep-batch")
+    assert [r["id"] for r in endpoint["requests"]] == ["req-0", "req-1", "req-2"]
+    assert isinstance(endpoint["requests"][0]["timestamp"], datetime)
+
+
+def test_add_request_to_nonexisting_endpoint(sqlite_store):
+    assert sqlite_store.add_request("missing", make_request("req")) is False
+
+
+def test_data_survives_restart(sqlite_path):
+    store = SQLiteEndpointStore(sqlite_path, flush_interval=0)
+    store.create("ep-durable", "Durable")
+    store.add_request("ep-durable", make_request("req-1"))
+    store.close()
+
+    reopened = SQLiteEndpointStore(sqlite_path, flush_interval=0)
+    endpoint = reopened.get("ep-durable")
+    reopened.close()
+
+    assert endpoint["request_count"] == 1
+    assert endpoint["requests"][0]["id"] == "req-1"
+
+
+def test_retention_bound(sqlite_path):
+    store = SQLiteEndpointStore(sqlite_path, max_requests_per_endpoint=5, batch_size=3, flush_interval=0)
+    store.create("ep-limit", "Limit")
+
+    for i in range(12):
+        store.add_request("ep-limit", make_request(f"req-{i}"))
+
+    endpoint = store.get("ep-limit")
+    stored = store._conn.execute("SELECT COUNT(*) FROM requests").fetchone()[0]
+    store.close()
+
+    assert endpoint["request_count"] == 12
+    assert stored == 5
+    assert [r["id"] for r in endpoint["requests"]] == [f"req-{i}" for i in range(7, 12)]
+
+
+def test_update_request(sqlite_store):
+    sqlite_store.create("ep-update", "Update")
+    sqlite_store.add_request("ep-update", make_request("pending"))
+    assert sqlite_store.update_request("ep-update", "pending", {"ai_mock_response": {"ok": 1}})
+
+    sqlite_store.flush()
+    sqlite_store.add_request("ep-update", make_request("flushed"))
+    sqlite_store.flush()
+    assert sqlite_store.update_request("ep-update", "flushed", {"ai_mock_response": {"ok": 2}})
+
+    requests = sqlite_store.get("ep-update")["requests"]
+    assert requests[0]["ai_mock_response"] == {"ok": 1}
+    assert requests[1]["ai_mock_response"] == {"ok": 2}
+    assert sqlite_store.update_request("ep-update", "missing", {}) is False
+
+
+def test_per_endpoint_capacity_and_windows(sqlite_store):
+    sqlite_store.create("ep-window", "Window", max_requests=4)
+
+    for i in range(6):
+        sqlite_store.add_request("ep-window", make_request(f"req-{i}"))
+
+    assert sqlite_store.get_metadata("ep-window")["max_requests"] == 4
+    assert [r["id"] for r in sqlite_store.list_requests("ep-window")] == ["req-2", "req-3", "req-4", "req-5"]
+    assert [r["id"] for r in sqlite_store.list_requests("ep-window", limit=2)] == ["req-4", "req-5"]
+    assert [r["id"] for r in sqlite_store.list_requests("ep-window", since_id="req-3")] == ["req-4", "req-5"]
+    assert sqlite_store.list_requests("missing") is None
+
+
+def test_query_requests_pages_and_filters(sqlite_store):
+    from storage.query import RequestQuery
+
+    sqlite_store.create("ep-query", "Query")
+    for i in range(6):
+        request_data = make_request(f"req-{i}")
+        request_data["method"] = "PUT" if i % 2 else "POST"
+        sqlite_store.add_request("ep-query", request_data)
+
+    latest = sqlite_store.query_requests("ep-query", RequestQuery(limit=2))
+    assert [r["id"] for r in latest.requests] == ["req-4", "req-5"]
+    assert latest.has_more is True
+
+    older = sqlite_store.query_requests("ep-query", RequestQuery(limit=2, before="req-4"))
+    assert [r["id"] for r in older.requests] == ["req-2", "req-3"]
+
+    newer = sqlite_store.query_requests("ep-query", RequestQuery(limit=10, after="req-3"))
+    assert [r["id"] for r in newer.requests] == ["req-4", "req-5"]
+    assert newer.has_more is False
+
+    puts = sqlite_store.query_requests("ep-query", RequestQuery(limit=2, method="put"))
+    assert [r["id"] for r in puts.requests] == ["req-3", "req-5"]
+    assert puts.has_more is True
+
+    with pytest.raises(UnknownCursorError):
+        sqlite_store.query_requests("ep-query", RequestQuery(before="missing"))
+    with pytest.raises(UnknownCursorError):
+        sqlite_store.query_requests("ep-query", RequestQuery(after="missing"))
+    assert sqlite_store.query_requests("missing", RequestQuery()) is None
+
+
+def test_trim_releases_spooled_bodies(sqlite_store, tmp_path):
+    from storage.body_spool import BodySpool
+
+    spool = BodySpool(str(tmp_path / "bodies"))
+    sqlite_store.body_spool = spool
+    sqlite_store.create("ep-1", max_requests=1)
+
+    for request_id in ("r1", "r2"):
+        with spool.open_for_write(request_id) as f:
+            f.write(b"large body")
+        spool.commit(request_id)
+        sqlite_store.add_request("ep-1", {**make_request(request_id), "body_truncated": True})
+    sqlite_store.flush()
+
+    assert not spool.exists("r1")
+    assert spool.exists("r2")
+    assert sqlite_store.get_request("ep-1", "r2")["body_truncated"] is True
+
+
+def test_requests_after_seq_is_per_endpoint(sqlite_store):
+    sqlite_store.create("a", max_requests=3)
+    sqlite_store.create("b")
+
+    for i in range(5):
+        sqlite_store.add_request("a", make_request(f"a-{i}"))
+    sqlite_store.add_request("b", make_request("b-0"))
+
+    assert [r["id"] for r in sqlite_store.requests_after_seq("a", 3, 10)] == ["a-3", "a-4"]
+    assert [r["seq"] for r in sqlite_store.requests_after_seq("a", 0, 10)] == [3, 4, 5]
+    assert [r["seq"] for r in sqlite_store.requests_after_seq("b", 0, 10)] == [1]
+    assert sqlite_store.requests_after_seq("missing", 0, 10) is None
+
+
+def test_seqs_come_from_a_reserved_block(sqlite_path):
+    store = SQLiteEndpointStore(sqlite_path, batch_size=10, flush_interval=0)
+    store.create("ep-1")
+    for i in range(3):
+        store.add_request("ep-1", make_request(f"r{i}"))
+
+    assert store._conn.execute("SELECT last_seq FROM endpoints").fetchone()[0] == SEQ_BLOCK_SIZE
+    store.close()
+
+    reopened = SQLiteEndpointStore(sqlite_path, batch_size=10, flush_interval=0)
+    reopened.add_request("ep-1", make_request("r3"))
+
+    assert [r["seq"] for r in reopened.requests_after_seq("ep-1", 0, 10)] == [1, 2, 3, SEQ_BLOCK_SIZE + 1]
+    reopened.close()
+
+
+def test_touch_is_written_with_the_next_flush(sqlite_store):
+    sqlite_store.create("ep-1")
+    sqlite_store._conn.execute("UPDATE endpoints SET last_activity = 0")
+
+    sqlite_store.touch("ep-1")
+    assert sqlite_store._conn.execute("SELECT last_activity FROM endpoints").fetchone()[0] == 0
+
+    sqlite_store.flush()
+    assert sqlite_store._conn.execute("SELECT last_activity FROM endpoints").fetchone()[0] > 0
+
+
+def test_full_batch_is_left_to_the_flusher(sqlite_path):
+    store = SQLiteEndpointStore(sqlite_path, batch_size=2, flush_interval=60)
+    store.create("ep-1")
+    for i in range(2):
+        store.add_request("ep-1", make_request(f"r{i}"))
+
+    deadline = time.monotonic() + 2
+    while store._conn.execute("SELECT COUNT(*) FROM requests").fetchone()[0] < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    store.close()
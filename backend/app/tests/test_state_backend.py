@@ -0,0 +1,184 @@
+import asyncio
+import pytest
+
+from core.resp_client import RespClient, RespError
+from middleware.rate_limiter import RateLimiter
+from middleware.state_backend import FailoverStateBackend, MemoryStateBackend, SQLiteStateBackend, RedisStateBackend
+from middleware.usage_tracker import UsageTracker
+from tests.fake_redis import FakeRedisServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def shared_backends(request, tmp_path):
+    """Two backend instances pointing at the same shared state - one per worker."""
+    clock = FakeClock()
+
+    if request.param == "sqlite":
+        path = str(tmp_path / "state.db")
+        backends = [SQLiteStateBackend(path, clock=clock), SQLiteStateBackend(path, clock=clock)]
+        yield backends, clock
+        for backend in backends:
+            backend.close()
+    else:
+        server = FakeRedisServer().start()
+        backends = [
+            RedisStateBackend(RespClient.from_url(server.url), clock=clock),
+            RedisStateBackend(RespClient.from_url(server.url), clock=clock)
+        ]
+        yield backends, clock
+        for backend in backends:
+            backend.close()
+        server.stop()
+
+
+def test_rate_limit_is_shared_between_workers(shared_backends):
+    (worker_a, worker_b), _ = shared_backends
+    limiter_a = RateLimiter(backend=worker_a)
+    limiter_b = RateLimiter(backend=worker_b)
+
+    results = []
+    for i in range(6):
+        limiter = limiter_a if i % 2 == 0 else limiter_b
+        results.append(limiter.check_and_consume("endpoint:shared", max_calls=4, window_seconds=60)[0])
+
+    assert results == [True, True, True, True, False, False]
+    assert limiter_a.remaining("endpoint:shared", max_calls=4, window_seconds=60) == 0
+
+
+def test_shared_window_slides(shared_backends):
+    (worker_a, worker_b), clock = shared_backends
+    clock.now = 1_700_000_040.0
+
+    for _ in range(4):
+        worker_a.check_and_consume("key", 4, 60)
+    assert worker_b.check_and_consume("key", 4, 60)[0] is False
+
+    clock.now += 180
+    assert worker_b.check_and_consume("key", 4, 60) == (True, 3)
+
+
+def test_usage_is_shared_between_workers(shared_backends):
+    (worker_a, worker_b), _ = shared_backends
+    tracker_a = UsageTracker(backend=worker_a)
+    tracker_b = UsageTracker(backend=worker_b)
+
+    tracker_a.track_call(input_tokens=500, output_tokens=100)
+    tracker_b.track_call(input_tokens=500, output_tokens=100)
+    tracker_b.track_cache_hit()
+
+    stats = tracker_a.get_stats()
+    assert stats["total_calls"] == 2
+    assert stats["today_calls"] == 2
+    assert stats["estimated_cost"] == pytest.approx(0.006)
+    assert stats["cache_hits"] == 1
+
+
+def test_sqlite_sweep_removes_idle_windows(tmp_path):
+    clock = FakeClock()
+    backend = SQLiteStateBackend(str(tmp_path / "state.db"), clock=clock, idle_seconds=100)
+    backend.check_and_consume("old", 5, 60)
+    clock.now += 200
+
+    assert backend.sweep() == 1
+    assert backend.remaining("old", 5, 60) == 5
+    backend.close()
+
+
+def test_resp_client_round_trip(redis_server):
+    client = RespClient.from_url(redis_server.url)
+
+    assert client.execute("PING") == "PONG"
+    assert client.execute("SET", "key", "value") == "OK"
+    assert client.execute("GET", "key") == b"value"
+    assert client.execute("GET", "missing") is None
+    assert client.pipeline(("INCR", "n"), ("INCR", "n")) == [1, 2]
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_backend_fails_over_to_memory():
+    import socket
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    clock = FakeClock()
+    backend = FailoverStateBackend(
+        RedisStateBackend(RespClient(port=port, timeout=0.5)),
+        retry_seconds=30,
+        clock=clock
+    )
+    limiter = RateLimiter(backend=backend)
+    usage = UsageTracker(backend=backend)
+
+    assert await limiter.check_and_consume_async("endpoint:down", 2) == (True, 1)
+    assert await limiter.check_and_consume_async("endpoint:down", 2) == (True, 0)
+    assert await limiter.check_and_consume_async("endpoint:down", 2) == (False, 0)
+    usage.track_cache_miss()
+    for _ in range(100):
+        if usage.cache_misses:
+            break
+        await asyncio.sleep(0.01)
+    assert usage.cache_misses == 1
+
+    assert backend.failures == 1
+    assert backend.degraded
+    clock.now += 31
+    assert not backend.degraded
+
+
+def test_resp_client_never_resends_a_sent_command(redis_server):
+    client = RespClient.from_url(redis_server.url)
+    assert client.execute("SET", "a", "1") == "OK"
+
+    # A reply left unread by an error must not be taken for the next command's
+    with pytest.raises(RespError):
+        client.pipeline(("BOGUS",), ("GET", "a"))
+    assert client.execute("GET", "a") == b"1"
+
+    redis_server.hang_up_after.add("INCR")
+    with pytest.raises(ConnectionError):
+        client.execute("INCR", "n")
+    assert client.execute("GET", "n") == b"1"
+    client.close()
+
+
+class CountingBackend(MemoryStateBackend):
+    def __init__(self, fail=False):
+        super().__init__()
+        self.fail = fail
+        self.sweeps = 0
+
+    def sweep(self) -> int:
+        if self.fail:
+            raise ConnectionError("down")
+        self.sweeps += 1
+        return super().sweep()
+
+
+@pytest.mark.parametrize("primary_fails", [False, True])
+def test_failover_sweeps_the_fallback_once(primary_fails):
+    primary, fallback = CountingBackend(fail=primary_fails), CountingBackend()
+    backend = FailoverStateBackend(primary, fallback, clock=FakeClock())
+
+    backend.sweep()
+    backend.sweep()
+
+    assert fallback.sweeps == 2
+    assert primary.sweeps == (0 if primary_fails else 2)
@@ -117,3 +117,50 @@ def test_increment_count_nonexistent_endpoint(clean_store):
     clean_store.increment_count("nonexistent-id")
 
     assert True
+
+
+def test_per_endpoint_capacity(clean_store, sample_webhook_data):
+    clean_store.create("small", "Small", max_requests=2)
+    clean_store.create("default", "Default")
+
+    for i in range(5):
+        webhook_data = sample_webhook_data.copy()
+        webhook_data["id"] = f"request-{i}"
+        clean_store.add_request("small", webhook_data)
+        clean_store.add_request("default", webhook_data)
+
+    assert [r["id"] for r in clean_store.get("small")["requests"]] == ["request-3", "request-4"]
+    assert len(clean_store.get("default")["requests"]) == 5
+    assert clean_store.get_request_count("small") == 5
+
+
+def test_list_requests_window(clean_store, sample_webhook_data):
+    endpoint_id = "test-window"
+    clean_store.create(endpoint_id, "Test")
+
+    for i in range(10):
+        webhook_data = sample_webhook_data.copy()
+        webhook_data["id"] = f"request-{i}"
+        clean_store.add_request(endpoint_id, webhook_data)
+
+    last = clean_store.list_requests(endpoint_id, limit=3)
+    since = clean_store.list_requests(endpoint_id, since_id="request-7")
+
+    assert [r["id"] for r in last] == ["request-7", "request-8", "request-9"]
+    assert [r["id"] for r in since] == ["request-8", "request-9"]
+    assert len(clean_store.list_requests(endpoint_id)) == 10
+    assert clean_store.list_requests("nonexistent-id") is None
+
+
+def test_requests_after_seq(clean_store, sample_webhook_data):
+    clean_store.create("seq", "Seq", max_requests=5)
+
+    for i in range(8):
+        webhook_data = sample_webhook_data.copy()
+        webhook_data["id"] = f"request-{i}"
+        clean_store.add_request("seq", webhook_data)
+
+    assert [r["seq"] for r in clean_store.requests_after_seq("seq", 5, 10)] == [6, 7, 8]
+    assert [r["seq"] for r in clean_store.requests_after_seq("seq", 0, 2)] == [4, 5]
+    assert clean_store.requests_after_seq("seq", 8, 10) == []
+    assert clean_store.requests_after_seq("missing", 0, 10) is None
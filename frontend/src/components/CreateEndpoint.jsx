@@ -2,6 +2,16 @@ import { useState, useEffect, useRef } from 'react'
 
 const API_URL = 'https://webhook-debugger-production-48ab.up.railway.app'
 
+// How each kind of mock response is labelled; records without a source come from the AI
+const MOCK_SOURCES = {
+    ai: { badge: '🤖 AI Generated', title: '🤖 AI Mock Response', badgeClass: 'bg-purple-100 text-purple-800' },
+    cache: { badge: '♻️ Cached AI', title: '♻️ Cached AI Mock Response', badgeClass: 'bg-indigo-100 text-indigo-800' },
+    rule: { badge: '📋 Mock Rule', title: '📋 Rule Mock Response', badgeClass: 'bg-green-100 text-green-800' },
+    static: { badge: '📄 Static Fallback', title: '📄 Static Mock Response', badgeClass: 'bg-gray-100 text-gray-700' }
+}
+
+const mockSourceOf = (mock) => MOCK_SOURCES[mock?.source] ?? MOCK_SOURCES.ai
+
 function CreateEndpoint() {
     const [endpointName, setEndpointName] = useState('')
     const [createdEndpoint, setCreatedEndpoint] = useState(null)
@@ -15,37 +25,71 @@ function CreateEndpoint() {
         if (!createdEndpoint) return
 
         const wsUrl = API_URL.replace('https://', 'wss://').replace('http://', 'ws://')
-        const ws = new WebSocket(`${wsUrl}/ws/${createdEndpoint.id}`)
-        wsRef.current = ws
-
-        ws.onopen = () => {
-            console.log('✅ WebSocket Connected')
-            setWsConnected(true)
-        }
+        // Highest event seq seen; a reconnect asks only for what came after it
+        let lastSeq = null
+        let retries = 0
+        let retryTimer = null
+        let closedByUs = false
+
+        const connect = () => {
+            const since = lastSeq === null ? '' : `?since=${lastSeq}`
+            const ws = new WebSocket(`${wsUrl}/ws/${createdEndpoint.id}${since}`)
+            wsRef.current = ws
+
+            ws.onopen = () => {
+                console.log('✅ WebSocket Connected')
+                retries = 0
+                setWsConnected(true)
+            }
 
-        ws.onmessage = (event) => {
-            const message = JSON.parse(event.data)
-            console.log('📨 WebSocket message:', message)
+            ws.onmessage = (event) => {
+                const message = JSON.parse(event.data)
+                console.log('📨 WebSocket message:', message)
+
+                if (message.type === 'new_request') {
+                    lastSeq = Math.max(lastSeq ?? 0, message.seq)
+                    setRequests(prev => prev.some(req => req.id === message.data.id)
+                        ? prev
+                        : [message.data, ...prev])
+                    setShowRequests(true)
+                    console.log('✨ New request added in real-time!')
+                } else if (message.type === 'ai_mock_response') {
+                    setRequests(prev => prev.map(req =>
+                        req.id === message.data.request_id
+                            ? { ...req, ai_mock_response: message.data.ai_mock_response }
+                            : req
+                    ))
+                } else if (message.type === 'missed_requests') {
+                    console.warn(`⚠️ Missed ${message.data.count} live update(s), reloading history`)
+                    loadRequests()
+                } else if (message.type === 'endpoint_removed') {
+                    closedByUs = true
+                }
+            }
 
-            if (message.type === 'new_request') {
-                setRequests(prev => [message.data, ...prev])
-                setShowRequests(true)
-                console.log('✨ New request added in real-time!')
+            ws.onerror = (error) => {
+                console.error('❌ WebSocket error:', error)
             }
-        }
 
-        ws.onerror = (error) => {
-            console.error('❌ WebSocket error:', error)
-        }
+            ws.onclose = () => {
+                console.log('🔌 WebSocket disconnected')
+                setWsConnected(false)
+                if (closedByUs) return
 
-        ws.onclose = () => {
-            console.log('🔌 WebSocket disconnected')
-            setWsConnected(false)
+                // Back off (with jitter) so a server restart isn't met by every viewer at once
+                const delay = Math.min(30000, 1000 * 2 ** retries) * (0.5 + Math.random() / 2)
+                retries += 1
+                retryTimer = setTimeout(connect, delay)
+            }
         }
 
+        connect()
+
         return () => {
-            if (ws.readyState === WebSocket.OPEN) {
-                ws.close()
+            closedByUs = true
+            clearTimeout(retryTimer)
+            if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+                wsRef.current.close()
             }
         }
     }, [createdEndpoint])
@@ -212,9 +256,14 @@ function CreateEndpoint() {
                                                 <span className="bg-blue-100 text-blue-800 px-3 py-1 rounded-full text-sm font-bold">
                                                     {req.method}
                                                 </span>
-                                                {req.ai_mock_response && !req.ai_mock_response.error && (
-                                                    <span className="bg-purple-100 text-purple-800 px-3 py-1 rounded-full text-xs font-semibold flex items-center gap-1">
-                                                        🤖 AI Generated
+                                                {req.ai_mock_response?.status === 'pending' && (
+                                                    <span className="bg-gray-100 text-gray-600 px-3 py-1 rounded-full text-xs font-semibold flex items-center gap-1">
+                                                        ⏳ Generating mock...
+                                                    </span>
+                                                )}
+                                                {req.ai_mock_response?.mock_response && (
+                                                    <span className={`${mockSourceOf(req.ai_mock_response).badgeClass} px-3 py-1 rounded-full text-xs font-semibold flex items-center gap-1`}>
+                                                        {mockSourceOf(req.ai_mock_response).badge}
                                                     </span>
                                                 )}
                                             </div>
@@ -223,20 +272,26 @@ function CreateEndpoint() {
                                             </span>
                                         </div>
 
-                                        {req.ai_mock_response && !req.ai_mock_response.error && (
+                                        {req.ai_mock_response?.mock_response && (
                                             <div className="mb-4 bg-gradient-to-r from-purple-50 to-pink-50 border-2 border-purple-200 rounded-lg p-4">
                                                 <div className="flex items-center justify-between mb-2">
                                                     <h4 className="font-bold text-purple-900 flex items-center gap-2">
-                                                        🤖 AI Mock Response
+                                                        {mockSourceOf(req.ai_mock_response).title}
                                                     </h4>
-                                                    <div className="flex items-center gap-3 text-xs">
-                                                        <span className="text-purple-700">
-                                                            {req.ai_mock_response.tokens_used} tokens
-                                                        </span>
-                                                        <span className="text-purple-600 font-mono">
-                                                            {req.ai_mock_response.ai_model}
+                                                    {req.ai_mock_response.source === 'rule' ? (
+                                                        <span className="text-xs text-purple-600 font-mono">
+                                                            {req.ai_mock_response.rule}
                                                         </span>
-                                                    </div>
+                                                    ) : req.ai_mock_response.ai_model && (
+                                                        <div className="flex items-center gap-3 text-xs">
+                                                            <span className="text-purple-700">
+                                                                {req.ai_mock_response.tokens_used} tokens
+                                                            </span>
+                                                            <span className="text-purple-600 font-mono">
+                                                                {req.ai_mock_response.ai_model}
+                                                            </span>
+                                                        </div>
+                                                    )}
                                                 </div>
                                                 <pre className="bg-white p-3 rounded border border-purple-200 text-sm overflow-x-auto">
                                                     {JSON.stringify(req.ai_mock_response.mock_response, null, 2)}
@@ -259,8 +314,20 @@ function CreateEndpoint() {
                                         <div className="mb-3">
                                             <p className="text-sm font-semibold text-gray-700 mb-2">Request Body:</p>
                                             <pre className="bg-gray-50 p-3 rounded border border-gray-200 text-xs overflow-x-auto">
-                                                {req.body_raw || '(empty)'}
+                                                {req.body_encoding === 'base64'
+                                                    ? `(binary, ${req.content_length} bytes)`
+                                                    : (req.body_raw || '(empty)')}
                                             </pre>
+                                            {(req.body_truncated || req.body_encoding === 'base64') && (
+                                                <a
+                                                    href={`${API_URL}/endpoints/${createdEndpoint.id}/requests/${req.id}/body`}
+                                                    className="text-xs text-blue-600 hover:underline"
+                                                    target="_blank"
+                                                    rel="noreferrer"
+                                                >
+                                                    Download full body ({req.content_length} bytes)
+                                                </a>
+                                            )}
                                         </div>
 
                                         <details className="cursor-pointer">